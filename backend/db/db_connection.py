@@ -1,21 +1,457 @@
+import logging
+import os
+import random
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.db.profiler import ProfiledCursor
+
+# Utility for obtaining SQLite connections with proper settings.
+# Connections are opened once and kept in a bounded, thread-safe pool so that
+# request handlers borrow an already-configured connection instead of paying
+# for connect/PRAGMA/teardown on every query.
+
+DEFAULT_DB_PATH = "backend/db/escrow.db"
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_TIMEOUT = 5.0
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+# Contended writes (see begin_immediate/retry_on_busy): the write lock is requested
+# with a short busy wait, and on SQLITE_BUSY the caller backs off with jitter and
+# retries for up to BUSY_RETRY_SECONDS. SQLite's own busy handler sleeps in steps
+# that grow to 100 ms, which dominates tail latency when many writers collide.
+BUSY_WAIT_MS = 2
+BUSY_RETRY_SECONDS = 5.0
+BUSY_BACKOFF = 0.001
+BUSY_BACKOFF_MAX = 0.05
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA profile applied once to every pooled connection when it is opened.
+# WAL lets dashboard readers proceed while a booking/transaction write is in
+# flight; NORMAL sync is durable across application crashes in WAL mode.
+# Each entry: pragma name -> (environment variable, default, allowed values or int).
+PRAGMA_SETTINGS = {
+    'journal_mode': ('ESCROW_DB_JOURNAL_MODE', 'WAL',
+                     {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}),
+    'synchronous': ('ESCROW_DB_SYNCHRONOUS', 'NORMAL', {'OFF', 'NORMAL', 'FULL', 'EXTRA'}),
+    'cache_size': ('ESCROW_DB_CACHE_SIZE', -16000, int),
+    'mmap_size': ('ESCROW_DB_MMAP_SIZE', 134217728, int),
+    'temp_store': ('ESCROW_DB_TEMP_STORE', 'MEMORY', {'DEFAULT', 'FILE', 'MEMORY'}),
+    'busy_timeout': ('ESCROW_DB_BUSY_TIMEOUT', 5000, int),
+}
+
+# SQLite reports these pragmas as integers; map them back to their names for comparison
+_PRAGMA_READBACK = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'},
+}
+
+
+def load_pragma_profile(overrides=None):
+    """
+    Build the PRAGMA profile from environment variables (ESCROW_DB_*), applying
+    any explicit overrides. Values are validated so that nothing from the
+    environment is interpolated into SQL unchecked.
+
+    Returns:
+        dict: pragma name -> validated value.
+    """
+    profile = {}
+    for name, (env_var, default, allowed) in PRAGMA_SETTINGS.items():
+        value = os.getenv(env_var, default)
+        if overrides and overrides.get(name) is not None:
+            value = overrides[name]
+        if allowed is int:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"PRAGMA {name} must be an integer, got {value!r}")
+        else:
+            value = str(value).upper()
+            if value not in allowed:
+                raise ValueError(f"PRAGMA {name} must be one of {sorted(allowed)}, got {value!r}")
+        profile[name] = value
+    return profile
+
+
+def apply_pragma_profile(conn, profile):
+    """Apply a validated PRAGMA profile to an open connection."""
+    for name, value in profile.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+
+
+def read_pragma_profile(conn, names=None):
+    """Read back the PRAGMA values actually in effect on a connection."""
+    effective = {}
+    for name in names or PRAGMA_SETTINGS:
+        value = conn.execute(f"PRAGMA {name};").fetchone()[0]
+        if name in _PRAGMA_READBACK:
+            value = _PRAGMA_READBACK[name].get(value, value)
+        elif isinstance(value, str):
+            value = value.upper()
+        effective[name] = value
+    return effective
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a sqlite3.Connection borrowed from a ConnectionPool.
+    - Forwards every attribute (execute, commit, rollback, ...) to the real connection.
+    - cursor() returns a ProfiledCursor so statement timings, rows and errors are recorded.
+    - close() does not close the underlying connection; it hands it back to the pool.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self):
+        return ProfiledCursor(self._raw.cursor())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Return the connection to its pool (idempotent)."""
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable SQLite connections.
+    - At most `size` connections are open at once; borrowers wait up to `timeout` seconds.
+    - Idle connections are health-checked with `SELECT 1` once they have been idle
+      longer than `health_check_interval` seconds and replaced if broken.
+    - Keeps hit/miss/wait counters so the pool can be sized from real traffic.
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL, pragmas=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        # Validated PRAGMA profile applied to each connection as it is opened
+        self.pragmas = pragmas if pragmas is not None else load_pragma_profile()
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        # Idle connections as (connection, returned_at) pairs; used LIFO to keep caches warm
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+        }
+
+    def _open_connection(self):
+        """Open and configure a brand-new SQLite connection."""
+        # Connections migrate between request threads, but only one thread uses
+        # a borrowed connection at a time, so the same-thread check is disabled.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Return rows as sqlite3.Row to allow dict-style access (row['col'])
+        conn.row_factory = sqlite3.Row
+        # Turn on foreign key support in SQLite (off by default)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        apply_pragma_profile(conn, self.pragmas)
+        return conn
+
+    def check_profile(self):
+        """
+        Compare the requested PRAGMA profile with what SQLite actually applied.
+        Some settings can be silently refused (e.g. WAL on an in-memory database
+        or mmap_size above the compile-time limit), so this is run at startup.
+
+        Returns:
+            dict: pragma name -> {'requested', 'effective', 'ok'}.
+        """
+        with self.connection() as conn:
+            effective = read_pragma_profile(conn, self.pragmas)
+        return {
+            name: {
+                'requested': requested,
+                'effective': effective[name],
+                'ok': effective[name] == requested,
+            }
+            for name, requested in self.pragmas.items()
+        }
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self, timeout=None):
+        """
+        Borrow a raw connection from the pool, opening a new one if below capacity.
+        Blocks up to `timeout` seconds (pool default if None) and raises
+        PoolTimeoutError if the pool stays exhausted.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        waited = None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            while not self._idle and self._open >= self.size:
+                if waited is None:
+                    waited = time.perf_counter()
+                    self._stats['waits'] += 1
+                remaining = timeout - (time.perf_counter() - waited)
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if not self._idle and self._open >= self.size:
+                        self._record_wait(waited)
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s"
+                        )
+            if waited is not None:
+                self._record_wait(waited)
+            if self._idle:
+                conn, returned_at = self._idle.pop()
+                self._stats['hits'] += 1
+            else:
+                conn, returned_at = None, None
+                self._stats['misses'] += 1
+            # Reserve the slot before doing any I/O outside the lock
+            if conn is None:
+                self._open += 1
+
+        if conn is not None:
+            idle_for = time.monotonic() - returned_at
+            if idle_for < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            # Broken idle connection: drop it and open a replacement in the same slot
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            self._discard(conn)
+
+        try:
+            return self._open_connection()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _record_wait(self, started):
+        elapsed = time.perf_counter() - started
+        self._stats['wait_time_total'] += elapsed
+        self._stats['wait_time_max'] = max(self._stats['wait_time_max'], elapsed)
+
+    def release(self, conn):
+        """Return a raw connection to the pool, rolling back any open transaction."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._open -= 1
+                self._discard(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that borrows a connection and always returns it."""
+        conn = PooledConnection(self, self.acquire(timeout))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        """Close every idle connection and refuse further borrowing."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Snapshot of pool counters and current occupancy."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            })
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_ratio'] = snapshot['hits'] / lookups if lookups else 0.0
+        snapshot['wait_time_avg'] = (
+            snapshot['wait_time_total'] / snapshot['waits'] if snapshot['waits'] else 0.0
+        )
+        return snapshot
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_settings_from_env():
+    """Read pool configuration from the environment (populated from .env by server.py)."""
+    return {
+        'db_path': os.getenv('ESCROW_DB_PATH', DEFAULT_DB_PATH),
+        'size': int(os.getenv('ESCROW_DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+        'timeout': float(os.getenv('ESCROW_DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+        'health_check_interval': float(
+            os.getenv('ESCROW_DB_HEALTH_CHECK_INTERVAL', DEFAULT_HEALTH_CHECK_INTERVAL)
+        ),
+        'pragmas': load_pragma_profile(),
+    }
+
+
+def get_pool():
+    """Return the process-wide pool, creating it lazily from environment settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**_pool_settings_from_env())
+    return _pool
+
+
+def configure_pool(**overrides):
+    """
+    Replace the process-wide pool, e.g. to point at another database file.
+    Keyword arguments override the environment settings (db_path, size, timeout,
+    health_check_interval, pragmas). Idle connections of the previous pool are closed.
+    """
+    global _pool
+    settings = _pool_settings_from_env()
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(**settings)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def pool_stats():
+    """Return counters for the process-wide pool."""
+    return get_pool().stats()
+
+
+def report_pragma_profile():
+    """
+    Startup check: log the PRAGMA profile in effect on the escrow database and
+    warn about any setting SQLite did not accept.
+
+    Returns:
+        dict: Result of ConnectionPool.check_profile().
+    """
+    pool = get_pool()
+    report = pool.check_profile()
+    for name, result in report.items():
+        if result['ok']:
+            logger.info("PRAGMA %s = %s", name, result['effective'])
+        else:
+            logger.warning(
+                "PRAGMA %s requested %s but %s is in effect on %s",
+                name, result['requested'], result['effective'], pool.db_path
+            )
+    return report
 
-# Utility for obtaining a SQLite connection with proper settings.
-# Ensures use of Row factory and enforces foreign key constraints.
 
 def get_connection():
     """
-    Open and return a SQLite connection to the escrow database.
-    - Sets row_factory to sqlite3.Row for dict-like row access.
-    - Enables PRAGMA foreign_keys to enforce referential integrity.
+    Borrow a SQLite connection to the escrow database from the pool.
+    - Rows use sqlite3.Row for dict-like access.
+    - PRAGMA foreign_keys and the PRAGMA profile are applied once, when the connection is opened.
+    - Calling close() returns the connection to the pool.
 
     Returns:
-        sqlite3.Connection: Configured DB connection.
-    """
-    # Connect to the local SQLite file within the backend/db folder
-    conn = sqlite3.connect("backend/db/escrow.db")
-    # Return rows as sqlite3.Row to allow dict-style access (row['col'])
-    conn.row_factory = sqlite3.Row
-    # Turn on foreign key support in SQLite (off by default)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
\ No newline at end of file
+        PooledConnection: Configured DB connection.
+    """
+    pool = get_pool()
+    return PooledConnection(pool, pool.acquire())
+
+
+def is_busy_error(exc):
+    """True if `exc` is SQLite reporting the database busy or locked by another writer."""
+    return isinstance(exc, sqlite3.OperationalError) and (
+        'locked' in str(exc) or 'busy' in str(exc)
+    )
+
+
+def begin_immediate(conn, wait_ms=BUSY_WAIT_MS):
+    """
+    Start a write transaction (BEGIN IMMEDIATE), waiting at most `wait_ms` for the lock.
+    Raises sqlite3.OperationalError (busy/locked) if another writer holds it.
+    The connection's own busy_timeout is restored afterwards.
+    """
+    previous = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {int(wait_ms)}")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(previous)}")
+
+
+def retry_on_busy(operation, retry_seconds=BUSY_RETRY_SECONDS, backoff=BUSY_BACKOFF, backoff_max=BUSY_BACKOFF_MAX):
+    """
+    Call operation(), retrying while it raises a busy/locked error, for up to
+    `retry_seconds`. Sleeps between attempts with exponential backoff and full
+    jitter, so writers that collided do not retry in lockstep.
+    Any other exception, or the busy error once time runs out, propagates.
+    """
+    deadline = time.monotonic() + retry_seconds
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except sqlite3.OperationalError as exc:
+            if not is_busy_error(exc) or time.monotonic() >= deadline:
+                raise
+        time.sleep(random.uniform(0, min(backoff_max, backoff * 2 ** attempt)))
+        attempt += 1
+
+
+def pooled_connection(timeout=None):
+    """
+    Context manager form of get_connection():
+
+        with pooled_connection() as conn:
+            conn.execute(...)
+
+    The connection is returned to the pool when the block exits, and any
+    transaction left open is rolled back.
+    """
+    return get_pool().connection(timeout)
@@ -0,0 +1,352 @@
+import re
+from datetime import date, timedelta
+
+# Query building for search and filtering.
+# - fts_query() turns free text into an FTS5 MATCH expression for the search
+#   indexes created by migration 0003.
+# - build_booking_filter() combines any subset of booking filters into one
+#   parameterized statement. Every filter that can be answered from an index is
+#   probed for how many bookings it matches (capped at ESTIMATE_CAP rows); the
+#   most selective one drives the query through its index and the others are
+#   checked only on the rows it produces, cheapest-first.
+# - build_unit_filter() lists a project's units with floor/price/area ranges and
+#   booked status applied, in id, price, area or floor order. Sorted pages walk
+#   the (project_id, column) indexes of migration 0006 with a (value, id)
+#   keyset, so no page needs a sort or an OFFSET.
+
+# Rows counted per filter when estimating selectivity; beyond this filters tie
+ESTIMATE_CAP = 1000
+
+BOOKING_STATUSES = ('matched', 'unmatched', 'unpaid')
+
+# Unit listing orders; a leading '-' sorts descending (ties are broken by id in the same direction)
+UNIT_SORTS = ('id', 'price', '-price', 'area', '-area', 'floor', '-floor')
+
+
+class FilterError(ValueError):
+    """Raised for malformed filter query parameters."""
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match, as a whole token
+    or a token prefix. Returns None if the text contains no searchable words.
+    """
+    tokens = re.findall(r'\w+', text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _int(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise FilterError(f'{name} must be an integer')
+
+
+def _float(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise FilterError(f'{name} must be a number')
+
+
+def _date(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise FilterError(f'{name} must be a date (YYYY-MM-DD)')
+
+
+def _text(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    if fts_query(value) is None:
+        raise FilterError(f'{name} must contain letters or digits')
+    return value
+
+
+def parse_booking_filters(args):
+    """
+    Read booking filters from request query parameters:
+    project_id, project_name, builder_id, buyer_name, unit_id (unit code),
+    date_from, date_to, min_amount, max_amount and status (matched|unmatched|unpaid).
+    Returns a dict holding only the filters that were given.
+    Raises FilterError on invalid values.
+    """
+    filters = {
+        'project_id': _int(args, 'project_id'),
+        'project_name': _text(args, 'project_name'),
+        'builder_id': _int(args, 'builder_id'),
+        'buyer_name': _text(args, 'buyer_name'),
+        'unit_id': _text(args, 'unit_id'),
+        'date_from': _date(args, 'date_from'),
+        'date_to': _date(args, 'date_to'),
+        'min_amount': _float(args, 'min_amount'),
+        'max_amount': _float(args, 'max_amount'),
+        'status': args.get('status') or None,
+    }
+    if filters['status'] is not None and filters['status'] not in BOOKING_STATUSES:
+        raise FilterError(f"status must be one of {', '.join(BOOKING_STATUSES)}")
+    if filters['date_from'] and filters['date_to'] and filters['date_from'] > filters['date_to']:
+        raise FilterError('date_from must not be after date_to')
+    if (filters['min_amount'] is not None and filters['max_amount'] is not None
+            and filters['min_amount'] > filters['max_amount']):
+        raise FilterError('min_amount must not be greater than max_amount')
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def parse_unit_filters(args):
+    """
+    Read unit filters from request query parameters:
+    min_floor, max_floor, min_price, max_price, min_area, max_area and booked (0|1).
+    Returns a dict holding only the filters that were given.
+    Raises FilterError on invalid values.
+    """
+    filters = {
+        'min_floor': _int(args, 'min_floor'),
+        'max_floor': _int(args, 'max_floor'),
+        'min_price': _float(args, 'min_price'),
+        'max_price': _float(args, 'max_price'),
+        'min_area': _float(args, 'min_area'),
+        'max_area': _float(args, 'max_area'),
+        'booked': _int(args, 'booked'),
+    }
+    if filters['booked'] not in (None, 0, 1):
+        raise FilterError('booked must be 0 or 1')
+    for column in ('floor', 'price', 'area'):
+        low, high = filters[f'min_{column}'], filters[f'max_{column}']
+        if low is not None and high is not None and low > high:
+            raise FilterError(f'min_{column} must not be greater than max_{column}')
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def parse_unit_sort(args):
+    """
+    Read the unit listing order from the 'sort' query parameter (default 'id').
+    Raises FilterError for anything but UNIT_SORTS.
+    """
+    sort = args.get('sort') or 'id'
+    if sort not in UNIT_SORTS:
+        raise FilterError(f"sort must be one of {', '.join(UNIT_SORTS)}")
+    return sort
+
+
+def _range(column, low, high):
+    """(condition, params) for an optional inclusive range on `column`."""
+    parts, params = [], []
+    if low is not None:
+        parts.append(f"{column} >= ?")
+        params.append(low)
+    if high is not None:
+        parts.append(f"{column} <= ?")
+        params.append(high)
+    return ' AND '.join(parts), params
+
+
+def _date_range(column, date_from, date_to):
+    """
+    (condition, params) for an optional inclusive range of days on a date column.
+    Booking dates may carry a time of day, so the upper bound is the start of the
+    day after `date_to` (exclusive) rather than `date_to` itself.
+    """
+    parts, params = [], []
+    if date_from is not None:
+        parts.append(f"{column} >= ?")
+        params.append(date_from)
+    if date_to is not None:
+        parts.append(f"{column} < ?")
+        params.append((date.fromisoformat(date_to) + timedelta(days=1)).isoformat())
+    return ' AND '.join(parts), params
+
+
+def _predicates(filters):
+    """
+    One entry per active filter: (name, driver, condition).
+    - driver: (sql, params) selecting the ids of matching bookings through an
+      index, or None if the filter cannot be answered from an index.
+    - condition: (sql, params) testing a row of the joined result. Column
+      references are prefixed with '+' so SQLite checks them on the driver's
+      rows instead of picking their index to drive the query.
+    """
+    predicates = []
+    if 'project_id' in filters:
+        project_id = filters['project_id']
+        predicates.append(('project_id',
+            ("SELECT Booking.id FROM Unit JOIN Booking ON Booking.unit_id = Unit.id"
+             " WHERE Unit.project_id = ?", [project_id]),
+            ("+Unit.project_id = ?", [project_id])))
+    if 'project_name' in filters:
+        match = fts_query(filters['project_name'])
+        predicates.append(('project_name',
+            ("SELECT Booking.id FROM ProjectSearch"
+             " JOIN Unit ON Unit.project_id = ProjectSearch.rowid"
+             " JOIN Booking ON Booking.unit_id = Unit.id"
+             " WHERE ProjectSearch MATCH ?", [match]),
+            ("+Unit.project_id IN (SELECT rowid FROM ProjectSearch WHERE ProjectSearch MATCH ?)", [match])))
+    if 'builder_id' in filters:
+        builder_id = filters['builder_id']
+        predicates.append(('builder_id',
+            ("SELECT Booking.id FROM Project"
+             " JOIN Unit ON Unit.project_id = Project.id"
+             " JOIN Booking ON Booking.unit_id = Unit.id"
+             " WHERE Project.builder_id = ?", [builder_id]),
+            ("+Project.builder_id = ?", [builder_id])))
+    if 'buyer_name' in filters:
+        match = fts_query(filters['buyer_name'])
+        predicates.append(('buyer_name',
+            ("SELECT Booking.id FROM BuyerSearch"
+             " JOIN Booking ON Booking.buyer_id = BuyerSearch.rowid"
+             " WHERE BuyerSearch MATCH ?", [match]),
+            ("+Booking.buyer_id IN (SELECT rowid FROM BuyerSearch WHERE BuyerSearch MATCH ?)", [match])))
+    if 'unit_id' in filters:
+        match = fts_query(filters['unit_id'])
+        predicates.append(('unit_id',
+            ("SELECT Booking.id FROM UnitSearch"
+             " JOIN Booking ON Booking.unit_id = UnitSearch.rowid"
+             " WHERE UnitSearch MATCH ?", [match]),
+            ("+Booking.unit_id IN (SELECT rowid FROM UnitSearch WHERE UnitSearch MATCH ?)", [match])))
+    if 'date_from' in filters or 'date_to' in filters:
+        where, params = _date_range("date", filters.get('date_from'), filters.get('date_to'))
+        condition, _ = _date_range("+Booking.date", filters.get('date_from'), filters.get('date_to'))
+        predicates.append(('date', ("SELECT id FROM Booking WHERE " + where, params), (condition, params)))
+    if 'min_amount' in filters or 'max_amount' in filters:
+        where, params = _range("amount", filters.get('min_amount'), filters.get('max_amount'))
+        condition, _ = _range("+Booking.amount", filters.get('min_amount'), filters.get('max_amount'))
+        predicates.append(('amount', ("SELECT id FROM Booking WHERE " + where, params), (condition, params)))
+    status = filters.get('status')
+    if status == 'matched':
+        predicates.append(('status',
+            ("SELECT booking_id AS id FROM Transaction_log WHERE booking_id IS NOT NULL", []),
+            ("EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.booking_id = Booking.id)", [])))
+    elif status == 'unmatched':
+        predicates.append(('status',
+            ("SELECT Booking.id FROM Transaction_log AS t"
+             " JOIN Booking ON Booking.unit_id = t.unit_id"
+             " WHERE t.booking_id IS NULL", []),
+            ("EXISTS (SELECT 1 FROM Transaction_log AS t"
+             " WHERE t.unit_id = Booking.unit_id AND t.booking_id IS NULL)", [])))
+    elif status == 'unpaid':
+        predicates.append(('status', None,
+            ("NOT EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.unit_id = Booking.unit_id)", [])))
+    return predicates
+
+
+def estimate_matches(conn, driver, cap=ESTIMATE_CAP):
+    """Count the bookings a driver selects, stopping at `cap`."""
+    sql, params = driver
+    return conn.execute(f"SELECT COUNT(*) FROM ({sql} LIMIT ?)", [*params, cap]).fetchone()[0]
+
+
+# Columns returned for each filtered booking, including its payment status
+_FILTER_COLUMNS = (
+    "SELECT Booking.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number,"
+    " Project.id AS project_id, Project.name AS project_name, Project.builder_id AS builder_id,"
+    " CASE"
+    "  WHEN EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.booking_id = Booking.id) THEN 'matched'"
+    "  WHEN EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.unit_id = Booking.unit_id) THEN 'unmatched'"
+    "  ELSE 'unpaid'"
+    " END AS status"
+    " FROM Booking"
+    " JOIN Unit ON Unit.id = Booking.unit_id"
+    " JOIN Project ON Project.id = Unit.project_id"
+    " JOIN Buyer ON Buyer.id = Booking.buyer_id"
+)
+
+
+def build_booking_filter(conn, filters, after_id=None, limit=None):
+    """
+    Build the statement for one page of bookings matching every filter, ordered by booking id.
+    Filters are ordered by their estimated match count; the smallest indexed one
+    selects the candidate booking ids and the rest are applied to those rows.
+    Returns (sql, params, plan) where plan lists the filters in evaluation order
+    as (name, estimated matches or None).
+    """
+    ranked = []
+    for name, driver, condition in _predicates(filters):
+        estimate = estimate_matches(conn, driver) if driver else None
+        ranked.append((estimate is None, estimate or 0, name, driver, condition))
+    ranked.sort(key=lambda entry: entry[:2])
+
+    if ranked and ranked[0][3] is not None:
+        driver_sql, driver_params = ranked[0][3]
+        checks = ranked[1:]
+    else:
+        # Nothing index-backed to start from: walk bookings in id order
+        driver_sql, driver_params = "SELECT id FROM Booking", []
+        checks = ranked
+
+    inner = f"SELECT id FROM ({driver_sql})"
+    params = list(driver_params)
+    if after_id is not None:
+        inner += " WHERE id > ?"
+        params.append(after_id)
+    sql = _FILTER_COLUMNS + f" WHERE Booking.id IN ({inner})"
+    for *_, (condition, condition_params) in checks:
+        sql += f" AND {condition}"
+        params.extend(condition_params)
+    sql += " ORDER BY Booking.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    plan = [(name, None if is_check_only else estimate) for is_check_only, estimate, name, _, _ in ranked]
+    return sql, params, plan
+
+
+# Columns returned for each listed unit
+_UNIT_COLUMNS = (
+    "SELECT u.*, b.name AS builder_name"
+    " FROM Unit u"
+    " JOIN Project p ON u.project_id = p.id"
+    " LEFT JOIN User b ON b.id = p.builder_id"
+)
+
+
+def build_unit_filter(project_id, filters=None, sort='id', after=None, limit=None):
+    """
+    Build the statement for one page of a project's units matching every filter
+    (see parse_unit_filters), in `sort` order (see UNIT_SORTS).
+    `after` is the last id of the previous page for the id order, otherwise the
+    (sort value, id) pair of its last row.
+    Returns the (sql, params) pair to execute.
+    """
+    filters = filters or {}
+    sql = _UNIT_COLUMNS + " WHERE u.project_id = ?"
+    params = [project_id]
+    for column in ('floor', 'price', 'area'):
+        condition, condition_params = _range(f"u.{column}", filters.get(f'min_{column}'), filters.get(f'max_{column}'))
+        if condition:
+            sql += f" AND {condition}"
+            params.extend(condition_params)
+    if 'booked' in filters:
+        sql += " AND u.booked = ?"
+        params.append(filters['booked'])
+
+    column, descending = sort.lstrip('-'), sort.startswith('-')
+    if column == 'id':
+        if after is not None:
+            sql += " AND u.id > ?"
+            params.append(after)
+        sql += " ORDER BY u.id"
+    else:
+        direction = " DESC" if descending else ""
+        if after is not None:
+            # Row-value comparison keeps the keyset on the (project_id, column) index
+            sql += f" AND (u.{column}, u.id) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        sql += f" ORDER BY u.{column}{direction}, u.id{direction}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+
+from backend.db.db_connection import begin_immediate, pooled_connection, retry_on_busy
+
+# Opt-in group commit for single-row writes.
+# Normally every write helper in queries.py commits its own transaction, paying
+# one WAL sync and one round of write-lock contention per request. With group
+# commit enabled, helpers hand their statements to a single writer thread that
+# commits queued writes together in one transaction: writes arriving while a
+# group commits form the next group, so groups grow with load without delaying
+# a lone write. An optional window keeps a group open a few milliseconds longer,
+# which only pays off when each commit is expensive (synchronous=FULL on slow
+# disks). Each write runs inside its own SAVEPOINT, so a write that fails is
+# undone on its own and its caller gets the error, while the rest of the group
+# still commits. Callers block until the group is committed, so a returned id
+# is as durable as with a per-request commit; a caller that waits longer than
+# the timeout gets GroupCommitTimeout instead of hanging on a stuck writer.
+
+# Set ESCROW_DB_GROUP_COMMIT=1 to turn group commit on
+DEFAULT_ENABLED = False
+# How long the writer keeps collecting after the first write of a group arrives (0: take what is queued)
+DEFAULT_WINDOW_MS = 0.0
+# Writes committed in one transaction at most
+DEFAULT_MAX_BATCH = 256
+# How long submit() waits for its write to be committed (seconds)
+DEFAULT_TIMEOUT = 30.0
+
+
+class GroupCommitTimeout(TimeoutError):
+    """Raised by submit() when its write was not committed within the timeout."""
+
+
+class _WriteRequest:
+    __slots__ = ('statements', 'result', 'error', 'done')
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommitWriter:
+    """
+    Single background writer that commits concurrent writes in shared transactions.
+    - submit(statements) runs statements(cursor) in the next group and returns its
+      result once the group has committed, or raises the error it caused.
+    - A group takes every queued write, up to `max_batch`; with `window_ms` set
+      it first waits that long after its first write for more to arrive.
+    - submit() gives up after `timeout` seconds with GroupCommitTimeout.
+    """
+
+    def __init__(self, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH, timeout=DEFAULT_TIMEOUT):
+        if max_batch < 1:
+            raise ValueError("Group commit batch size must be at least 1")
+        if timeout <= 0:
+            raise ValueError("Group commit timeout must be positive")
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._pending = []
+        self._writer = None
+        self._stats = {'writes': 0, 'failed': 0, 'groups': 0, 'max_group': 0, 'commit_failures': 0,
+                       'timeouts': 0}
+
+    def _ensure_writer(self):
+        # Caller holds the condition lock
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name='group-commit', daemon=True)
+            self._writer.start()
+
+    def submit(self, statements):
+        """
+        Queue statements(cursor) for the next group; blocks until it commits.
+        Raises GroupCommitTimeout after `timeout` seconds. A write still queued is
+        withdrawn first; one already in a group being committed may yet commit.
+        """
+        request = _WriteRequest(statements)
+        with self._cond:
+            self._pending.append(request)
+            self._ensure_writer()
+            self._cond.notify()
+        if not request.done.wait(self.timeout):
+            with self._cond:
+                if not request.done.is_set():
+                    if request in self._pending:
+                        self._pending.remove(request)
+                    self._stats['timeouts'] += 1
+                    raise GroupCommitTimeout(f"Write not committed within {self.timeout:g}s")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_group(self):
+        """Wait for writes and collect one group of them."""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            group, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        return group
+
+    def _commit_group(self, group):
+        """Run every write of the group in one transaction; returns [(result, error)] aligned with it."""
+        def attempt():
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    begin_immediate(conn)
+                    outcomes = []
+                    for request in group:
+                        cursor.execute("SAVEPOINT group_write")
+                        try:
+                            outcomes.append((request.statements(cursor), None))
+                        except Exception as exc:
+                            # Undo only this write; the rest of the group goes ahead
+                            cursor.execute("ROLLBACK TO group_write")
+                            outcomes.append((None, exc))
+                        cursor.execute("RELEASE group_write")
+                    conn.commit()
+                    return outcomes
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+
+        try:
+            return retry_on_busy(attempt)
+        except Exception as exc:
+            # Nothing of the group was committed; every caller gets the error
+            with self._cond:
+                self._stats['commit_failures'] += 1
+            return [(None, exc)] * len(group)
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            try:
+                outcomes = self._commit_group(group)
+            except Exception as exc:
+                # Never let one group stop the writer or leave its callers waiting
+                outcomes = [(None, exc)] * len(group)
+            with self._cond:
+                self._stats['writes'] += len(group)
+                self._stats['failed'] += sum(1 for _, error in outcomes if error is not None)
+                self._stats['groups'] += 1
+                self._stats['max_group'] = max(self._stats['max_group'], len(group))
+            for request, (result, error) in zip(group, outcomes):
+                request.result, request.error = result, error
+                request.done.set()
+
+    def stats(self):
+        """Snapshot of group commit counters."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['pending'] = len(self._pending)
+        snapshot['avg_group'] = snapshot['writes'] / snapshot['groups'] if snapshot['groups'] else 0.0
+        return snapshot
+
+
+_writer = None
+_configured = False
+_writer_lock = threading.Lock()
+
+
+def _group_commit_settings_from_env():
+    """Read group commit configuration from the environment (populated from .env by server.py)."""
+    return {
+        'enabled': os.getenv('ESCROW_DB_GROUP_COMMIT', str(int(DEFAULT_ENABLED))).lower() in ('1', 'true', 'yes', 'on'),
+        'window_ms': float(os.getenv('ESCROW_DB_GROUP_COMMIT_WINDOW_MS', DEFAULT_WINDOW_MS)),
+        'max_batch': int(os.getenv('ESCROW_DB_GROUP_COMMIT_MAX_BATCH', DEFAULT_MAX_BATCH)),
+        'timeout': float(os.getenv('ESCROW_DB_GROUP_COMMIT_TIMEOUT', DEFAULT_TIMEOUT)),
+    }
+
+
+def configure_group_commit(**overrides):
+    """
+    Turn group commit on or off for the process.
+    Keyword arguments override the environment settings (enabled, window_ms, max_batch, timeout).
+    Returns the new writer, or None when group commit is off.
+    """
+    global _writer, _configured
+    settings = _group_commit_settings_from_env()
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    enabled = settings.pop('enabled')
+    with _writer_lock:
+        _writer = GroupCommitWriter(**settings) if enabled else None
+        _configured = True
+    return _writer
+
+
+def group_commit_writer():
+    """Return the process-wide group commit writer, or None when group commit is off."""
+    global _writer, _configured
+    if not _configured:
+        with _writer_lock:
+            if not _configured:
+                settings = _group_commit_settings_from_env()
+                if settings.pop('enabled'):
+                    _writer = GroupCommitWriter(**settings)
+                _configured = True
+    return _writer
+
+
+def group_commit_stats():
+    """Return counters for the group commit writer ({'enabled': False} when it is off)."""
+    writer = group_commit_writer()
+    if writer is None:
+        return {'enabled': False}
+    return {'enabled': True, **writer.stats()}
@@ -0,0 +1,146 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+from backend.db.db_connection import pooled_connection
+
+# Versioned schema migrations for the escrow database.
+# schema.sql is the baseline; every change after it lives in backend/db/migrations
+# as NNNN_description.sql and is applied exactly once, in version order.
+# Applied versions are recorded in the SchemaMigration table.
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(DB_DIR, 'schema.sql')
+MIGRATIONS_DIR = os.path.join(DB_DIR, 'migrations')
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised at startup when migrations are pending and automatic migration is off."""
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """
+    List migration files in version order.
+    Returns list of (version, name, path) tuples.
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Duplicate migration version in " + directory)
+    return migrations
+
+
+def _ensure_migration_table(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS SchemaMigration ("
+        " version INTEGER PRIMARY KEY,"
+        " name TEXT NOT NULL,"
+        " applied_at TEXT NOT NULL)"
+    )
+    conn.commit()
+
+
+def applied_versions(conn):
+    """Return the set of migration versions already recorded in the database."""
+    _ensure_migration_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM SchemaMigration")}
+
+
+def apply_schema(conn, schema_path=SCHEMA_PATH):
+    """Create the baseline tables from schema.sql (idempotent)."""
+    with open(schema_path, 'r') as f:
+        conn.executescript(f.read())
+
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR):
+    """
+    Apply every pending migration, each in its own transaction together with
+    its SchemaMigration record, so a failing migration leaves no partial state.
+    Returns list of (version, name) tuples that were applied.
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, name, path in discover_migrations(directory):
+        if version in done:
+            continue
+        with open(path, 'r') as f:
+            sql = f.read()
+        try:
+            conn.executescript(
+                "BEGIN;\n" + sql + "\n;"
+                "INSERT INTO SchemaMigration (version, name, applied_at)"
+                f" VALUES ({version}, '{name}', '{datetime.utcnow().isoformat()}');\n"
+                "COMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append((version, name))
+    return applied
+
+
+def pending_migrations(conn, directory=MIGRATIONS_DIR):
+    """Return (version, name) tuples for migrations not yet applied."""
+    done = applied_versions(conn)
+    return [(version, name) for version, name, _ in discover_migrations(directory) if version not in done]
+
+
+def init_db(conn):
+    """Bring a database (new or existing) up to the latest schema version."""
+    apply_schema(conn)
+    return apply_migrations(conn)
+
+
+def migrate_on_startup():
+    """
+    Startup check: bring the escrow database up to the latest schema version.
+    Set ESCROW_DB_MIGRATE_ON_STARTUP=0 to only check; the server then refuses to
+    start (SchemaOutOfDateError) while migrations are pending.
+    Returns list of (version, name) tuples that were applied.
+    """
+    migrate = os.getenv('ESCROW_DB_MIGRATE_ON_STARTUP', '1').lower() in ('1', 'true', 'yes', 'on')
+    with pooled_connection() as conn:
+        if not migrate:
+            pending = pending_migrations(conn)
+            if pending:
+                raise SchemaOutOfDateError(
+                    "Database schema is behind; pending migrations: "
+                    + ", ".join(f"{version:04d}_{name}" for version, name in pending)
+                    + ". Run 'python -m backend.db.migrate'."
+                )
+            return []
+        applied = init_db(conn)
+    for version, name in applied:
+        logger.info("Applied migration %04d %s", version, name)
+    return applied
+
+
+if __name__ == '__main__':
+    # python -m backend.db.migrate           -> apply schema.sql and pending migrations
+    # python -m backend.db.migrate --status  -> list pending migrations without applying
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    with pooled_connection() as conn:
+        if '--status' in sys.argv[1:]:
+            pending = pending_migrations(conn)
+            for version, name in pending:
+                print(f"pending {version:04d} {name}")
+            if not pending:
+                print("Database is up to date")
+        else:
+            for version, name in init_db(conn):
+                print(f"applied {version:04d} {name}")
@@ -0,0 +1,27 @@
+-- Secondary indexes for the hot foreign-key and lookup columns used by backend/db/queries.py.
+-- UNIQUE(project_id, unit_id) on Unit and UNIQUE(unit_id) on Transaction_log already
+-- provide indexes for unit listing by project and transaction lookup by unit.
+
+-- fetch_projects_by_builder and every "p.builder_id = ?" join (dashboard, builder bookings/transactions)
+CREATE INDEX IF NOT EXISTS idx_project_builder ON Project(builder_id);
+
+-- get_unit_internal_id_by_unit_code: the UNIQUE index leads with project_id, so it cannot serve "unit_id = ?"
+CREATE INDEX IF NOT EXISTS idx_unit_code ON Unit(unit_id);
+
+-- fetch_bookings_by_buyer_id: covers the join to Unit without touching the Booking row
+CREATE INDEX IF NOT EXISTS idx_booking_buyer ON Booking(buyer_id, unit_id);
+
+-- fetch_booking_by_unit_id and booking joins from Unit; covers buyer_id and amount for dashboard sums
+CREATE INDEX IF NOT EXISTS idx_booking_unit ON Booking(unit_id, buyer_id, amount);
+
+-- Transaction_log joins on booking_id (admin listing, ON DELETE SET NULL from Booking)
+CREATE INDEX IF NOT EXISTS idx_transaction_booking ON Transaction_log(booking_id);
+
+-- Transactions for a buyer
+CREATE INDEX IF NOT EXISTS idx_transaction_buyer ON Transaction_log(buyer_id);
+
+-- fetch_all_builders: "role = 'builder'"
+CREATE INDEX IF NOT EXISTS idx_user_role ON User(role);
+
+-- get_buyer_by_emirates_id
+CREATE INDEX IF NOT EXISTS idx_buyer_emirates_id ON Buyer(emirates_id);
@@ -0,0 +1,34 @@
+-- Incrementally maintained per-project rollup, kept alongside Project.num_units.
+-- Updated in the same transaction as create_booking, create_transaction and
+-- match_transaction_to_booking; backend/db/project_stats.py rebuilds/verifies it.
+CREATE TABLE IF NOT EXISTS ProjectStats (
+    project_id INTEGER PRIMARY KEY,
+    booked_units INTEGER NOT NULL DEFAULT 0,
+    booking_amount REAL NOT NULL DEFAULT 0,
+    matched_transactions INTEGER NOT NULL DEFAULT 0,
+    unmatched_transactions INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (project_id) REFERENCES Project(id) ON DELETE CASCADE
+);
+
+-- Backfill from existing bookings and transactions
+INSERT OR REPLACE INTO ProjectStats
+    (project_id, booked_units, booking_amount, matched_transactions, unmatched_transactions)
+SELECT
+    p.id,
+    COALESCE(bk.booked_units, 0),
+    COALESCE(bk.booking_amount, 0),
+    COALESCE(tx.matched_transactions, 0),
+    COALESCE(tx.unmatched_transactions, 0)
+FROM Project p
+LEFT JOIN (
+    SELECT u.project_id, COUNT(*) AS booked_units, SUM(b.amount) AS booking_amount
+    FROM Booking b JOIN Unit u ON u.id = b.unit_id
+    GROUP BY u.project_id
+) bk ON bk.project_id = p.id
+LEFT JOIN (
+    SELECT u.project_id,
+           COUNT(t.booking_id) AS matched_transactions,
+           COUNT(*) - COUNT(t.booking_id) AS unmatched_transactions
+    FROM Transaction_log t JOIN Unit u ON u.id = t.unit_id
+    GROUP BY u.project_id
+) tx ON tx.project_id = p.id;
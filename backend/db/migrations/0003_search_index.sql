@@ -0,0 +1,54 @@
+-- FTS5 search index for admin search (backend/db/queries.py: search_projects_by_name,
+-- fetch_bookings_by_buyer_or_unit). Each index is an external-content table over the
+-- searched column, so it stores only the inverted index and reads rows from the base
+-- table. Triggers keep it in sync; UPDATE triggers fire only when the indexed column
+-- changes, so counter updates (Project.num_units, Unit.booked) cost nothing extra.
+-- prefix='2 3' adds prefix indexes so "tok"* queries do not walk the whole term list.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS ProjectSearch USING fts5(
+    name, content='Project', content_rowid='id', prefix='2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS BuyerSearch USING fts5(
+    name, content='Buyer', content_rowid='id', prefix='2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS UnitSearch USING fts5(
+    unit_id, content='Unit', content_rowid='id', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS project_search_insert AFTER INSERT ON Project BEGIN
+    INSERT INTO ProjectSearch (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS project_search_delete AFTER DELETE ON Project BEGIN
+    INSERT INTO ProjectSearch (ProjectSearch, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS project_search_update AFTER UPDATE OF name ON Project BEGIN
+    INSERT INTO ProjectSearch (ProjectSearch, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO ProjectSearch (rowid, name) VALUES (new.id, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS buyer_search_insert AFTER INSERT ON Buyer BEGIN
+    INSERT INTO BuyerSearch (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS buyer_search_delete AFTER DELETE ON Buyer BEGIN
+    INSERT INTO BuyerSearch (BuyerSearch, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS buyer_search_update AFTER UPDATE OF name ON Buyer BEGIN
+    INSERT INTO BuyerSearch (BuyerSearch, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO BuyerSearch (rowid, name) VALUES (new.id, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS unit_search_insert AFTER INSERT ON Unit BEGIN
+    INSERT INTO UnitSearch (rowid, unit_id) VALUES (new.id, new.unit_id);
+END;
+CREATE TRIGGER IF NOT EXISTS unit_search_delete AFTER DELETE ON Unit BEGIN
+    INSERT INTO UnitSearch (UnitSearch, rowid, unit_id) VALUES ('delete', old.id, old.unit_id);
+END;
+CREATE TRIGGER IF NOT EXISTS unit_search_update AFTER UPDATE OF unit_id ON Unit BEGIN
+    INSERT INTO UnitSearch (UnitSearch, rowid, unit_id) VALUES ('delete', old.id, old.unit_id);
+    INSERT INTO UnitSearch (rowid, unit_id) VALUES (new.id, new.unit_id);
+END;
+
+-- Backfill from existing rows
+INSERT INTO ProjectSearch (ProjectSearch) VALUES ('rebuild');
+INSERT INTO BuyerSearch (BuyerSearch) VALUES ('rebuild');
+INSERT INTO UnitSearch (UnitSearch) VALUES ('rebuild');
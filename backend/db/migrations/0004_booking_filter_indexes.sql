@@ -0,0 +1,4 @@
+-- Range indexes for the composite admin booking filter (backend/db/filters.py):
+-- booking date and amount ranges can drive the filter when they are the most selective.
+CREATE INDEX IF NOT EXISTS idx_booking_date ON Booking(date);
+CREATE INDEX IF NOT EXISTS idx_booking_amount ON Booking(amount);
@@ -0,0 +1,6 @@
+-- Idempotency keys for bulk transaction ingest (backend/services/transaction_import.py).
+-- Each statement row carries a key derived from its bank reference (or its contents);
+-- the unique index lets a re-uploaded statement skip rows that were already recorded.
+-- NULL keys (single transactions from POST /buyer/transactions) never conflict.
+ALTER TABLE Transaction_log ADD COLUMN idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transaction_idempotency_key ON Transaction_log(idempotency_key);
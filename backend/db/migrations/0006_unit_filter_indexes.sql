@@ -0,0 +1,6 @@
+-- Range and sort indexes for unit listings (backend/db/filters.py build_unit_filter):
+-- price, area and floor ranges within a project, and pages sorted by those columns,
+-- are read in index order. Unit.booked is not indexed, so booking a unit touches none of them.
+CREATE INDEX IF NOT EXISTS idx_unit_project_price ON Unit(project_id, price);
+CREATE INDEX IF NOT EXISTS idx_unit_project_area ON Unit(project_id, area);
+CREATE INDEX IF NOT EXISTS idx_unit_project_floor ON Unit(project_id, floor);
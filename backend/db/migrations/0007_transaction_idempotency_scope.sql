@@ -0,0 +1,10 @@
+-- Scope transaction idempotency keys to the project of the paid unit.
+-- Bank references are only unique within one builder's statements, so a key
+-- recorded for one project must not swallow the same reference in another.
+-- Existing keyed rows take the project of their unit.
+ALTER TABLE Transaction_log ADD COLUMN idempotency_scope INTEGER;
+UPDATE Transaction_log
+SET idempotency_scope = (SELECT project_id FROM Unit WHERE Unit.id = Transaction_log.unit_id)
+WHERE idempotency_key IS NOT NULL;
+DROP INDEX IF EXISTS idx_transaction_idempotency_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transaction_idempotency ON Transaction_log(idempotency_key, idempotency_scope);
@@ -0,0 +1,247 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from backend.db.query_plan import explain_query_plan
+from backend.utils.metrics import Histogram
+
+# Instrumentation for the data-access layer.
+# - @profiled wraps each function in queries.py and records call count, latency
+#   histogram, rows fetched and errors per function.
+# - ProfiledCursor (handed out by pooled connections) times every statement,
+#   counts fetched rows and records errors that queries.py would otherwise swallow.
+# - Statements slower than ESCROW_SLOW_QUERY_MS are logged with their
+#   EXPLAIN QUERY PLAN and kept in a short in-memory slow-query log.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 100.0
+SLOW_LOG_SIZE = 50
+
+# Name of the queries.py function currently running on this thread/context
+_current_function = contextvars.ContextVar('current_query_function', default=None)
+
+_lock = threading.Lock()
+_functions = {}
+_slow_log = deque(maxlen=SLOW_LOG_SIZE)
+_settings = {'slow_query_ms': float(os.getenv('ESCROW_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS))}
+
+
+def configure_profiler(slow_query_ms=None):
+    """Change the slow-query threshold (milliseconds) at runtime."""
+    if slow_query_ms is not None:
+        _settings['slow_query_ms'] = float(slow_query_ms)
+
+
+def _function_stats(name):
+    """Return the stats record for a function, creating it; caller holds _lock."""
+    stats = _functions.get(name)
+    if stats is None:
+        stats = _functions[name] = {'calls': 0, 'errors': 0, 'rows': 0, 'latency_ms': Histogram()}
+    return stats
+
+
+def _record_call(name, elapsed_ms, failed):
+    with _lock:
+        stats = _function_stats(name)
+        stats['calls'] += 1
+        stats['latency_ms'].observe(elapsed_ms)
+        if failed:
+            stats['errors'] += 1
+
+
+def _record_rows(count):
+    name = _current_function.get()
+    if name is None or not count:
+        return
+    with _lock:
+        _function_stats(name)['rows'] += count
+
+
+def _record_error(sql, error):
+    name = _current_function.get()
+    logger.warning("Query error in %s: %s | %s", name or '<unprofiled>', error, ' '.join(sql.split()))
+    if name is None:
+        return
+    with _lock:
+        _function_stats(name)['errors'] += 1
+
+
+def _profile_generator(name, gen, started):
+    """Drive a generator returned by a data-access function, attributing its work to `name`."""
+    failed = False
+    try:
+        while True:
+            token = _current_function.set(name)
+            try:
+                item = next(gen)
+            except StopIteration:
+                return
+            finally:
+                _current_function.reset(token)
+            yield item
+    except GeneratorExit:
+        gen.close()
+        raise
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _record_call(name, (time.perf_counter() - started) * 1000, failed)
+
+
+def profiled(fn):
+    """
+    Record latency, rows and errors for a data-access function.
+    Functions that return a generator are timed across its whole iteration.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_function.set(name)
+        started = time.perf_counter()
+        failed = False
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result if not inspect.isgenerator(result) else _profile_generator(name, result, started)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _current_function.reset(token)
+            if not inspect.isgenerator(result):
+                _record_call(name, (time.perf_counter() - started) * 1000, failed)
+    return wrapper
+
+
+class ProfiledCursor:
+    """
+    Wrapper around sqlite3.Cursor that times each statement (execute plus the
+    fetches that follow it), counts fetched rows and records errors.
+    Other attributes (lastrowid, rowcount, description, ...) are forwarded.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._params = ()
+        self._elapsed = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def _begin(self, sql, params):
+        self._finish()
+        self._sql, self._params, self._elapsed = sql, params, 0.0
+
+    def _finish(self):
+        """Close out the current statement, logging it if it was slow."""
+        sql, self._sql = self._sql, None
+        if sql is None:
+            return
+        elapsed_ms = self._elapsed * 1000
+        if elapsed_ms < _settings['slow_query_ms']:
+            return
+        try:
+            plan = explain_query_plan(self._cursor.connection, sql, self._params)
+        except sqlite3.Error:
+            plan = []
+        entry = {
+            'function': _current_function.get(),
+            'sql': ' '.join(sql.split()),
+            'elapsed_ms': round(elapsed_ms, 3),
+            'plan': plan,
+            'at': time.time(),
+        }
+        with _lock:
+            _slow_log.append(entry)
+        logger.warning("Slow query in %s (%.1f ms): %s | plan: %s",
+                       entry['function'] or '<unprofiled>', elapsed_ms, entry['sql'], '; '.join(plan))
+
+    def execute(self, sql, params=()):
+        self._begin(sql, params)
+        try:
+            self._timed(self._cursor.execute, sql, params)
+        except Exception as error:
+            _record_error(sql, error)
+            raise
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        # Plan the statement with its first parameter set if it turns out to be slow
+        self._begin(sql, seq_of_params[0] if seq_of_params else ())
+        try:
+            self._timed(self._cursor.executemany, sql, seq_of_params)
+        except Exception as error:
+            _record_error(sql, error)
+            raise
+        return self
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            _record_rows(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, *(() if size is None else (size,)))
+        _record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        _record_rows(len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+
+def query_stats():
+    """
+    Per-function counters for the data-access layer:
+    {name: {'calls', 'errors', 'rows', 'latency_ms': histogram snapshot}}.
+    """
+    with _lock:
+        return {
+            name: {
+                'calls': stats['calls'],
+                'errors': stats['errors'],
+                'rows': stats['rows'],
+                'latency_ms': stats['latency_ms'].snapshot(),
+            }
+            for name, stats in _functions.items()
+        }
+
+
+def slow_queries():
+    """Most recent slow statements (newest last) with their query plans."""
+    with _lock:
+        return list(_slow_log)
+
+
+def reset_profiler():
+    """Clear all recorded statistics and the slow-query log."""
+    with _lock:
+        _functions.clear()
+        _slow_log.clear()
@@ -0,0 +1,116 @@
+import sys
+
+from backend.db.db_connection import pooled_connection
+
+# Maintenance for the incrementally maintained per-project counters:
+# Project.num_units and the ProjectStats rollup (booked units, booking amount,
+# matched/unmatched transactions). Recomputes them from the base tables to
+# detect drift and, on request, overwrite the stored values.
+
+STAT_COLUMNS = (
+    'num_units',
+    'booked_units',
+    'booking_amount',
+    'matched_transactions',
+    'unmatched_transactions',
+)
+
+# Full recomputation from Unit, Booking and Transaction_log (one row per project)
+_RECOMPUTE_SQL = """
+    SELECT
+        p.id AS project_id,
+        (SELECT COUNT(*) FROM Unit u WHERE u.project_id = p.id) AS num_units,
+        COALESCE(bk.booked_units, 0) AS booked_units,
+        COALESCE(bk.booking_amount, 0) AS booking_amount,
+        COALESCE(tx.matched_transactions, 0) AS matched_transactions,
+        COALESCE(tx.unmatched_transactions, 0) AS unmatched_transactions
+    FROM Project p
+    LEFT JOIN (
+        SELECT u.project_id, COUNT(*) AS booked_units, SUM(b.amount) AS booking_amount
+        FROM Booking b JOIN Unit u ON u.id = b.unit_id
+        GROUP BY u.project_id
+    ) bk ON bk.project_id = p.id
+    LEFT JOIN (
+        SELECT u.project_id,
+               COUNT(t.booking_id) AS matched_transactions,
+               COUNT(*) - COUNT(t.booking_id) AS unmatched_transactions
+        FROM Transaction_log t JOIN Unit u ON u.id = t.unit_id
+        GROUP BY u.project_id
+    ) tx ON tx.project_id = p.id
+"""
+
+_STORED_SQL = """
+    SELECT
+        p.id AS project_id,
+        p.num_units AS num_units,
+        s.booked_units AS booked_units,
+        s.booking_amount AS booking_amount,
+        s.matched_transactions AS matched_transactions,
+        s.unmatched_transactions AS unmatched_transactions
+    FROM Project p
+    LEFT JOIN ProjectStats s ON s.project_id = p.id
+"""
+
+
+def verify_project_stats(conn):
+    """
+    Compare stored counters with a from-scratch recomputation.
+    Returns list of drift records: {'project_id', 'column', 'stored', 'expected'}.
+    A project with no ProjectStats row reports stored=None for each rollup column.
+    """
+    expected = {row['project_id']: row for row in conn.execute(_RECOMPUTE_SQL)}
+    drift = []
+    for stored in conn.execute(_STORED_SQL):
+        actual = expected[stored['project_id']]
+        for column in STAT_COLUMNS:
+            if stored[column] is None or abs(stored[column] - actual[column]) > 1e-9:
+                drift.append({
+                    'project_id': stored['project_id'],
+                    'column': column,
+                    'stored': stored[column],
+                    'expected': actual[column],
+                })
+    return drift
+
+
+def rebuild_project_stats(conn):
+    """
+    Overwrite Project.num_units and every ProjectStats row with recomputed values
+    in a single transaction. Returns the drift that was corrected.
+    """
+    drift = verify_project_stats(conn)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM ProjectStats")
+        conn.execute(
+            "INSERT INTO ProjectStats"
+            " (project_id, booked_units, booking_amount, matched_transactions, unmatched_transactions)"
+            " SELECT project_id, booked_units, booking_amount, matched_transactions, unmatched_transactions"
+            " FROM (" + _RECOMPUTE_SQL + ")"
+        )
+        conn.execute(
+            "UPDATE Project SET num_units = (SELECT COUNT(*) FROM Unit u WHERE u.project_id = Project.id)"
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return drift
+
+
+if __name__ == '__main__':
+    # python -m backend.db.project_stats            -> report drift (exit 1 if any)
+    # python -m backend.db.project_stats --rebuild  -> recompute and overwrite the counters
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    with pooled_connection() as conn:
+        if '--rebuild' in sys.argv[1:]:
+            drift = rebuild_project_stats(conn)
+            print(f"Rebuilt project counters; corrected {len(drift)} drifted value(s)")
+        else:
+            drift = verify_project_stats(conn)
+            for item in drift:
+                print(f"project {item['project_id']}: {item['column']} stored={item['stored']} expected={item['expected']}")
+            print("No drift" if not drift else f"{len(drift)} drifted value(s)")
+            sys.exit(1 if drift else 0)
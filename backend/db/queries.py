@@ -1,635 +1,1277 @@
 import sqlite3
-from backend.db.db_connection import get_connection
+from backend.db.db_connection import begin_immediate, pooled_connection, retry_on_busy
+from backend.db.filters import build_booking_filter, build_unit_filter, fts_query
+from backend.db.group_commit import group_commit_writer
+from backend.db.profiler import profiled
 
 # --- Data access layer: raw SQL queries for Users, Buyers, Projects, Units, Bookings, Transactions, and Dashboard ---
-# Each function opens a new DB connection, executes its query, handles errors, and closes the connection.
+# Each function borrows a pooled DB connection, executes its query, handles errors, and returns the connection to the pool.
+# Public functions are wrapped with @profiled so their latency, rows and errors show up in /admin/metrics.
+# Single-row writes go through _write(), which commits them on their own or, with group commit
+# enabled (see group_commit.py), together with concurrent writes.
+
+def _bump_project_stats(cursor, unit_id, booked_units=0, booking_amount=0,
+                        matched_transactions=0, unmatched_transactions=0):
+    """
+    Apply deltas to the ProjectStats row of the project owning `unit_id`.
+    Must run on the caller's cursor so it commits or rolls back with the write it describes.
+    """
+    cursor.execute(
+        "UPDATE ProjectStats SET"
+        " booked_units = booked_units + ?,"
+        " booking_amount = booking_amount + ?,"
+        " matched_transactions = matched_transactions + ?,"
+        " unmatched_transactions = unmatched_transactions + ?"
+        " WHERE project_id = (SELECT project_id FROM Unit WHERE id = ?)",
+        (booked_units, booking_amount, matched_transactions, unmatched_transactions, unit_id)
+    )
+
+def _write(statements, failure=None):
+    """
+    Run statements(cursor) as one write and commit it.
+    With group commit enabled the write is committed together with concurrent
+    writes by the group commit writer; otherwise in its own transaction.
+    Returns what statements() returned, or `failure` if it raised or the commit failed.
+    """
+    writer = group_commit_writer()
+    if writer is not None:
+        try:
+            return writer.submit(statements)
+        except Exception:
+            return failure
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            result = statements(cursor)
+            conn.commit()
+            return result
+        except Exception:
+            # Rollback on error and signal failure
+            conn.rollback()
+            return failure
+        finally:
+            cursor.close()
+
+def _keyset(sql, params, id_column, after_id=None, limit=None):
+    """
+    Append keyset pagination to a SELECT: rows with `id_column` > after_id,
+    ordered by `id_column`, at most `limit` rows (no limit when None).
+    Returns the (sql, params) pair to execute.
+    """
+    params = list(params)
+    if after_id is not None:
+        sql += (" AND " if " WHERE " in sql else " WHERE ") + f"{id_column} > ?"
+        params.append(after_id)
+    sql += f" ORDER BY {id_column}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+def _ranked(sql, params, after=None, limit=None):
+    """
+    Order a search SELECT exposing `rank` and `id` columns by relevance, then id,
+    resuming after the (rank, id) pair of the previous page and returning at most
+    `limit` rows. Returns the (sql, params) pair to execute.
+    """
+    sql = f"SELECT * FROM ({sql})"
+    params = list(params)
+    if after is not None:
+        sql += " WHERE rank > ? OR (rank = ? AND id > ?)"
+        params.extend((after[0], after[0], after[1]))
+    sql += " ORDER BY rank, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+def _iter_rows(sql, params=(), batch_size=500):
+    """
+    Stream a query's rows as dicts, pulling `batch_size` rows at a time with fetchmany.
+    The pooled connection is held until the generator is exhausted or closed.
+    A DB error is raised to the consumer: stopping quietly would pass off a cut-short
+    stream as a complete one.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
 
 # ---------- User ----------
 
+@profiled
 def get_user_by_email(email):
     """
     Fetch a single user record by email.
     Returns a dict of user columns or None if not found/error.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM User WHERE email = ?", (email,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        # On any DB error, return None
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT * FROM User WHERE email = ?", (email,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            # On any DB error, return None
+            return None
+        finally:
+            cursor.close()
 
 
+@profiled
 def create_user(name, email, password_hash, role, created_at):
     """
     Insert a new user into the User table.
     Returns the new user ID or None on failure.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
         cursor.execute(
             "INSERT INTO User VALUES (NULL,?,?,?,?,?)",
             (name, email, password_hash, role, created_at)
         )
-        conn.commit()
         return cursor.lastrowid
-    except Exception:
-        # Rollback on error and signal failure
-        conn.rollback()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+
+    return _write(statements)
+
+
+@profiled
+def update_user_password_hash(user_id, password_hash):
+    """
+    Replace a user's stored password hash (used to upgrade the bcrypt cost on login).
+    Returns True on success, False on failure.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE User SET password_hash = ? WHERE id = ?", (password_hash, user_id))
+            conn.commit()
+            return cursor.rowcount == 1
+        except Exception:
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
 
 # ---------- Buyer ----------
 
+@profiled
 def get_buyer_by_email(email):
     """
     Fetch a single buyer record by email.
     Returns a dict of buyer columns or None if not found/error.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM Buyer WHERE email = ?", (email,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT * FROM Buyer WHERE email = ?", (email,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 
+@profiled
 def get_buyer_by_emirates_id(emirates_id):
     """
     Fetch a single buyer record by Emirates ID.
     Returns dict or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM Buyer WHERE emirates_id = ?", (emirates_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT * FROM Buyer WHERE emirates_id = ?", (emirates_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 
+@profiled
 def create_buyer(name, emirates_id, phone_number, email, password_hash, created_at):
     """
     Insert a new buyer into the Buyer table.
     Returns new buyer ID or None on failure.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
         cursor.execute(
             """
             INSERT INTO Buyer 
             VALUES (NULL, ?, ?, ?, ?, ?, ?)""",
             (name, emirates_id, phone_number, email, password_hash, created_at)
         )
-        conn.commit()
         return cursor.lastrowid
-    except Exception:
-        conn.rollback()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+
+    return _write(statements)
+
+
+@profiled
+def update_buyer_password_hash(buyer_id, password_hash):
+    """
+    Replace a buyer's stored password hash (used to upgrade the bcrypt cost on login).
+    Returns True on success, False on failure.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE Buyer SET password_hash = ? WHERE id = ?", (password_hash, buyer_id))
+            conn.commit()
+            return cursor.rowcount == 1
+        except Exception:
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
 
 # ---------- Project ----------
 
+@profiled
 def insert_project(builder_id, name, location, num_units, created_at):
     """
     Insert a new project record for a builder.
     Returns new project ID or None on failure.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
         cursor.execute(
             "INSERT INTO Project (builder_id, name, location, num_units, created_at) VALUES (?, ?, ?, ?, ?)",
             (builder_id, name, location, num_units, created_at)
         )
-        conn.commit()
-        return cursor.lastrowid
-    except Exception:
-        conn.rollback()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+        project_id = cursor.lastrowid
+        # Start the project's rollup row at zero
+        cursor.execute("INSERT INTO ProjectStats (project_id) VALUES (?)", (project_id,))
+        return project_id
 
+    return _write(statements)
 
-def fetch_projects_by_builder(builder_id):
+
+@profiled
+def fetch_projects_by_builder(builder_id, after_id=None, limit=None):
     """
-    Retrieve all projects associated with a builder.
+    Retrieve projects associated with a builder, ordered by id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts (projects) or empty list on error.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM Project WHERE builder_id = ?", (builder_id,))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT * FROM Project WHERE builder_id = ?", (builder_id,),
+                "id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 # ---------- Unit ----------
 
+@profiled
 def insert_unit(project_id, unit_id, floor, area, price, created_at):
     """
     Insert a new unit under a project.
     Returns new unit row ID or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
         cursor.execute(
             "INSERT INTO Unit (project_id, unit_id, floor, area, price, created_at) VALUES (?, ?, ?, ?, ?, ?)",
             (project_id, unit_id, floor, area, price, created_at)
         )
         id = cursor.lastrowid
         cursor.execute("UPDATE Project SET num_units = num_units + 1 WHERE id = ?", (project_id, ))
-        conn.commit()
         return id
-    except Exception:
-        conn.rollback()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
 
+    return _write(statements)
+
+
+@profiled
+def insert_units_bulk(project_id, units, created_at):
+    """
+    Insert many units under a project in one transaction.
+    - `units` is a list of (unit_id, floor, area, price) tuples.
+    - Codes that already exist in the project, or repeat within the batch, are
+      not inserted and are reported as conflicts instead.
+    - num_units is adjusted once for the whole batch.
+    Returns (created, conflicts) where created is a list of {'id', 'unit_id'} and
+    conflicts a list of {'unit_id', 'reason'}; or None on failure.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Take the write lock up front so the existing-code check and the
+            # inserted id range cannot be invalidated by a concurrent writer
+            cursor.execute("BEGIN IMMEDIATE")
+            # Look up only this batch's codes, in slices that stay under SQLite's variable limit
+            codes = list({unit[0] for unit in units})
+            existing = set()
+            for start in range(0, len(codes), 500):
+                batch = codes[start:start + 500]
+                cursor.execute(
+                    "SELECT unit_id FROM Unit WHERE project_id = ? AND unit_id IN (%s)" % ",".join("?" * len(batch)),
+                    (project_id, *batch)
+                )
+                existing.update(row['unit_id'] for row in cursor.fetchall())
+
+            rows, conflicts, seen = [], [], set()
+            for unit_id, floor, area, price in units:
+                if unit_id in existing:
+                    conflicts.append({'unit_id': unit_id, 'reason': 'Unit already exists in project'})
+                elif unit_id in seen:
+                    conflicts.append({'unit_id': unit_id, 'reason': 'Duplicate unit in batch'})
+                else:
+                    seen.add(unit_id)
+                    rows.append((project_id, unit_id, floor, area, price, created_at))
+
+            created = []
+            if rows:
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Unit")
+                last_id = cursor.fetchone()[0]
+                cursor.executemany(
+                    "INSERT INTO Unit (project_id, unit_id, floor, area, price, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                cursor.execute(
+                    "UPDATE Project SET num_units = num_units + ? WHERE id = ?",
+                    (len(rows), project_id)
+                )
+                # Rows above the previous max id were written by this transaction
+                cursor.execute(
+                    "SELECT id, unit_id FROM Unit WHERE project_id = ? AND id > ? ORDER BY id",
+                    (project_id, last_id)
+                )
+                created = [dict(row) for row in cursor.fetchall()]
+            conn.commit()
+            return created, conflicts
+        except Exception:
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
 
-def fetch_units_by_project(project_id):
+
+@profiled
+def fetch_units_by_project(project_id, after=None, limit=None, filters=None, sort='id'):
     """
-    Retrieve all units for a given project, including builder name.
+    Retrieve units for a given project, including builder name.
+    - `filters` narrows the units by floor/price/area ranges and booked status
+      (see filters.parse_unit_filters); `sort` is one of filters.UNIT_SORTS.
+    - Supports keyset pagination via after/limit: `after` is the last id of the
+      previous page, or its (sort value, id) pair when sorted by another column.
     Returns list of dicts or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT u.*, b.name AS builder_name"
-            " FROM Unit u"
-            " JOIN Project p ON u.project_id = p.id"
-            " LEFT JOIN User b ON b.id = p.builder_id"
-            " WHERE u.project_id = ?",
-            (project_id,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*build_unit_filter(project_id, filters, sort, after, limit))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+@profiled
+def fetch_unit_availability(project_id):
+    """
+    Retrieve the columns the availability index needs for a project's units, ordered by id.
+    Returns list of (id, unit_id, floor, area, price, booked, created_at, builder_name)
+    tuples, or None on error.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT u.id, u.unit_id, u.floor, u.area, u.price, u.booked, u.created_at, b.name"
+                " FROM Unit u"
+                " JOIN Project p ON u.project_id = p.id"
+                " LEFT JOIN User b ON b.id = p.builder_id"
+                " WHERE u.project_id = ? ORDER BY u.id",
+                (project_id,)
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 # ---------- Booking ----------
 
+@profiled
 def create_booking(unit_id, buyer_id, amount, date, created_at):
     """
-    Create a new booking and mark the unit as booked.
-    Returns booking ID or None.
+    Reserve a free unit and create its booking atomically.
+    - The write lock is taken up front (BEGIN IMMEDIATE); the unit is claimed with a
+      conditional UPDATE on booked = 0, and only if that changed the row is the
+      booking inserted, so two buyers racing for one unit cannot both succeed.
+    - A unit already seen as booked is turned away before taking the lock, so
+      buyers losing a race for a hot unit do not queue behind its writers.
+    - Attempts that find the database locked back off and retry, re-checking the
+      unit each time, so once it is taken the waiting buyers are turned away.
+    - With group commit enabled the claim is simply handed to the group commit
+      writer, which already serialises writes.
+    Returns booking ID, or None if the unit is already booked, missing, or on error.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        # Insert booking record
+    def claim(cursor):
+        cursor.execute("UPDATE Unit SET booked = 1 WHERE id = ? AND booked = 0", (unit_id,))
+        if cursor.rowcount != 1:
+            # Someone else holds the unit (or it does not exist)
+            return None
         cursor.execute(
             "INSERT INTO Booking (unit_id, buyer_id, amount, date, created_at)"
             " VALUES (?, ?, ?, ?, ?)",
             (unit_id, buyer_id, amount, date, created_at)
         )
         booking_id = cursor.lastrowid
-        # Mark unit as booked
-        cursor.execute("UPDATE Unit SET booked = 1 WHERE id = ?", (unit_id,))
-        conn.commit()
+        _bump_project_stats(cursor, unit_id, booked_units=1, booking_amount=amount)
         return booking_id
+
+    if group_commit_writer() is not None:
+        return _write(claim)
+
+    def attempt():
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT booked FROM Unit WHERE id = ?", (unit_id,))
+                row = cursor.fetchone()
+                if row is None or row['booked']:
+                    return None
+                begin_immediate(conn)
+                booking_id = claim(cursor)
+                if booking_id is None:
+                    conn.rollback()
+                    return None
+                conn.commit()
+                return booking_id
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    try:
+        return retry_on_busy(attempt)
     except Exception:
-        conn.rollback()
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 
-def fetch_booking_by_unit_id(unit_id):
+@profiled
+def create_bookings_batch(bookings, created_at):
     """
-    Retrieve a single booking by unit internal ID.
-    Returns dict or None.
+    Reserve units and create bookings for many requests in one transaction, in list order.
+    - `bookings` is a list of (unit_id, buyer_id, amount, date) tuples.
+    - Each unit is claimed with a conditional UPDATE on booked = 0, so the first
+      request for a unit wins and later ones (in this batch or after it) are refused.
+    - Each booking runs inside its own SAVEPOINT, so a row that fails is undone on
+      its own and the rest of the batch still commits.
+    - ProjectStats is adjusted once per project for the whole batch, from the
+      booking rows actually written.
+    Returns a list aligned with `bookings` of (booking_id, reason) pairs: the booking ID
+    and None when written, otherwise None and why not ('unit_booked', 'unit_missing' or
+    'row_failed'); None instead of a list on failure.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    def attempt():
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                begin_immediate(conn)
+                results = []
+                for unit_id, buyer_id, amount, date in bookings:
+                    cursor.execute("SAVEPOINT booking_row")
+                    try:
+                        cursor.execute("UPDATE Unit SET booked = 1 WHERE id = ? AND booked = 0", (unit_id,))
+                        if cursor.rowcount != 1:
+                            cursor.execute("SELECT 1 FROM Unit WHERE id = ?", (unit_id,))
+                            results.append((None, 'unit_booked' if cursor.fetchone() else 'unit_missing'))
+                        else:
+                            cursor.execute(
+                                "INSERT INTO Booking (unit_id, buyer_id, amount, date, created_at)"
+                                " VALUES (?, ?, ?, ?, ?)",
+                                (unit_id, buyer_id, amount, date, created_at)
+                            )
+                            results.append((cursor.lastrowid, None))
+                    except sqlite3.Error:
+                        # Undo only this booking; the rest of the batch goes ahead
+                        cursor.execute("ROLLBACK TO booking_row")
+                        results.append((None, 'row_failed'))
+                    cursor.execute("RELEASE booking_row")
+
+                # Move the rollup counters once per project rather than once per booking
+                booked = [booking_id for booking_id, _ in results if booking_id is not None]
+                per_project = []
+                for start in range(0, len(booked), 500):
+                    batch = booked[start:start + 500]
+                    cursor.execute(
+                        "SELECT Unit.project_id, COUNT(*), TOTAL(Booking.amount) FROM Booking"
+                        " JOIN Unit ON Unit.id = Booking.unit_id"
+                        " WHERE Booking.id IN (%s) GROUP BY Unit.project_id" % ",".join("?" * len(batch)),
+                        batch
+                    )
+                    per_project.extend((count, total, project_id) for project_id, count, total in cursor.fetchall())
+                cursor.executemany(
+                    "UPDATE ProjectStats SET booked_units = booked_units + ?, booking_amount = booking_amount + ?"
+                    " WHERE project_id = ?",
+                    per_project
+                )
+                conn.commit()
+                return results
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
     try:
-        cursor.execute(
-            "SELECT Booking.*, Buyer.name AS buyer_name"
-            " FROM Booking"
-            " JOIN Buyer ON Booking.buyer_id = Buyer.id"
-            " WHERE unit_id = ?", (unit_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return retry_on_busy(attempt)
     except Exception:
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 
-def fetch_bookings_by_buyer_id(buyer_id):
+@profiled
+def fetch_booking_by_unit_id(unit_id):
     """
-    Retrieve all bookings associated with a buyer.
+    Retrieve a single booking by unit internal ID.
+    Returns dict or None.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT Booking.*, Buyer.name AS buyer_name"
+                " FROM Booking"
+                " JOIN Buyer ON Booking.buyer_id = Buyer.id"
+                " WHERE unit_id = ?", (unit_id,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
+
+
+@profiled
+def fetch_bookings_by_buyer_id(buyer_id, after_id=None, limit=None):
+    """
+    Retrieve bookings associated with a buyer, ordered by booking id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT Booking.*, Unit.unit_id AS unit_number"
-            " FROM Booking"
-            " JOIN Unit ON Booking.unit_id = Unit.id"
-            " WHERE buyer_id = ?", (buyer_id,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT Booking.*, Unit.unit_id AS unit_number"
+                " FROM Booking"
+                " JOIN Unit ON Booking.unit_id = Unit.id"
+                " WHERE buyer_id = ?", (buyer_id,),
+                "Booking.id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
-def fetch_all_bookings():
+_ALL_BOOKINGS_SQL = (
+    "SELECT Booking.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number, Project.name AS project_name"
+    " FROM Booking"
+    " JOIN Buyer ON Booking.buyer_id = Buyer.id"
+    " JOIN Unit ON Booking.unit_id = Unit.id"
+    " JOIN Project ON Project.id = Unit.project_id"
+)
+
+
+@profiled
+def fetch_all_bookings(after_id=None, limit=None):
     """
-    Retrieve all bookings with buyer and unit info.
+    Retrieve bookings with buyer and unit info, ordered by booking id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT Booking.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number, Project.name AS project_name"
-            " FROM Booking"
-            " JOIN Buyer ON Booking.buyer_id = Buyer.id"
-            " JOIN Unit ON Booking.unit_id = Unit.id"
-            " JOIN Project ON Project.id = Unit.project_id"
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(_ALL_BOOKINGS_SQL, (), "Booking.id", after_id, limit))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
+def iter_all_bookings(batch_size=500):
+    """
+    Stream every booking (same columns as fetch_all_bookings) in id order.
+    Yields dicts; memory use is bounded by batch_size regardless of table size.
+    """
+    return _iter_rows(*_keyset(_ALL_BOOKINGS_SQL, (), "Booking.id"), batch_size=batch_size)
 
 # ---------- Transaction ----------
 
+@profiled
 def create_transaction(amount, date, payment_method, created_at, buyer_id, unit_id):
     """
     Create a new transaction record linked to a unit.
     Returns transaction ID or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
         cursor.execute(
             "INSERT INTO Transaction_log (amount, date, payment_method, created_at, buyer_id, unit_id)"
             " VALUES (?, ?, ?, ?, ?, ?)",
             (amount, date, payment_method, created_at, buyer_id, unit_id)
         )
-        conn.commit()
-        return cursor.lastrowid
-    except Exception:
-        conn.rollback()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+        transaction_id = cursor.lastrowid
+        # New transactions start unmatched (booking_id IS NULL)
+        _bump_project_stats(cursor, unit_id, unmatched_transactions=1)
+        return transaction_id
+
+    return _write(statements)
+
+
+@profiled
+def fetch_unit_codes(builder_id=None):
+    """
+    Retrieve every unit's code with the buyer of its booking (None if unbooked),
+    limited to one builder's projects when builder_id is given.
+    Returns list of (id, unit_code, project_id, buyer_id) tuples.
+    """
+    sql = (
+        "SELECT u.id, u.unit_id, u.project_id, b.buyer_id"
+        " FROM Unit u"
+        " LEFT JOIN Booking b ON b.unit_id = u.id"
+    )
+    params = ()
+    if builder_id is not None:
+        sql += " JOIN Project p ON p.id = u.project_id WHERE p.builder_id = ?"
+        params = (builder_id,)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
-def fetch_all_transactions():
+@profiled
+def insert_transactions_bulk(transactions, created_at):
     """
-    Retrieve all transactions with optional booking, buyer, and unit info.
+    Insert many unmatched transactions in one transaction.
+    - `transactions` is a list of (idempotency_scope, idempotency_key, amount,
+      date, payment_method, buyer_id, unit_id) tuples; keys are unique per scope
+      (the project of the unit).
+    - Rows whose key was already recorded in their scope with the same payment
+      details are skipped, so a re-sent batch adds nothing; a recorded key with
+      different details is reported as mismatched instead.
+    - Rows for a unit that already has a transaction are not inserted and are
+      reported as conflicts instead.
+    - ProjectStats is adjusted once per project for the whole batch.
+    Returns (inserted, duplicates, conflicts, mismatched) lists of (scope, key)
+    pairs, or None on failure.
+    """
+    def lookup(cursor, sql, values):
+        # Run an IN (...) lookup in slices that stay under SQLite's variable limit
+        found = []
+        for start in range(0, len(values), 500):
+            batch = values[start:start + 500]
+            cursor.execute(sql % ",".join("?" * len(batch)), batch)
+            found.extend(cursor.fetchall())
+        return found
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Hold the write lock across the checks and the insert
+            cursor.execute("BEGIN IMMEDIATE")
+            # (scope, key) -> (amount, date, payment_method, unit_id) already recorded
+            existing = {(row['idempotency_scope'], row['idempotency_key']):
+                        (row['amount'], row['date'], row['payment_method'], row['unit_id'])
+                        for row in lookup(
+                cursor, "SELECT idempotency_scope, idempotency_key, amount, date, payment_method, unit_id"
+                        " FROM Transaction_log WHERE idempotency_key IN (%s)",
+                list({row[1] for row in transactions}))}
+            paid = {row['unit_id'] for row in lookup(
+                cursor, "SELECT unit_id FROM Transaction_log WHERE unit_id IN (%s)",
+                [row[6] for row in transactions])}
+
+            rows, duplicates, conflicts, mismatched = [], [], [], []
+            for row in transactions:
+                recorded = existing.get(row[:2])
+                if recorded is not None:
+                    if recorded == (row[2], row[3], row[4], row[6]):
+                        duplicates.append(row[:2])
+                    else:
+                        mismatched.append(row[:2])
+                elif row[6] in paid:
+                    conflicts.append(row[:2])
+                else:
+                    rows.append(row)
+            cursor.executemany(
+                "INSERT INTO Transaction_log"
+                " (idempotency_scope, idempotency_key, amount, date, payment_method, buyer_id, unit_id, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*row, created_at) for row in rows]
+            )
+
+            # New transactions start unmatched; move the counters once per project
+            per_project = {}
+            for row in lookup(cursor, "SELECT project_id, COUNT(*) AS added FROM Unit"
+                                      " WHERE id IN (%s) GROUP BY project_id", [row[6] for row in rows]):
+                per_project[row['project_id']] = per_project.get(row['project_id'], 0) + row['added']
+            cursor.executemany(
+                "UPDATE ProjectStats SET unmatched_transactions = unmatched_transactions + ? WHERE project_id = ?",
+                [(count, project_id) for project_id, count in per_project.items()]
+            )
+            conn.commit()
+            return [row[:2] for row in rows], duplicates, conflicts, mismatched
+        except Exception:
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
+
+
+_ALL_TRANSACTIONS_SQL = (
+    "SELECT Transaction_log.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number, Project.name AS project_name"
+    " FROM Transaction_log"
+    " LEFT JOIN Booking ON Transaction_log.booking_id = Booking.id"
+    " LEFT JOIN Buyer ON Transaction_log.buyer_id = Buyer.id"
+    " LEFT JOIN Unit ON Booking.unit_id = Unit.id"
+    " LEFT JOIN Project ON Unit.project_id = Project.id"
+)
+
+
+@profiled
+def fetch_all_transactions(after_id=None, limit=None):
+    """
+    Retrieve transactions with optional booking, buyer, and unit info, ordered by id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT Transaction_log.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number, Project.name AS project_name"
-            " FROM Transaction_log"
-            " LEFT JOIN Booking ON Transaction_log.booking_id = Booking.id"
-            " LEFT JOIN Buyer ON Transaction_log.buyer_id = Buyer.id"
-            " LEFT JOIN Unit ON Booking.unit_id = Unit.id"
-            " LEFT JOIN Project ON Unit.project_id = Project.id"
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(_ALL_TRANSACTIONS_SQL, (), "Transaction_log.id", after_id, limit))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
-def fetch_transactions_by_builder(builder_id):
+@profiled
+def iter_all_transactions(batch_size=500):
     """
-    Fetch all transactions (matched and unmatched) for a builder's units.
-    Frontend can filter unmatched by booking_id IS NULL.
-    Returns list of dicts.
+    Stream every transaction (same columns as fetch_all_transactions) in id order.
+    Yields dicts; memory use is bounded by batch_size regardless of table size.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT t.id AS id, t.amount, t.booking_id,"
-            " u.id AS unit_id, u.unit_id AS unit_code"
-            " FROM Transaction_log AS t"
-            " JOIN Unit AS u ON t.unit_id = u.id"
-            " JOIN Project AS p ON u.project_id = p.id"
-            " WHERE p.builder_id = ?",
-            (builder_id,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    return _iter_rows(*_keyset(_ALL_TRANSACTIONS_SQL, (), "Transaction_log.id"), batch_size=batch_size)
 
 
-def fetch_transactions():
+@profiled
+def fetch_transactions_by_builder(builder_id, after_id=None, limit=None):
     """
-    Fetch all transactions for a buyer's bookings.
+    Fetch transactions (matched and unmatched) for a builder's units, ordered by id.
+    Frontend can filter unmatched by booking_id IS NULL.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT t.id AS id, t.amount, t.booking_id,"
-            " u.id AS unit_id"
-            " FROM Transaction_log AS t"
-            " LEFT JOIN Unit AS u ON t.unit_id = u.id"
-            " LEFT JOIN Booking AS b ON u.id = b.unit_id"
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT t.id AS id, t.amount, t.booking_id,"
+                " u.id AS unit_id, u.unit_id AS unit_code"
+                " FROM Transaction_log AS t"
+                " JOIN Unit AS u ON t.unit_id = u.id"
+                " JOIN Project AS p ON u.project_id = p.id"
+                " WHERE p.builder_id = ?",
+                (builder_id,),
+                "t.id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
-# ---------- Dashboard ----------
 
-def fetch_dashboard_data(builder_id):
+@profiled
+def fetch_transactions_by_buyer_id(buyer_id, after_id=None, limit=None):
     """
-    Aggregate key metrics for a builder's dashboard:
-      total_projects, total_units, units_booked,
-      total_booking_amount, unmatched_transactions.
-    Returns dict or None.
+    Retrieve a buyer's transactions with their unit, project and matched booking, ordered by id.
+    The booking is joined through booking_id, so each transaction appears once.
+    Supports keyset pagination via after_id/limit.
+    Returns list of dicts or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT
-              (SELECT COUNT(*) FROM Project WHERE builder_id = ?) AS total_projects,
-              (SELECT COUNT(*) FROM Unit u JOIN Project p ON u.project_id = p.id WHERE p.builder_id = ?) AS total_units,
-              (SELECT COUNT(*) FROM Booking b JOIN Unit u ON b.unit_id = u.id JOIN Project p ON u.project_id = p.id WHERE p.builder_id = ?) AS units_booked,
-              (SELECT COALESCE(SUM(b.amount), 0) FROM Booking b JOIN Unit u ON b.unit_id = u.id JOIN Project p ON u.project_id = p.id WHERE p.builder_id = ?) AS total_booking_amount,
-              (SELECT COUNT(*) FROM Transaction_log t JOIN Unit u ON t.unit_id = u.id JOIN Project p ON u.project_id = p.id WHERE p.builder_id = ? AND t.booking_id IS NULL) AS unmatched_transactions
-            """,
-            (builder_id, builder_id, builder_id, builder_id, builder_id)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT t.id, t.amount, t.date, t.payment_method, t.booking_id, t.unit_id, t.created_at,"
+                " u.unit_id AS unit_number, p.name AS project_name,"
+                " b.amount AS booking_amount, b.date AS booking_date"
+                " FROM Transaction_log AS t"
+                " JOIN Unit AS u ON u.id = t.unit_id"
+                " JOIN Project AS p ON p.id = u.project_id"
+                " LEFT JOIN Booking AS b ON b.id = t.booking_id"
+                " WHERE t.buyer_id = ?", (buyer_id,),
+                "t.id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+# ---------- Dashboard ----------
 
-def fetch_additional_dashboard_data(builder_id):
+@profiled
+def fetch_dashboard_data(builder_id):
     """
-    Aggregate additional metrics for a builder's dashboard:
-      units_per_project, bookings_per_project, amount_per_project, unmatched_transactions_per_project.
-    Returns dict or None.
+    Fetch per-project dashboard metrics for a builder from the ProjectStats rollup:
+      units_per_project, bookings_per_project, amount_per_project,
+      unmatched_transactions_per_project.
+    Reads one row per project; no Booking or Transaction_log aggregation at request time.
+    Returns list of dicts (one per project) or None on error.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT
-                p.id AS project_id,
-                p.name AS name,
-                COUNT(DISTINCT u.id) AS units_per_project,
-                COUNT(DISTINCT b.id) AS bookings_per_project,
-                COALESCE(SUM(b.amount), 0) AS amount_per_project,
-                COUNT(DISTINCT t.id) FILTER (WHERE t.booking_id IS NULL) AS unmatched_transactions_per_project
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT
+                    p.id AS project_id,
+                    p.name AS name,
+                    p.num_units AS units_per_project,
+                    COALESCE(s.booked_units, 0) AS bookings_per_project,
+                    COALESCE(s.booking_amount, 0) AS amount_per_project,
+                    COALESCE(s.unmatched_transactions, 0) AS unmatched_transactions_per_project
                 FROM Project p
-                LEFT JOIN Unit u ON u.project_id = p.id
-                LEFT JOIN Booking b ON b.unit_id = u.id
-                LEFT JOIN Transaction_log t ON t.unit_id = u.id
+                LEFT JOIN ProjectStats s ON s.project_id = p.id
                 WHERE p.builder_id = ?
-                GROUP BY p.id
-            """,
-            (builder_id,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows] if rows else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+                ORDER BY p.id
+                """,
+                (builder_id,)
+            )
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 # ---------- Admin (Global) ----------
 
-def fetch_all_builders():
+@profiled
+def fetch_all_builders(after_id=None, limit=None):
     """
-    Fetch all builder users (id, name, email).
+    Fetch builder users (id, name, email), ordered by id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT id, name, email FROM User WHERE role = 'builder'")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT id, name, email FROM User WHERE role = 'builder'", (),
+                "id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
-def fetch_all_projects():
+@profiled
+def fetch_all_projects(after_id=None, limit=None):
     """
-    Fetch all projects across all builders.
+    Fetch projects across all builders, ordered by id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM Project")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset("SELECT * FROM Project", (), "id", after_id, limit))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
+def iter_all_projects(batch_size=500):
+    """
+    Stream every project in id order.
+    Yields dicts; memory use is bounded by batch_size regardless of table size.
+    """
+    return _iter_rows(*_keyset("SELECT * FROM Project", (), "id"), batch_size=batch_size)
+
+@profiled
+def fetch_platform_overview():
+    """
+    Platform-wide totals for the admin overview, summed from Project and ProjectStats
+    (one row per project).
+    Returns dict or None.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT"
+                " COUNT(p.id) AS total_projects,"
+                " COALESCE(SUM(p.num_units), 0) AS total_units,"
+                " COALESCE(SUM(s.booked_units), 0) AS units_booked,"
+                " COALESCE(SUM(s.booking_amount), 0) AS total_booking_amount,"
+                " COALESCE(SUM(s.matched_transactions), 0) AS matched_transactions,"
+                " COALESCE(SUM(s.unmatched_transactions), 0) AS unmatched_transactions"
+                " FROM Project p"
+                " LEFT JOIN ProjectStats s ON s.project_id = p.id"
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 # ---------- Search Filters ----------
 
-def fetch_bookings_by_buyer_or_unit(query):
+@profiled
+def fetch_bookings_by_buyer_or_unit(query, after=None, limit=None):
     """
-    Search bookings by buyer name or unit code substring.
-    Returns list of dicts.
+    Search bookings by buyer name or unit code through the BuyerSearch/UnitSearch
+    full-text indexes (whole words or word prefixes, case-insensitive).
+    Results are ordered by relevance (best match first), then booking id.
+    Supports keyset pagination via after=(rank, id) and limit.
+    Returns list of dicts (each with its 'rank') or empty list.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        search_term = f"%{query}%"
-        cursor.execute(
-            "SELECT Booking.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number"
-            " FROM Booking"
-            " JOIN Buyer ON Booking.buyer_id = Buyer.id"
-            " JOIN Unit ON Booking.unit_id = Unit.id"
-            " WHERE Buyer.name LIKE ? OR Unit.unit_id LIKE ?",
-            (search_term, search_term)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
+    match = fts_query(query)
+    if match is None:
         return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_ranked(
+                "SELECT Booking.*, Buyer.name AS buyer_name, Unit.unit_id AS unit_number, hits.rank AS rank"
+                " FROM ("
+                "  SELECT id, MIN(rank) AS rank FROM ("
+                "   SELECT Booking.id AS id, BuyerSearch.rank AS rank FROM BuyerSearch"
+                "   JOIN Booking ON Booking.buyer_id = BuyerSearch.rowid WHERE BuyerSearch MATCH ?"
+                "   UNION ALL"
+                "   SELECT Booking.id, UnitSearch.rank FROM UnitSearch"
+                "   JOIN Booking ON Booking.unit_id = UnitSearch.rowid WHERE UnitSearch MATCH ?"
+                "  ) GROUP BY id"
+                " ) AS hits"
+                " JOIN Booking ON Booking.id = hits.id"
+                " JOIN Buyer ON Booking.buyer_id = Buyer.id"
+                " JOIN Unit ON Booking.unit_id = Unit.id",
+                (match, match), after, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
+@profiled
+def search_projects_by_name(query, after=None, limit=None):
+    """
+    Search projects by name through the ProjectSearch full-text index
+    (whole words or word prefixes, case-insensitive).
+    Results are ordered by relevance (best match first), then project id.
+    Supports keyset pagination via after=(rank, id) and limit.
+    Returns list of dicts (each with its 'rank') or empty list.
+    """
+    match = fts_query(query)
+    if match is None:
+        return []
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_ranked(
+                "SELECT Project.*, ProjectSearch.rank AS rank"
+                " FROM ProjectSearch"
+                " JOIN Project ON Project.id = ProjectSearch.rowid"
+                " WHERE ProjectSearch MATCH ?",
+                (match,), after, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
+def filter_bookings(filters, after_id=None, limit=None):
+    """
+    Retrieve bookings matching every filter in `filters` (see filters.parse_booking_filters),
+    with buyer, unit, project and payment status, ordered by booking id.
+    The most selective indexed filter drives the query; the rest are checked on its rows.
+    Supports keyset pagination via after_id/limit.
+    Returns list of dicts or empty list.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            sql, params, _ = build_booking_filter(conn, filters, after_id, limit)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
 def get_unit_internal_id_by_unit_code(unit_id):
     """
     Retrieve internal primary key ID for a unit given its public code.
-    Returns dict {'id': ...} or None.
+    Returns dict {'id', 'project_id', 'booked'} or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT id FROM Unit WHERE unit_id = ?", (unit_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id, project_id, booked FROM Unit WHERE unit_id = ?", (unit_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 
+@profiled
 def get_unit_by_internal_id(unit_code):
     """
     Fetch a unit record by its internal primary key.
     Returns dict or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM Unit WHERE id = ?", (unit_code,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    except Exception:
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT * FROM Unit WHERE id = ?", (unit_code,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            return None
+        finally:
+            cursor.close()
 
 
+@profiled
 def match_transaction_to_booking(transaction_id, booking_id):
     """
     Link a transaction to a booking by updating booking_id.
     Returns number of rows updated (1 if successful, 0 otherwise).
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
+    def statements(cursor):
+        cursor.execute(
+            "SELECT unit_id, booking_id FROM Transaction_log WHERE id = ?",
+            (transaction_id,)
+        )
+        current = cursor.fetchone()
         cursor.execute(
             "UPDATE Transaction_log SET booking_id = ? WHERE id = ?",
             (booking_id, transaction_id)
         )
-        conn.commit()
-        return cursor.rowcount
-    except Exception:
-        conn.rollback()
-        return 0
-    finally:
-        cursor.close()
-        conn.close()
+        updated = cursor.rowcount
+        # Only an unmatched -> matched transition moves the rollup counters
+        if updated and current['booking_id'] is None:
+            _bump_project_stats(cursor, current['unit_id'], matched_transactions=1, unmatched_transactions=-1)
+        return updated
+
+    return _write(statements, failure=0)
+
+@profiled
+def fetch_unmatched_transactions_by_builder(builder_id):
+    """
+    Fetch every unmatched transaction (booking_id IS NULL) on a builder's units,
+    with the columns reconciliation compares: unit_id, buyer_id, amount, date.
+    Returns list of dicts or empty list.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT t.id, t.unit_id, t.buyer_id, t.amount, t.date"
+                " FROM Project AS p"
+                " JOIN Unit AS u ON u.project_id = p.id"
+                " JOIN Transaction_log AS t ON t.unit_id = u.id"
+                " WHERE p.builder_id = ? AND t.booking_id IS NULL",
+                (builder_id,)
+            )
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
+def fetch_unmatched_bookings_by_builder(builder_id):
+    """
+    Fetch every booking on a builder's units that no transaction is matched to yet,
+    with the columns reconciliation compares: unit_id, buyer_id, amount, date.
+    Returns list of dicts or empty list.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT b.id, b.unit_id, b.buyer_id, b.amount, b.date"
+                " FROM Project AS p"
+                " JOIN Unit AS u ON u.project_id = p.id"
+                " JOIN Booking AS b ON b.unit_id = u.id"
+                " WHERE p.builder_id = ?"
+                " AND NOT EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.booking_id = b.id)",
+                (builder_id,)
+            )
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
+
+
+@profiled
+def apply_transaction_matches(builder_id, matches):
+    """
+    Link many transactions to bookings in a single transaction.
+    - `matches` is a list of (transaction_id, booking_id) pairs.
+    - A pair is applied only if the transaction is still unmatched, the booking has
+      no matched transaction yet, and both belong to the builder's projects.
+    - ProjectStats is adjusted once per project for the whole batch.
+    Returns the list of transaction ids that were matched, or None on failure.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            applied = []
+            for transaction_id, booking_id in matches:
+                cursor.execute(
+                    "UPDATE Transaction_log SET booking_id = ?"
+                    " WHERE id = ? AND booking_id IS NULL"
+                    " AND EXISTS (SELECT 1 FROM Unit AS u JOIN Project AS p ON p.id = u.project_id"
+                    "             WHERE u.id = Transaction_log.unit_id AND p.builder_id = ?)"
+                    " AND EXISTS (SELECT 1 FROM Booking AS b JOIN Unit AS u ON u.id = b.unit_id"
+                    "             JOIN Project AS p ON p.id = u.project_id"
+                    "             WHERE b.id = ? AND p.builder_id = ?)"
+                    " AND NOT EXISTS (SELECT 1 FROM Transaction_log AS t WHERE t.booking_id = ?)",
+                    (booking_id, transaction_id, builder_id, booking_id, builder_id, booking_id)
+                )
+                if cursor.rowcount == 1:
+                    applied.append(transaction_id)
+
+            # Move the rollup counters once per project rather than once per match
+            per_project = {}
+            for start in range(0, len(applied), 500):
+                batch = applied[start:start + 500]
+                cursor.execute(
+                    "SELECT u.project_id, COUNT(*) AS matched FROM Transaction_log AS t"
+                    " JOIN Unit AS u ON u.id = t.unit_id"
+                    " WHERE t.id IN (%s) GROUP BY u.project_id" % ",".join("?" * len(batch)),
+                    batch
+                )
+                for row in cursor.fetchall():
+                    per_project[row['project_id']] = per_project.get(row['project_id'], 0) + row['matched']
+            cursor.executemany(
+                "UPDATE ProjectStats SET"
+                " matched_transactions = matched_transactions + ?,"
+                " unmatched_transactions = unmatched_transactions - ?"
+                " WHERE project_id = ?",
+                [(count, count, project_id) for project_id, count in per_project.items()]
+            )
+            conn.commit()
+            return applied
+        except Exception:
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
 
 # ---------- Additional Queries ----------
 
-def fetch_bookings_by_builder_id(builder_id):
+@profiled
+def fetch_bookings_by_builder_id(builder_id, after_id=None, limit=None):
     """
-    Retrieve all bookings for units belonging to a specific builder.
+    Retrieve bookings for units belonging to a specific builder, ordered by booking id.
+    Supports keyset pagination via after_id/limit.
     Returns list of dicts.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT b.*, u.unit_id AS unit_code, byr.name AS buyer_name"
-            " FROM Booking b"
-            " JOIN Unit u ON b.unit_id = u.id"
-            " JOIN Project p ON u.project_id = p.id"
-            " JOIN Buyer byr ON b.buyer_id = byr.id"
-            " WHERE p.builder_id = ?",
-            (builder_id,)
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    except Exception:
-        return []
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_keyset(
+                "SELECT b.*, u.unit_id AS unit_code, byr.name AS buyer_name"
+                " FROM Booking b"
+                " JOIN Unit u ON b.unit_id = u.id"
+                " JOIN Project p ON u.project_id = p.id"
+                " JOIN Buyer byr ON b.buyer_id = byr.id"
+                " WHERE p.builder_id = ?",
+                (builder_id,),
+                "b.id", after_id, limit
+            ))
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception:
+            return []
+        finally:
+            cursor.close()
 
 
+@profiled
 def fetch_project_by_id(project_id):
     """
     Fetch detailed information for a single project, including builder name.
     Returns dict or None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT p.id AS id, p.builder_id AS builder_id, p.name AS name, p.location AS location, p.num_units AS num_units, p.created_at AS created_at, u.name AS builder_name"
-            " FROM Project p"
-            " JOIN User u ON p.builder_id = u.id"
-            " WHERE p.id = ?",
-            (project_id,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT p.id AS id, p.builder_id AS builder_id, p.name AS name, p.location AS location, p.num_units AS num_units, p.created_at AS created_at, u.name AS builder_name"
+                " FROM Project p"
+                " JOIN User u ON p.builder_id = u.id"
+                " WHERE p.id = ?",
+                (project_id,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        finally:
+            cursor.close()
@@ -0,0 +1,52 @@
+import re
+
+# Helpers for inspecting SQLite's EXPLAIN QUERY PLAN output.
+# Used by the query-plan regression tests to catch statements that fall back
+# to a full scan of a large table.
+
+# Tables expected to grow with platform traffic; a full scan of these is a regression
+LARGE_TABLES = {'Unit', 'Booking', 'Transaction_log', 'Buyer'}
+
+_TABLE_REFERENCE = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|GROUP\b|ORDER\b|LIMIT\b)(\w+))?',
+    re.IGNORECASE
+)
+_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def explain_query_plan(conn, sql, params=()):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines for a statement.
+    """
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in rows]
+
+
+def table_aliases(sql):
+    """
+    Map every table name and alias referenced in FROM/JOIN clauses to its table.
+    e.g. "FROM Booking b JOIN Unit AS u" -> {'Booking': 'Booking', 'b': 'Booking', 'Unit': 'Unit', 'u': 'Unit'}
+    """
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql, params=(), tables=LARGE_TABLES):
+    """
+    List the large tables that a statement reads with a full SCAN
+    (including full scans of a covering index) instead of an index SEARCH.
+    """
+    aliases = table_aliases(sql)
+    scanned = []
+    for detail in explain_query_plan(conn, sql, params):
+        match = _SCAN.match(detail)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table in tables:
+            scanned.append(table)
+    return scanned
@@ -31,7 +31,7 @@ CREATE TABLE IF NOT EXISTS Project (
 );
 
 -- Unit Table
-CREATE TABLE Unit (
+CREATE TABLE IF NOT EXISTS Unit (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     project_id INTEGER NOT NULL,
     unit_id TEXT NOT NULL,
@@ -57,7 +57,7 @@ CREATE TABLE IF NOT EXISTS Booking (
 );
 
 -- Transaction Table
-CREATE TABLE Transaction_log (
+CREATE TABLE IF NOT EXISTS Transaction_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     amount REAL NOT NULL,
     date TEXT NOT NULL,
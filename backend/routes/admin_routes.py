@@ -6,18 +6,39 @@ from backend.services.admin_services import (
     get_all_projects,
     get_all_bookings,
     get_all_transactions,
+    export_all_projects,
+    export_all_bookings,
+    export_all_transactions,
+    get_platform_overview,
+    get_metrics,
     filter_projects_by_builder,
     filter_bookings_by_buyer_or_unit,
+    filter_bookings_by_fields,
     filter_projects_by_name
 )
 from backend.services.builder_services import (
     get_project_details,
     get_project_units
 )
+from backend.services.transaction_import import import_transactions
+
+from backend.db.filters import parse_booking_filters, parse_unit_filters, parse_unit_sort
+from backend.utils.pagination import parse_page_args
+from backend.utils.streaming import EXPORT_FORMATS, detect_format
 
 # Blueprint grouping all admin-specific endpoints under '/admin'
 admin_blueprint = Blueprint('admin', __name__)
 
+def _export_format():
+    """
+    Read the optional ?export=json|ndjson parameter used to stream a full table.
+    Returns the format, None when not exporting, or False if the value is invalid.
+    """
+    export = request.args.get('export')
+    if export is None:
+        return None
+    return export if export in EXPORT_FORMATS else False
+
 @admin_blueprint.route('/builders', methods=['GET'])
 def list_builders():
     """
@@ -28,38 +49,98 @@ def list_builders():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    # Delegate to service to retrieve data
-    return get_all_builders()
+    # Delegate to service to retrieve data (paginated by ?limit=&after=)
+    return get_all_builders(*parse_page_args(request.args))
 
 @admin_blueprint.route('/projects', methods=['GET'])
 def list_all_projects():
     """
     GET /admin/projects
-    Return all projects across all builders. Admin-only access.
+    Return projects across all builders, paginated by ?limit=&after=. Admin-only access.
+    With ?export=json|ndjson, stream every project instead.
     """
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
-    return get_all_projects()
+
+    # ?export=json|ndjson streams the whole table instead of one page
+    export = _export_format()
+    if export is False:
+        return jsonify({'status': 'failure', 'message': 'export must be json or ndjson'}), 400
+    if export:
+        return export_all_projects(export)
+    return get_all_projects(*parse_page_args(request.args))
 
 @admin_blueprint.route('/bookings', methods=['GET'])
 def list_all_bookings():
     """
     GET /admin/bookings
-    Return all unit bookings platform-wide. Admin-only access.
+    Return unit bookings platform-wide, paginated by ?limit=&after=. Admin-only access.
+    With ?export=json|ndjson, stream every booking instead.
     """
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
-    return get_all_bookings()
+
+    # ?export=json|ndjson streams the whole table instead of one page
+    export = _export_format()
+    if export is False:
+        return jsonify({'status': 'failure', 'message': 'export must be json or ndjson'}), 400
+    if export:
+        return export_all_bookings(export)
+    return get_all_bookings(*parse_page_args(request.args))
 
 @admin_blueprint.route('/transactions', methods=['GET'])
 def list_all_transactions():
     """
     GET /admin/transactions
-    Return all payment transactions across all builders and bookings. Admin-only access.
+    Return payment transactions across all builders and bookings, paginated by ?limit=&after=. Admin-only access.
+    With ?export=json|ndjson, stream every transaction instead.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    # ?export=json|ndjson streams the whole table instead of one page
+    export = _export_format()
+    if export is False:
+        return jsonify({'status': 'failure', 'message': 'export must be json or ndjson'}), 400
+    if export:
+        return export_all_transactions(export)
+    return get_all_transactions(*parse_page_args(request.args))
+
+@admin_blueprint.route('/transactions/import', methods=['POST'])
+def import_statement_transactions():
+    """
+    POST /admin/transactions/import
+    Bulk-import payments for any project from a CSV or NDJSON bank statement
+    (same row format as /builder/transactions/import). Admin-only access.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    fmt = detect_format(request.mimetype)
+    if fmt is None:
+        return jsonify({'status': 'failure', 'message': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+
+    return import_transactions(request.stream, fmt)
+
+@admin_blueprint.route('/overview', methods=['GET'])
+def platform_overview():
+    """
+    GET /admin/overview
+    Return platform-wide totals for projects, units, bookings and transactions. Admin-only access.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+    return get_platform_overview()
+
+@admin_blueprint.route('/metrics', methods=['GET'])
+def runtime_metrics():
+    """
+    GET /admin/metrics
+    Return query profiler, slow-query log, pool, group commit, hashing, auth cache and unit availability metrics. Admin-only access.
     """
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
-    return get_all_transactions()
+    return get_metrics()
 
 @admin_blueprint.route('/projects/filter', methods=['GET'])
 def filter_projects():
@@ -72,27 +153,30 @@ def filter_projects():
 
     # Read builder_id from query parameters
     builder_id = request.args.get('builder_id')
-    return filter_projects_by_builder(builder_id)
+    return filter_projects_by_builder(builder_id, *parse_page_args(request.args))
 
 @admin_blueprint.route('/bookings/search', methods=['GET'])
 def filter_bookings():
     """
     GET /admin/bookings/search?q=<query>
-    Search bookings by buyer name or unit number. Admin-only.
+    Search bookings by buyer name or unit number, ranked by relevance and
+    paginated by ?limit=&after=. Admin-only.
     """
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
     # 'q' can be buyer name or unit number
     query = request.args.get('q')
-    return filter_bookings_by_buyer_or_unit(query)
+    return filter_bookings_by_buyer_or_unit(query, *parse_page_args(request.args, ranked=bool(query)))
 
 @admin_blueprint.route('/filter', methods=['GET'])
 def general_filter():
     """
-    GET /admin/filter?project_name=<>&buyer_name=<>&unit_id=<>
-    General search endpoint for projects or bookings based on provided parameters.
-    Prioritizes project_name, then buyer_name or unit_id.
+    GET /admin/filter?project_id=&project_name=&builder_id=&buyer_name=&unit_id=
+                     &date_from=&date_to=&min_amount=&max_amount=&status=matched|unmatched|unpaid
+    With any booking filter, return bookings matching all of the given filters in one
+    query, paginated by ?limit=&after=. With only project_name, search projects by
+    name, ranked by relevance and paginated the same way.
     """
     # Ensure user is authenticated
     if 'user_id' not in session:
@@ -101,15 +185,13 @@ def general_filter():
     if session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Forbidden'}), 403
 
-    project_name = request.args.get('project_name')
-    buyer_name = request.args.get('buyer_name')
-    unit_id = request.args.get('unit_id')
+    filters = parse_booking_filters(request.args)
 
     # Delegate to appropriate filter based on parameters
-    if project_name:
-        return filter_projects_by_name(project_name)
-    elif buyer_name or unit_id:
-        return filter_bookings_by_buyer_or_unit(buyer_name or unit_id)
+    if set(filters) - {'project_name'}:
+        return filter_bookings_by_fields(filters, *parse_page_args(request.args))
+    elif 'project_name' in filters:
+        return filter_projects_by_name(filters['project_name'], *parse_page_args(request.args, ranked=True))
 
     # No filters provided: return empty list
     return jsonify([]), 200
@@ -128,10 +210,14 @@ def admin_view_project(project_id):
 @admin_blueprint.route('/projects/<int:project_id>/units', methods=['GET'])
 def admin_list_units(project_id):
     """
-    GET /admin/projects/<project_id>/units
-    List all units for a given project. Admin-only.
+    GET /admin/projects/<project_id>/units?min_floor=&max_floor=&min_price=&max_price=
+                                          &min_area=&max_area=&booked=0|1&sort=
+    List units for a given project, filtered, sorted and paginated like the
+    builder listing. Admin-only.
     """
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    return get_project_units(project_id)
\ No newline at end of file
+    filters, sort = parse_unit_filters(request.args), parse_unit_sort(request.args)
+    return get_project_units(project_id, *parse_page_args(request.args, ranked=sort != 'id'),
+                             filters=filters, sort=sort)
\ No newline at end of file
@@ -1,19 +1,27 @@
 from flask import Blueprint, request, jsonify, session
 from datetime import datetime
 
+from backend.db.filters import parse_unit_filters, parse_unit_sort
+from backend.utils.pagination import parse_page_args
+from backend.utils.streaming import detect_format
+
 # Import builder-specific service functions for project, unit, transaction, and dashboard operations
 from backend.services.builder_services import (
     create_project,
     create_unit,
     create_unit_batch,
+    import_units,
     get_builder_projects,
     get_project_units,
     get_dashboard_metrics,
     match_transaction,
+    reconcile_transactions,
+    apply_accepted_matches,
     get_builder_transactions,
     get_builder_bookings,
     get_project_details
 )
+from backend.services.transaction_import import import_transactions
 
 # Blueprint grouping builder-facing endpoints under '/builder'
 builder_blueprint = Blueprint('builder', __name__)
@@ -49,8 +57,8 @@ def list_builder_projects():
     if 'user_id' not in session or session.get('role') != 'builder':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    # Fetch projects from service
-    return get_builder_projects(session['user_id'])
+    # Fetch projects from service (paginated by ?limit=&after=)
+    return get_builder_projects(session['user_id'], *parse_page_args(request.args))
 
 @builder_blueprint.route('/projects/<int:project_id>/units', methods=['POST'])
 def create_new_unit(project_id):
@@ -75,9 +83,9 @@ def create_new_unit(project_id):
 @builder_blueprint.route('/projects/<int:project_id>/units/batch', methods=['POST'])
 def create_new_unit_batch(project_id):
     """
-    POST /builder/projects/<project_id>/units
-    Add a new unit to a specific project.
-    Expects JSON with 'unit_id', 'floor', 'area', and 'price'.
+    POST /builder/projects/<project_id>/units/batch
+    Add a grid of units to a specific project in one transaction.
+    Expects JSON with 'prefix', 'units_per_floor', 'num_floors', 'area', and 'price'.
     """
     # Auth check: only the owning builder can add units
     if 'user_id' not in session or session.get('role') != 'builder':
@@ -94,16 +102,37 @@ def create_new_unit_batch(project_id):
         data.get('price')
     )
 
+@builder_blueprint.route('/projects/<int:project_id>/units/import', methods=['POST'])
+def import_project_units(project_id):
+    """
+    POST /builder/projects/<project_id>/units/import
+    Bulk-import units from a CSV (text/csv, with header) or NDJSON (application/x-ndjson) body.
+    Each row needs 'unit_id', 'floor', 'area', and 'price'. The body is parsed as it streams in.
+    """
+    if 'user_id' not in session or session.get('role') != 'builder':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    fmt = detect_format(request.mimetype)
+    if fmt is None:
+        return jsonify({'status': 'failure', 'message': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+
+    return import_units(project_id, request.stream, fmt)
+
 @builder_blueprint.route('/projects/<int:project_id>/units', methods=['GET'])
 def list_units_for_project(project_id):
     """
-    GET /builder/projects/<project_id>/units
-    Retrieve all units for the given project.
+    GET /builder/projects/<project_id>/units?min_floor=&max_floor=&min_price=&max_price=
+                                            &min_area=&max_area=&booked=0|1&sort=
+    Retrieve units for the given project matching the given ranges and booked status,
+    ordered by ?sort= (id, price, area or floor; '-' prefix for descending) and
+    paginated by ?limit=&after=.
     """
     if 'user_id' not in session or session.get('role') != 'builder':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    return get_project_units(project_id)
+    filters, sort = parse_unit_filters(request.args), parse_unit_sort(request.args)
+    return get_project_units(project_id, *parse_page_args(request.args, ranked=sort != 'id'),
+                             filters=filters, sort=sort)
 
 @builder_blueprint.route('/dashboard', methods=['GET'])
 def builder_dashboard():
@@ -135,26 +164,87 @@ def match_builder_transaction():
     # Perform matching logic via service
     return match_transaction(transaction_id, booking_id)
 
+def _min_confidence(value):
+    """Parse a min_confidence value in [0, 1]; returns None if invalid."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 <= value <= 1 else None
+
+@builder_blueprint.route('/transactions/import', methods=['POST'])
+def import_statement_transactions():
+    """
+    POST /builder/transactions/import
+    Bulk-import payments from a bank statement: a CSV (text/csv, with header) or NDJSON
+    (application/x-ndjson) body. Each row needs 'unit_id', 'amount', 'date' and
+    'payment_method', optionally 'reference' and 'project_id'. Only the builder's units
+    are accepted, and rows already imported by an earlier upload are skipped.
+    """
+    if 'user_id' not in session or session.get('role') != 'builder':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    fmt = detect_format(request.mimetype)
+    if fmt is None:
+        return jsonify({'status': 'failure', 'message': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+
+    return import_transactions(request.stream, fmt, builder_id=session['user_id'])
+
+@builder_blueprint.route('/transactions/reconcile', methods=['GET'])
+def preview_reconciliation():
+    """
+    GET /builder/transactions/reconcile?min_confidence=<0..1>
+    Propose matches for all of the builder's unmatched transactions, with a
+    confidence per proposal, without changing anything.
+    """
+    if 'user_id' not in session or session.get('role') != 'builder':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    min_confidence = _min_confidence(request.args.get('min_confidence', 0))
+    if min_confidence is None:
+        return jsonify({'status': 'failure', 'message': 'min_confidence must be between 0 and 1'}), 400
+    return reconcile_transactions(session['user_id'], min_confidence)
+
+@builder_blueprint.route('/transactions/reconcile', methods=['POST'])
+def apply_reconciliation():
+    """
+    POST /builder/transactions/reconcile
+    Apply matches in a single transaction. Expects JSON with either
+    'matches' (a list of accepted {'transaction_id', 'booking_id'}) or
+    'min_confidence' (apply every proposal at or above that confidence).
+    """
+    if 'user_id' not in session or session.get('role') != 'builder':
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    data = request.json or {}
+    if 'matches' in data:
+        return apply_accepted_matches(session['user_id'], data['matches'])
+
+    min_confidence = _min_confidence(data.get('min_confidence'))
+    if min_confidence is None:
+        return jsonify({'status': 'failure', 'message': 'Provide matches or a min_confidence between 0 and 1'}), 400
+    return reconcile_transactions(session['user_id'], min_confidence, apply=True)
+
 @builder_blueprint.route('/transactions', methods=['GET'])
 def list_builder_transactions():
     """
     GET /builder/transactions
-    List all payment transactions (matched and unmatched) for the builder.
+    List payment transactions (matched and unmatched) for the builder, paginated by ?limit=&after=.
     """
     if 'user_id' not in session or session.get('role') != 'builder':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    return get_builder_transactions(session['user_id'])
+    return get_builder_transactions(session['user_id'], *parse_page_args(request.args))
 
 @builder_blueprint.route('/bookings', methods=['GET'])
 def list_builder_bookings():
     """
     GET /builder/bookings
-    List all unit bookings made under the builder's projects.
+    List unit bookings made under the builder's projects, paginated by ?limit=&after=.
     """
     if 'user_id' not in session or session.get('role') != 'builder':
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
-    return get_builder_bookings(session['user_id'])
+    return get_builder_bookings(session['user_id'], *parse_page_args(request.args))
 
 @builder_blueprint.route('/projects/<int:project_id>', methods=['GET'])
 def get_single_project(project_id):
@@ -2,26 +2,43 @@ from flask import Blueprint, request, jsonify, session
 
 # Import service functions for buyer operations: bookings, transactions, and project browsing
 from backend.services.admin_services import get_all_projects
-from backend.services.builder_services import get_project_details, get_project_units
+from backend.services.builder_services import get_project_details
 from backend.services.buyer_services import (
+    browse_project_units,
     create_booking_service,
+    get_booking_ticket,
     get_my_bookings,
     get_transactions,
-    make_transaction_service
+    make_transaction_service,
+    VALID_PAYMENT_METHOD,
+    MAX_BOOKING_WAIT_SECONDS
 )
 
-# Define allowed payment methods for transaction creation
-VALID_PAYMENT_METHOD = {'cash', 'bank transfer'}
+from backend.db.filters import parse_unit_filters, parse_unit_sort
+from backend.utils.pagination import parse_page_args
 
 # Blueprint for buyer-facing endpoints under '/buyer'
 buyer_blueprint = Blueprint('buyer', __name__)
 
+def _wait_seconds(value, default=None):
+    """Parse a ?wait= long-poll value in seconds, capped at MAX_BOOKING_WAIT_SECONDS; None if invalid."""
+    if value is None:
+        return default
+    try:
+        wait = float(value)
+    except (TypeError, ValueError):
+        return None
+    return min(wait, MAX_BOOKING_WAIT_SECONDS) if wait >= 0 else None
+
 @buyer_blueprint.route('/bookings', methods=['POST'])
 def book_unit():
     """
     POST /buyer/bookings
     Create a new unit booking for the authenticated buyer.
     Expects JSON with 'unit_id', 'booking_amount', and 'booking_date'.
+    Bookings go through the admission queue: the response is 201 once written, or
+    202 with a ticket (poll GET /buyer/bookings/queue/<ticket>) if still queued after
+    ?wait= seconds (default 5).
     """
     # Ensure buyer is logged in
     if 'buyer_id' not in session:
@@ -36,24 +53,45 @@ def book_unit():
     if not all([unit_id, amount, date]):
         return jsonify({'status': 'failure', 'message': 'Missing required fields'}), 400
 
+    wait = _wait_seconds(request.args.get('wait'))
+    if wait is None and 'wait' in request.args:
+        return jsonify({'status': 'failure', 'message': 'wait must be a non-negative number of seconds'}), 400
+
     # Delegate booking creation to the service layer
     return create_booking_service(
         session['buyer_id'],
         unit_id,
         amount,
-        date
+        date,
+        wait
     )
 
+@buyer_blueprint.route('/bookings/queue/<ticket_id>', methods=['GET'])
+def poll_booking_ticket(ticket_id):
+    """
+    GET /buyer/bookings/queue/<ticket_id>?wait=<seconds>
+    Report a queued booking's outcome, or its place in line. With ?wait=, long-poll
+    up to that many seconds for the booking to be decided.
+    """
+    if 'buyer_id' not in session:
+        return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+
+    wait = _wait_seconds(request.args.get('wait'), default=0)
+    if wait is None:
+        return jsonify({'status': 'failure', 'message': 'wait must be a non-negative number of seconds'}), 400
+
+    return get_booking_ticket(session['buyer_id'], ticket_id, wait)
+
 @buyer_blueprint.route('/bookings', methods=['GET'])
 def view_my_bookings():
     """
     GET /buyer/bookings
-    Retrieve all bookings for the authenticated buyer.
+    Retrieve bookings for the authenticated buyer, paginated by ?limit=&after=.
     """
     if 'buyer_id' not in session:
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 400
 
-    return get_my_bookings(session['buyer_id'])
+    return get_my_bookings(session['buyer_id'], *parse_page_args(request.args))
 
 @buyer_blueprint.route('/transactions', methods=['POST'])
 def create_transaction():
@@ -97,8 +135,8 @@ def list_all_available_projects():
     if 'buyer_id' not in session:
         return jsonify({'status': 'failure', 'message': 'Authentication required'}), 401
 
-    # Reuse admin service to fetch project list
-    return get_all_projects()
+    # Reuse admin service to fetch project list (paginated by ?limit=&after=)
+    return get_all_projects(*parse_page_args(request.args))
 
 @buyer_blueprint.route('/projects/<int:project_id>', methods=['GET'])
 def buyer_view_project(project_id):
@@ -114,21 +152,36 @@ def buyer_view_project(project_id):
 @buyer_blueprint.route('/projects/<int:project_id>/units', methods=['GET'])
 def buyer_list_units(project_id):
     """
-    GET /buyer/projects/<project_id>/units
-    List all units under a specific project for buyers.
+    GET /buyer/projects/<project_id>/units?min_floor=&max_floor=&min_price=&max_price=
+                                          &min_area=&max_area=&booked=0|1&available=1&sort=
+    List units under a specific project for buyers matching the given ranges and
+    booked status (?available=1 is short for booked=0), ordered by ?sort= (id, price,
+    area or floor; '-' prefix for descending) and paginated by ?limit=&after=.
+    The project's unit counts are returned alongside.
     """
     if 'buyer_id' not in session:
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    return get_project_units(project_id)
+    available = request.args.get('available', '0').lower()
+    if available not in ('0', '1', 'false', 'true'):
+        return jsonify({'status': 'failure', 'message': 'available must be 0 or 1'}), 400
+
+    filters, sort = parse_unit_filters(request.args), parse_unit_sort(request.args)
+    if available in ('1', 'true'):
+        if filters.get('booked') == 1:
+            return jsonify({'status': 'failure', 'message': 'available=1 cannot be combined with booked=1'}), 400
+        filters['booked'] = 0
+
+    return browse_project_units(project_id, *parse_page_args(request.args, ranked=sort != 'id'),
+                                filters=filters, sort=sort)
 
 @buyer_blueprint.route('/transactions', methods=['GET'])
 def list_my_transactions():
     """
     GET /buyer/transactions
-    Retrieve all transactions made by the authenticated buyer.
+    Retrieve transactions made by the authenticated buyer, paginated by ?limit=&after=.
     """
     if 'buyer_id' not in session:
         return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
 
-    return get_transactions(session['buyer_id'])
\ No newline at end of file
+    return get_transactions(session['buyer_id'], *parse_page_args(request.args))
\ No newline at end of file
@@ -2,9 +2,10 @@
 # Loads environment variables, initializes the Flask app, configures security and CORS,
 # and registers route blueprints for authentication, builder, buyer, and admin functionality.
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
+import logging
 import os
 
 # Import route blueprints to organize API endpoints by role/purpose
@@ -13,6 +14,12 @@ from backend.routes.builder_routes import builder_blueprint
 from backend.routes.buyer_auth_routes import buyer_auth_blueprint
 from backend.routes.buyer_routes import buyer_blueprint
 from backend.routes.auth_routes import auth_blueprint
+from backend.db.db_connection import PoolTimeoutError, report_pragma_profile
+from backend.db.filters import FilterError
+from backend.db.migrate import migrate_on_startup
+from backend.utils.pagination import PaginationError
+from backend.utils.hashing import HashingBusyError
+from backend.utils.metrics import init_request_metrics
 
 # Load environment variables from .env into the environment
 load_dotenv()
@@ -42,6 +49,38 @@ app.register_blueprint(builder_blueprint, url_prefix='/builder')
 app.register_blueprint(admin_blueprint, url_prefix='/admin')
 app.register_blueprint(buyer_blueprint, url_prefix='/buyer')
 
+# Time every request (latency, status, response size, in-flight) labelled by
+# blueprint and endpoint; scraped from /metrics in Prometheus text format
+# (admin session, or the ESCROW_METRICS_TOKEN bearer token).
+init_request_metrics(app)
+
+@app.errorhandler(PaginationError)
+def handle_pagination_error(error):
+    """Reject malformed 'limit'/'after' query parameters on any list endpoint."""
+    return jsonify({'status': 'failure', 'message': str(error)}), 400
+
+@app.errorhandler(FilterError)
+def handle_filter_error(error):
+    """Reject malformed /admin/filter parameters (dates, amounts, ids, status)."""
+    return jsonify({'status': 'failure', 'message': str(error)}), 400
+
+@app.errorhandler(PoolTimeoutError)
+def handle_pool_timeout(error):
+    """Shed load when every pooled database connection stays busy past the pool timeout."""
+    return jsonify({'status': 'failure', 'message': 'Server is busy, try again shortly'}), 503, {'Retry-After': '1'}
+
+@app.errorhandler(HashingBusyError)
+def handle_hashing_busy(error):
+    """Shed login/registration load when the bcrypt worker queue is full."""
+    return jsonify({'status': 'failure', 'message': str(error)}), 503, {'Retry-After': '1'}
+
+# Startup checks run when the app is built, so they hold under any server (flask run, gunicorn)
+logging.basicConfig(level=logging.INFO)
+# Startup check: apply pending schema migrations (or refuse to start, see migrate_on_startup)
+migrate_on_startup()
+# Startup check: log the SQLite PRAGMA profile actually in effect (journal mode, sync, caches)
+report_pragma_profile()
+
 # When executed directly, start the Flask development server on port 5000 with debug enabled
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=True, port=5000)
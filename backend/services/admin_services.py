@@ -1,4 +1,10 @@
-from flask import jsonify
+import os
+import threading
+
+from flask import jsonify, Response, stream_with_context
+
+from backend.utils.pagination import DEFAULT_PAGE_SIZE, paginate, paginate_ranked
+from backend.utils.streaming import EXPORT_FORMATS, iter_json_export, iter_ndjson_export
 
 # Import database query functions for data retrieval and filtering
 from backend.db.queries import (
@@ -6,81 +12,183 @@ from backend.db.queries import (
     fetch_all_projects,
     fetch_all_bookings,
     fetch_all_transactions,
+    iter_all_projects,
+    iter_all_bookings,
+    iter_all_transactions,
     fetch_projects_by_builder,
-    fetch_bookings_by_buyer_or_unit
+    fetch_bookings_by_buyer_or_unit,
+    search_projects_by_name,
+    filter_bookings,
+    fetch_platform_overview
 )
-
-def get_all_builders():
+# Runtime instrumentation for the metrics endpoint
+from backend.db.db_connection import pool_stats
+from backend.db.group_commit import group_commit_stats
+from backend.db.profiler import query_stats, slow_queries
+from backend.services.auth_lookup import auth_cache_stats
+from backend.services.unit_availability import unit_availability_stats
+from backend.utils.hashing import hashing_stats
+
+# Exports streamed at once; each holds a pooled connection for its whole download,
+# so the cap keeps slow downloads from starving the pool for every other endpoint
+MAX_CONCURRENT_EXPORTS = int(os.getenv('ESCROW_EXPORT_CONCURRENCY', 2))
+_export_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXPORTS)
+
+def get_all_builders(after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Retrieve and return all registered builders.
+    Retrieve and return one page of registered builders.
     Delegates to the database layer, then wraps results in a JSON response.
     """
-    builders = fetch_all_builders()
-    return jsonify({'status': 'success', 'builders': builders}), 200
+    builders, next_cursor = paginate(fetch_all_builders(after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'builders': builders, 'next_cursor': next_cursor}), 200
+
+
+def get_all_projects(after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Retrieve and return one page of projects across builders.
+    """
+    projects, next_cursor = paginate(fetch_all_projects(after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'projects': projects, 'next_cursor': next_cursor}), 200
+
+
+def get_all_bookings(after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Retrieve and return one page of unit bookings platform-wide.
+    """
+    bookings, next_cursor = paginate(fetch_all_bookings(after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'bookings': bookings, 'next_cursor': next_cursor}), 200
 
 
-def get_all_projects():
+def get_all_transactions(after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Retrieve and return all projects across builders.
+    Retrieve and return one page of payment transaction records.
     """
-    projects = fetch_all_projects()
-    return jsonify({'status': 'success', 'projects': projects}), 200
+    transactions, next_cursor = paginate(fetch_all_transactions(after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'transactions': transactions, 'next_cursor': next_cursor}), 200
 
 
-def get_all_bookings():
+def _stream_export(rows, key, fmt):
     """
-    Retrieve and return all unit bookings platform-wide.
+    Wrap a row iterator in a streaming response: a JSON document shaped like the
+    paginated endpoint ('json') or one object per line ('ndjson').
+    - At most MAX_CONCURRENT_EXPORTS run at once; beyond that the export is refused with 503.
+    - A DB error mid-stream aborts the response, so the client sees a broken
+      transfer rather than a document that looks complete.
     """
-    bookings = fetch_all_bookings()
-    return jsonify({'status': 'success', 'bookings': bookings}), 200
+    if not _export_slots.acquire(blocking=False):
+        rows.close()
+        return jsonify({'status': 'failure', 'message': 'Too many exports in progress, try again shortly'}), \
+            503, {'Retry-After': '5'}
+
+    lock, released = threading.Lock(), []
 
+    def release():
+        with lock:
+            if not released:
+                released.append(True)
+                _export_slots.release()
 
-def get_all_transactions():
+    def body():
+        # The slot is freed once the body is fully sent, fails, or the client goes away
+        try:
+            yield from iter_ndjson_export(rows) if fmt == 'ndjson' else iter_json_export(rows, key)
+        finally:
+            release()
+
+    response = Response(stream_with_context(body()), mimetype=EXPORT_FORMATS[fmt])
+    # Also covers a response closed before its body was ever read
+    response.call_on_close(release)
+    return response
+
+
+def export_all_projects(fmt):
     """
-    Retrieve and return all payment transaction records.
+    Stream every project as a JSON or NDJSON export with constant memory use.
     """
-    transactions = fetch_all_transactions()
-    return jsonify({'status': 'success', 'transactions': transactions}), 200
+    return _stream_export(iter_all_projects(), 'projects', fmt)
 
 
-def filter_projects_by_builder(builder_id):
+def export_all_bookings(fmt):
+    """
+    Stream every booking as a JSON or NDJSON export with constant memory use.
     """
-    Filter projects for a specific builder ID.
+    return _stream_export(iter_all_bookings(), 'bookings', fmt)
+
+
+def export_all_transactions(fmt):
+    """
+    Stream every transaction as a JSON or NDJSON export with constant memory use.
+    """
+    return _stream_export(iter_all_transactions(), 'transactions', fmt)
+
+
+def get_platform_overview():
+    """
+    Return platform-wide totals (projects, units, bookings, booking amount,
+    matched/unmatched transactions) from the per-project rollup.
+    """
+    overview = fetch_platform_overview()
+    if overview is None:
+        return jsonify({'status': 'failure', 'message': 'Could not fetch overview'}), 500
+    return jsonify({'status': 'success', **overview}), 200
+
+
+def get_metrics():
+    """
+    Return runtime metrics: per-query-function latency/rows/errors, the recent
+    slow-query log, connection pool, group commit, password hashing pool, auth cache
+    and unit availability index counters.
+    """
+    return jsonify({
+        'status': 'success',
+        'queries': query_stats(),
+        'slow_queries': slow_queries(),
+        'pool': pool_stats(),
+        'group_commit': group_commit_stats(),
+        'hashing': hashing_stats(),
+        'auth_cache': auth_cache_stats(),
+        'unit_availability': unit_availability_stats(),
+    }), 200
+
+
+def filter_projects_by_builder(builder_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Filter projects for a specific builder ID, one page at a time.
     If no builder_id provided, falls back to returning all projects.
     """
     if not builder_id:
         # No filter: return all projects
-        return get_all_projects()
+        return get_all_projects(after_id, limit)
 
-    projects = fetch_projects_by_builder(builder_id)
-    return jsonify({'status': 'success', 'projects': projects}), 200
+    projects, next_cursor = paginate(fetch_projects_by_builder(builder_id, after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'projects': projects, 'next_cursor': next_cursor}), 200
 
 
-def filter_bookings_by_buyer_or_unit(query):
+def filter_bookings_by_buyer_or_unit(query, after=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Filter bookings by buyer name or unit number search query.
-    If query is empty, returns all bookings.
+    Search bookings by buyer name or unit number, best matches first, one page at a time.
+    If query is empty, returns all bookings (paged by id; `after` is then a booking id).
     """
     if not query:
-        return get_all_bookings()
+        return get_all_bookings(after, limit)
 
-    bookings = fetch_bookings_by_buyer_or_unit(query)
-    return jsonify({'status': 'success', 'bookings': bookings}), 200
+    bookings, next_cursor = paginate_ranked(fetch_bookings_by_buyer_or_unit(query, after, limit + 1), limit)
+    return jsonify({'status': 'success', 'bookings': bookings, 'next_cursor': next_cursor}), 200
 
 
-def filter_projects_by_name(name):
+def filter_projects_by_name(name, after=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Perform case-insensitive substring match on project names.
-    Returns a list of projects whose name contains the search term.
+    Search projects by name (whole words or word prefixes, case-insensitive),
+    best matches first, one page at a time.
     """
-    # Fetch raw data from DB
-    all_projects = fetch_all_projects()
+    projects, next_cursor = paginate_ranked(search_projects_by_name(name, after, limit + 1), limit)
+    return jsonify({'status': 'success', 'projects': projects, 'next_cursor': next_cursor}), 200
 
-    # Filter in-memory for demo purposes
-    filtered_projects = [
-        project for project in all_projects
-        if name.lower() in project['name'].lower()
-    ]
 
-    # Return filtered results as JSON
-    return jsonify({'status': 'success', 'projects': filtered_projects}), 200
\ No newline at end of file
+def filter_bookings_by_fields(filters, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of bookings matching every given filter (project, builder,
+    buyer, unit code, booking date and amount ranges, payment status).
+    """
+    bookings, next_cursor = paginate(filter_bookings(filters, after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'bookings': bookings, 'next_cursor': next_cursor}), 200
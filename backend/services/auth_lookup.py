@@ -0,0 +1,77 @@
+import os
+
+from backend.db.queries import get_buyer_by_email, get_user_by_email
+from backend.utils.cache import TTLCache
+
+# Cached account lookups for the login path.
+# Login only needs a few columns per account, so the records are kept in TTL-bounded
+# LRU caches keyed by email. Unknown emails are cached too (briefly), so repeated
+# attempts against addresses that do not exist never reach SQLite.
+# Callers must invalidate an email whenever the account row is created or changes.
+
+AUTH_CACHE_SIZE = int(os.getenv('ESCROW_AUTH_CACHE_SIZE', 10000))
+AUTH_CACHE_TTL = float(os.getenv('ESCROW_AUTH_CACHE_TTL', 300))
+AUTH_NEGATIVE_TTL = float(os.getenv('ESCROW_AUTH_NEGATIVE_TTL', 30))
+
+_user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL, AUTH_NEGATIVE_TTL)
+_buyer_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL, AUTH_NEGATIVE_TTL)
+
+
+def _load_user(email):
+    user = get_user_by_email(email)
+    if not user:
+        return None
+    return {
+        'id': user['id'],
+        'name': user['name'],
+        'role': user['role'],
+        'password_hash': user['password_hash'],
+    }
+
+
+def _load_buyer(email):
+    buyer = get_buyer_by_email(email)
+    if not buyer:
+        return None
+    return {
+        'id': buyer['id'],
+        'name': buyer['name'],
+        'password_hash': buyer['password_hash'],
+    }
+
+
+def lookup_user(email):
+    """
+    Return the login record {'id', 'name', 'role', 'password_hash'} for a builder/admin email.
+    Returns None if no such user exists.
+    """
+    return _user_cache.get_or_load(email, _load_user)
+
+
+def lookup_buyer(email):
+    """
+    Return the login record {'id', 'name', 'password_hash'} for a buyer email.
+    Returns None if no such buyer exists.
+    """
+    return _buyer_cache.get_or_load(email, _load_buyer)
+
+
+def invalidate_user(email):
+    """Forget the cached user record (or cached absence) for an email."""
+    _user_cache.invalidate(email)
+
+
+def invalidate_buyer(email):
+    """Forget the cached buyer record (or cached absence) for an email."""
+    _buyer_cache.invalidate(email)
+
+
+def clear_auth_cache():
+    """Drop all cached user and buyer records."""
+    _user_cache.clear()
+    _buyer_cache.clear()
+
+
+def auth_cache_stats():
+    """Return hit/miss counters and hit ratios for the user and buyer caches."""
+    return {'users': _user_cache.stats(), 'buyers': _buyer_cache.stats()}
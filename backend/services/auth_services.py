@@ -2,28 +2,36 @@ from flask import session, jsonify
 from datetime import datetime
 
 # Database queries for user lookup and creation
-from backend.db.queries import get_user_by_email, create_user
+from backend.db.queries import create_user, update_user_password_hash
+# Cached email -> login record lookups
+from backend.services.auth_lookup import lookup_user, invalidate_user
 # Utilities for password hashing and verification
-from backend.utils.hashing import check_password, hash_password
+from backend.utils.hashing import check_password, hash_password, needs_rehash
 
 def login_user(email, password):
     """
     Authenticate a user by email and password.
     - Verifies email exists and password matches the stored hash.
+    - Rehashes the password if the stored hash uses an outdated cost factor.
     - On success, stores user_id and role in session.
     Returns a JSON response with status and user info or error.
     """
-    # Retrieve user record by email
-    user = get_user_by_email(email)
+    # Retrieve user record by email (served from the auth lookup cache when possible)
+    user = lookup_user(email)
     if not user:
         # No matching user found
         return jsonify({'status': 'failure', 'message': 'User not found'}), 401
 
-    # Check hashed password or allow plain-text match for demo
-    if not check_password(user['password_hash'], password) and password != user['password_hash']:
+    # Verify the password against the stored bcrypt hash
+    if not check_password(user['password_hash'], password):
         # Invalid credentials
         return jsonify({'status': 'failure', 'message': 'Invalid credentials'}), 401
 
+    # Transparently upgrade hashes made with an outdated bcrypt cost factor
+    if needs_rehash(user['password_hash']):
+        if update_user_password_hash(user['id'], hash_password(password)):
+            invalidate_user(email)
+
     # Store authentication state in session
     session['user_id'] = user['id']
     session['role'] = user['role']
@@ -49,7 +57,7 @@ def register_user(name, email, password, role):
         return jsonify({'status': 'failure', 'message': 'Missing required fields'}), 400
 
     # Prevent duplicate emails
-    if get_user_by_email(email):
+    if lookup_user(email):
         return jsonify({'status': 'failure', 'message': 'Email already in use'}), 400
 
     # Prepare data for insertion
@@ -58,6 +66,8 @@ def register_user(name, email, password, role):
 
     # Insert user into database and retrieve new ID
     user_id = create_user(name, email, password_hash, role, created_at)
+    # Drop the cached "unknown email" entry left by the uniqueness check
+    invalidate_user(email)
     if user_id is None:
         # Database insertion failure
         return jsonify({'status': 'failure', 'message': 'Could not create user'}), 500
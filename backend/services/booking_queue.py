@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from backend.db.queries import create_bookings_batch
+from backend.services.unit_availability import mark_unit_booked
+
+# Launch-day booking admission queue.
+# Booking requests are queued per project in arrival order and written by a
+# single writer thread, so buyers racing for a launch no longer contend on the
+# SQLite write lock one request at a time. The writer visits projects
+# round-robin (a hot launch cannot starve other projects) and commits up to
+# BOOKING_BATCH_SIZE queued bookings of a project in one transaction; within a
+# batch the first request for a unit wins. Each request gets a ticket that can
+# be polled, or waited on (long-poll), until its booking is decided.
+
+BOOKING_BATCH_SIZE = int(os.getenv('ESCROW_BOOKING_BATCH_SIZE', 100))
+# Requests waiting per project before new ones are turned away
+BOOKING_QUEUE_DEPTH = int(os.getenv('ESCROW_BOOKING_QUEUE_DEPTH', 10000))
+# How long decided tickets stay pollable (seconds)
+TICKET_TTL = float(os.getenv('ESCROW_BOOKING_TICKET_TTL', 600))
+
+# Messages for the reasons create_bookings_batch gives for a row it did not write
+FAILURE_MESSAGES = {
+    'unit_booked': 'Unit is already booked',
+    'unit_missing': 'Invalid unit ID',
+    'row_failed': 'Booking could not be recorded',
+}
+
+
+class QueueFullError(Exception):
+    """Raised when a project's booking queue is at BOOKING_QUEUE_DEPTH."""
+
+
+class Ticket:
+    """One queued booking request and, once decided, its outcome."""
+
+    def __init__(self, project_id, sequence, buyer_id, unit_id, amount, date):
+        self.id = uuid.uuid4().hex
+        self.project_id = project_id
+        self.sequence = sequence
+        self.buyer_id = buyer_id
+        self.booking = (unit_id, buyer_id, amount, date)
+        self.status = 'queued'
+        self.booking_id = None
+        self.message = None
+        self.decided_at = None
+        self.done = threading.Event()
+
+    def resolve(self, booking_id, message):
+        if booking_id is not None:
+            self.status, self.booking_id = 'booked', booking_id
+        else:
+            self.status, self.message = 'failed', message
+        self.decided_at = time.monotonic()
+        self.done.set()
+
+
+class BookingQueue:
+    """
+    Per-project FIFO queues drained by one writer thread in batched commits.
+    - submit() enqueues a request and returns its Ticket (raises QueueFullError).
+    - wait() blocks up to a timeout for a ticket to be decided.
+    - status() describes a ticket, including its place in line while queued.
+    """
+
+    def __init__(self, batch_size=BOOKING_BATCH_SIZE, max_depth=BOOKING_QUEUE_DEPTH,
+                 ticket_ttl=TICKET_TTL, write_batch=create_bookings_batch):
+        self.batch_size = batch_size
+        self.max_depth = max_depth
+        self.ticket_ttl = ticket_ttl
+        self._write_batch = write_batch
+        self._cond = threading.Condition()
+        # project_id -> deque of queued tickets; insertion order is the round-robin order
+        self._queues = OrderedDict()
+        # project_id -> [next sequence to hand out, last sequence written, tickets held];
+        # dropped once the project has no queued, in-flight or pollable tickets left
+        self._sequences = {}
+        self._tickets = {}
+        # Decided tickets in the order they were decided, for expiry
+        self._decided = deque()
+        self._writer = None
+        self._stats = {'submitted': 0, 'booked': 0, 'failed': 0, 'rejected_full': 0,
+                       'batches': 0, 'max_batch': 0}
+
+    def _ensure_writer(self):
+        # Caller holds the condition lock
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name='booking-queue', daemon=True)
+            self._writer.start()
+
+    def submit(self, project_id, buyer_id, unit_id, amount, date):
+        """Queue a booking request behind earlier ones for the same project."""
+        with self._cond:
+            queue = self._queues.get(project_id)
+            if queue is not None and len(queue) >= self.max_depth:
+                self._stats['rejected_full'] += 1
+                raise QueueFullError(f"Booking queue for project {project_id} is full")
+            sequences = self._sequences.setdefault(project_id, [0, 0, 0])
+            sequences[0] += 1
+            sequences[2] += 1
+            ticket = Ticket(project_id, sequences[0], buyer_id, unit_id, amount, date)
+            self._tickets[ticket.id] = ticket
+            if queue is None:
+                queue = self._queues[project_id] = deque()
+            queue.append(ticket)
+            self._stats['submitted'] += 1
+            self._ensure_writer()
+            self._cond.notify()
+        return ticket
+
+    def get(self, ticket_id):
+        """Return the Ticket for an id, or None if unknown or expired."""
+        with self._cond:
+            return self._tickets.get(ticket_id)
+
+    def wait(self, ticket, timeout):
+        """Wait up to `timeout` seconds for a ticket to be decided; returns True if it was."""
+        return ticket.done.wait(max(0.0, timeout))
+
+    def status(self, ticket):
+        """JSON-ready description of a ticket."""
+        result = {'ticket': ticket.id, 'status': ticket.status}
+        if ticket.status == 'queued':
+            with self._cond:
+                # Requests ahead in the same project's line, this one included
+                result['position'] = ticket.sequence - self._sequences[ticket.project_id][1]
+        elif ticket.status == 'booked':
+            result['booking_id'] = ticket.booking_id
+        else:
+            result['message'] = ticket.message
+        return result
+
+    def _next_batch(self):
+        """Take up to batch_size tickets from the next project in turn; caller holds the lock."""
+        project_id, queue = next(iter(self._queues.items()))
+        batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+        # Rotate the project to the back of the line, or drop its empty queue
+        del self._queues[project_id]
+        if queue:
+            self._queues[project_id] = queue
+        return batch
+
+    def _expire_tickets(self):
+        # Caller holds the lock; _decided is in decision order, so stop at the first live ticket
+        cutoff = time.monotonic() - self.ticket_ttl
+        while self._decided and self._decided[0].decided_at <= cutoff:
+            ticket = self._decided.popleft()
+            del self._tickets[ticket.id]
+            sequences = self._sequences[ticket.project_id]
+            sequences[2] -= 1
+            if not sequences[2]:
+                # Nothing of this project is queued, being written or pollable any more
+                del self._sequences[ticket.project_id]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                batch = self._next_batch()
+                self._expire_tickets()
+
+            created_at = datetime.utcnow().isoformat()
+            try:
+                results = self._write_batch([ticket.booking for ticket in batch], created_at)
+            except Exception:
+                # Never let one bad batch stop the writer; its tickets are failed below
+                results = None
+
+            if results is not None:
+                # Browsing shows the units as taken before their buyers hear back
+                for ticket, (booking_id, _) in zip(batch, results):
+                    if booking_id is not None:
+                        mark_unit_booked(ticket.project_id, ticket.booking[0])
+
+            with self._cond:
+                for position, ticket in enumerate(batch):
+                    if results is None:
+                        ticket.resolve(None, 'Booking failed')
+                    else:
+                        booking_id, reason = results[position]
+                        ticket.resolve(booking_id, FAILURE_MESSAGES.get(reason, 'Booking failed'))
+                    self._decided.append(ticket)
+                    self._stats['booked' if ticket.status == 'booked' else 'failed'] += 1
+                sequences = self._sequences[batch[0].project_id]
+                sequences[1] = max(sequences[1], batch[-1].sequence)
+                self._stats['batches'] += 1
+                self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+
+    def stats(self):
+        """Snapshot of queue counters and current depth per project."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['queued'] = {project_id: len(queue) for project_id, queue in self._queues.items()}
+            snapshot['tickets'] = len(self._tickets)
+        return snapshot
+
+
+_queue = BookingQueue()
+
+
+def booking_queue():
+    """Return the process-wide booking queue."""
+    return _queue
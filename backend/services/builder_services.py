@@ -1,19 +1,29 @@
 from flask import jsonify
 from datetime import datetime
+import math
+import time
+
+from backend.utils.pagination import DEFAULT_PAGE_SIZE, paginate, paginate_ranked
+from backend.utils.streaming import iter_records, chunked
 
 # Import database query functions for builder operations
 from backend.db.queries import (
     insert_project,
     insert_unit,
+    insert_units_bulk,
     fetch_projects_by_builder,
     fetch_units_by_project,
     fetch_dashboard_data,
-    fetch_additional_dashboard_data,
     match_transaction_to_booking,
     fetch_transactions_by_builder,
     fetch_bookings_by_builder_id,
-    fetch_project_by_id
+    fetch_project_by_id,
+    fetch_unmatched_transactions_by_builder,
+    fetch_unmatched_bookings_by_builder,
+    apply_transaction_matches
 )
+from backend.services.reconciliation import propose_matches, summarize
+from backend.services.unit_availability import invalidate_project_units
 
 
 def create_project(builder_id, name, location, num_units):
@@ -56,6 +66,7 @@ def create_unit(project_id, unit_id, floor, area, price):
     unit_row_id = insert_unit(project_id, unit_id, floor, area, price, created_at)
 
     if unit_row_id:
+        invalidate_project_units(project_id)
         return jsonify({
             'status': 'success',
             'message': 'Unit added successfully',
@@ -67,62 +78,173 @@ def create_unit(project_id, unit_id, floor, area, price):
 
 def create_unit_batch(project_id, prefix, units_per_floor, num_floors, area, price):
     """
-    Add a new batch of unit under a specific project.
+    Add a grid of units (num_floors x units_per_floor) under a specific project.
     - Validates required fields.
-    - Inserts into units table with timestamp.
-    Returns JSON response with new unit row ID or error.
+    - Inserts the whole grid in a single transaction with one num_units update.
+    Returns JSON response with new unit row IDs and any per-unit conflicts
+    (codes that already exist in the project).
     """
     if not all([project_id, prefix, units_per_floor, num_floors, area, price]):
         return jsonify({'status': 'failure', 'message': 'Missing required fields'}), 400
+    if not isinstance(units_per_floor, int) or not isinstance(num_floors, int):
+        return jsonify({'status': 'failure', 'message': 'units_per_floor and num_floors must be integers'}), 400
 
     created_at = datetime.utcnow().isoformat()
-    unit_row_ids = []
-
-    for floor in range(1, num_floors + 1):
-        for unit in range(1, units_per_floor + 1):
-            row = insert_unit(project_id, f"{prefix}-{floor}{unit:02d}", floor, area, price, created_at)
-            if row is None:
-                continue
-            unit_row_ids.append(row)
-
-
-    if unit_row_ids:
+    units = [
+        (f"{prefix}-{floor}{unit:02d}", floor, area, price)
+        for floor in range(1, num_floors + 1)
+        for unit in range(1, units_per_floor + 1)
+    ]
+
+    result = insert_units_bulk(project_id, units, created_at)
+    if result is None:
+        # Insertion failed (e.g. unknown project)
+        return jsonify({'status': 'failure', 'message': 'Could not add unit'}), 400
+
+    created, conflicts = result
+    if created:
+        invalidate_project_units(project_id)
         return jsonify({
             'status': 'success',
             'message': 'Unit added successfully',
-            'unit_row_ids': unit_row_ids
+            'unit_row_ids': [unit['id'] for unit in created],
+            'conflicts': conflicts
         }), 201
 
-    # Insertion failed
-    return jsonify({'status': 'failure', 'message': 'Could not add unit'}), 400
+    # Every unit in the grid already existed
+    return jsonify({
+        'status': 'failure',
+        'message': 'All units already exist',
+        'conflicts': conflicts
+    }), 409
+
+
+# Rows written per transaction by the streaming unit import
+IMPORT_CHUNK_SIZE = 500
+# Cap on individual row errors echoed back in an import report
+MAX_REPORTED_ERRORS = 1000
 
 
-def get_builder_projects(builder_id):
+def _parse_unit_row(record):
     """
-    Fetch all projects owned by a builder.
+    Validate one imported unit row.
+    Returns ((unit_id, floor, area, price), None) or (None, error message).
+    """
+    unit_id = record.get('unit_id')
+    if unit_id is None or not str(unit_id).strip():
+        return None, 'unit_id is required'
+    try:
+        floor = int(record.get('floor'))
+        area = float(record.get('area'))
+        price = float(record.get('price'))
+    except (TypeError, ValueError):
+        return None, 'floor must be an integer; area and price must be numbers'
+    if not (math.isfinite(area) and math.isfinite(price)):
+        return None, 'area and price must be finite numbers'
+    if area <= 0 or price <= 0:
+        return None, 'area and price must be positive'
+    return (str(unit_id).strip(), floor, area, price), None
+
+
+def import_units(project_id, stream, fmt):
+    """
+    Stream-import units for a project from a CSV or NDJSON body.
+    - Parses and validates rows incrementally from the request stream.
+    - Writes valid rows in chunked transactions of IMPORT_CHUNK_SIZE.
+    - Reports per-row errors (validation failures and duplicate unit codes) and throughput.
+    Returns JSON import report.
+    """
+    started = time.perf_counter()
+    created_at = datetime.utcnow().isoformat()
+    rows_total = rows_imported = error_count = 0
+    errors = []
+
+    def add_error(row_number, unit_id, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'row': row_number, 'unit_id': unit_id, 'message': message})
+
+    def valid_rows():
+        nonlocal rows_total
+        for row_number, record, error in iter_records(stream, fmt):
+            if row_number is None:
+                # Undecodable body: nothing after this point can be read
+                add_error(None, None, error)
+                return
+            rows_total += 1
+            if error is None:
+                unit, error = _parse_unit_row(record)
+            if error is not None:
+                add_error(row_number, (record or {}).get('unit_id'), error)
+                continue
+            yield row_number, unit
+
+    for chunk in chunked(valid_rows(), IMPORT_CHUNK_SIZE):
+        result = insert_units_bulk(project_id, [unit for _, unit in chunk], created_at)
+        if result is None:
+            for row_number, unit in chunk:
+                add_error(row_number, unit[0], 'Could not write row')
+            continue
+        created, conflicts = result
+        rows_imported += len(created)
+        # Map each conflict back to the row that carried it (last occurrence for in-batch duplicates)
+        row_by_code = {}
+        for row_number, unit in chunk:
+            row_by_code.setdefault(unit[0], []).append(row_number)
+        for conflict in conflicts:
+            rows = row_by_code[conflict['unit_id']]
+            add_error(rows.pop() if len(rows) > 1 else rows[0], conflict['unit_id'], conflict['reason'])
+
+    if rows_imported:
+        invalidate_project_units(project_id)
+
+    elapsed = time.perf_counter() - started
+    report = {
+        'rows_total': rows_total,
+        'rows_imported': rows_imported,
+        'rows_failed': error_count,
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows_total / elapsed, 1) if elapsed > 0 else None,
+    }
+    if rows_imported:
+        return jsonify({'status': 'success', **report}), 200
+    return jsonify({'status': 'failure', 'message': 'No units imported', **report}), 400
+
+
+def get_builder_projects(builder_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of projects owned by a builder.
     - Retrieves raw rows and converts them to dictionaries.
-    Returns JSON list of projects or error.
+    Returns JSON list of projects and the next-page cursor, or error.
     """
-    projects = fetch_projects_by_builder(builder_id)
+    projects = fetch_projects_by_builder(builder_id, after_id, limit + 1)
 
     if projects is not None:
         # Convert each DB row to a JSON-serializable dict
-        projects_list = [dict(row) for row in projects]
-        return jsonify({'status': 'success', 'projects': projects_list}), 200
+        projects_list, next_cursor = paginate([dict(row) for row in projects], limit)
+        return jsonify({'status': 'success', 'projects': projects_list, 'next_cursor': next_cursor}), 200
 
     # Query failure
     return jsonify({'status': 'failure', 'message': 'Could not fetch projects'}), 500
 
 
-def get_project_units(project_id):
+def get_project_units(project_id, after=None, limit=DEFAULT_PAGE_SIZE, filters=None, sort='id'):
     """
-    Retrieve all units for a given project.
-    Returns JSON array of unit objects or error.
+    Retrieve one page of units for a given project.
+    - filters: floor/price/area ranges and booked status (see filters.parse_unit_filters).
+    - sort: id (default), price, area or floor, '-' prefixed for descending.
+    Returns JSON array of unit objects and the next-page cursor, or error.
     """
-    units = fetch_units_by_project(project_id)
+    units = fetch_units_by_project(project_id, after, limit + 1, filters, sort)
     if units is not None:
-        units_list = [dict(row) for row in units]
-        response = jsonify({'status': 'success', 'units': units_list})
+        rows = [dict(row) for row in units]
+        if sort == 'id':
+            units_list, next_cursor = paginate(rows, limit)
+        else:
+            units_list, next_cursor = paginate_ranked(rows, limit, rank_key=sort.lstrip('-'))
+        response = jsonify({'status': 'success', 'units': units_list, 'next_cursor': next_cursor})
         response.status_code = 200
         return response
 
@@ -134,16 +256,22 @@ def get_dashboard_metrics(builder_id):
     """
     Aggregate and return dashboard metrics for a builder:
     total units, booked units, booking amounts, unmatched transactions.
+    Totals are summed from the per-project rows so both come from one query.
     """
-    metrics = fetch_dashboard_data(builder_id)
-    metrics2 = fetch_additional_dashboard_data(builder_id)
-
-    if metrics is not None and metrics2 is not None:
-        # Merge metrics tuple into JSON response
+    per_project = fetch_dashboard_data(builder_id)
+
+    if per_project is not None:
+        totals = {
+            'total_projects': len(per_project),
+            'total_units': sum(p['units_per_project'] for p in per_project),
+            'units_booked': sum(p['bookings_per_project'] for p in per_project),
+            'total_booking_amount': sum(p['amount_per_project'] for p in per_project),
+            'unmatched_transactions': sum(p['unmatched_transactions_per_project'] for p in per_project),
+        }
         return jsonify({
             'status': 'success',
-            **dict(metrics),
-            'per_project': metrics2
+            **totals,
+            'per_project': per_project
         }), 200
 
     # Data not found or error
@@ -171,22 +299,84 @@ def match_transaction(transaction_id, booking_id):
     return jsonify({'status': 'failure', 'message': 'Could not match transaction. Invalid ID or database error.'}), 404
 
 
-def get_builder_transactions(builder_id):
+def reconcile_transactions(builder_id, min_confidence=0.0, apply=False):
+    """
+    Propose matches between all of a builder's unmatched transactions and
+    unmatched bookings (by unit, buyer, amount and date proximity).
+    - Only proposals with confidence >= min_confidence are returned.
+    - With apply=True those proposals are applied in a single DB transaction.
+    Returns JSON report with the proposals, a confidence summary and, when
+    applying, the number of matches written.
+    """
+    started = time.perf_counter()
+    transactions = fetch_unmatched_transactions_by_builder(builder_id)
+    bookings = fetch_unmatched_bookings_by_builder(builder_id)
+    proposals = propose_matches(transactions, bookings, min_confidence)
+    report = {
+        'summary': summarize(proposals, transactions, bookings),
+        'proposals': proposals,
+    }
+
+    if apply:
+        applied = apply_transaction_matches(
+            builder_id, [(p['transaction_id'], p['booking_id']) for p in proposals]
+        )
+        if applied is None:
+            return jsonify({'status': 'failure', 'message': 'Could not apply matches'}), 500
+        report['applied'] = len(applied)
+
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 4)
+    return jsonify({'status': 'success', **report}), 200
+
+
+def apply_accepted_matches(builder_id, matches):
+    """
+    Apply a list of accepted {'transaction_id', 'booking_id'} matches in one DB transaction.
+    Pairs whose transaction is already matched, whose booking already has a payment,
+    or that do not belong to the builder are skipped and reported.
+    Returns JSON with the applied and skipped pairs.
+    """
+    if not isinstance(matches, list) or not matches:
+        return jsonify({'status': 'failure', 'message': 'matches must be a non-empty list'}), 400
+    pairs = []
+    for match in matches:
+        if not isinstance(match, dict):
+            return jsonify({'status': 'failure', 'message': 'Each match needs transaction_id and booking_id'}), 400
+        transaction_id, booking_id = match.get('transaction_id'), match.get('booking_id')
+        if not isinstance(transaction_id, int) or not isinstance(booking_id, int):
+            return jsonify({'status': 'failure', 'message': 'Each match needs transaction_id and booking_id'}), 400
+        pairs.append((transaction_id, booking_id))
+
+    applied = apply_transaction_matches(builder_id, pairs)
+    if applied is None:
+        return jsonify({'status': 'failure', 'message': 'Could not apply matches'}), 500
+    applied_ids = set(applied)
+    return jsonify({
+        'status': 'success',
+        'applied': len(applied),
+        'skipped': [
+            {'transaction_id': transaction_id, 'booking_id': booking_id}
+            for transaction_id, booking_id in pairs if transaction_id not in applied_ids
+        ],
+    }), 200
+
+
+def get_builder_transactions(builder_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Retrieve all transactions (matched/unmatched) for a builder.
-    Returns JSON list of transactions.
+    Retrieve one page of transactions (matched/unmatched) for a builder.
+    Returns JSON list of transactions and the next-page cursor.
     """
-    transactions = fetch_transactions_by_builder(builder_id)
-    return jsonify({'status': 'success', 'transactions': transactions}), 200
+    transactions, next_cursor = paginate(fetch_transactions_by_builder(builder_id, after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'transactions': transactions, 'next_cursor': next_cursor}), 200
 
 
-def get_builder_bookings(builder_id):
+def get_builder_bookings(builder_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Fetch all booking records associated with a builder.
-    Returns JSON list of bookings.
+    Fetch one page of booking records associated with a builder.
+    Returns JSON list of bookings and the next-page cursor.
     """
-    bookings = fetch_bookings_by_builder_id(builder_id)
-    return jsonify({'status': 'success', 'bookings': bookings}), 200
+    bookings, next_cursor = paginate(fetch_bookings_by_builder_id(builder_id, after_id, limit + 1), limit)
+    return jsonify({'status': 'success', 'bookings': bookings, 'next_cursor': next_cursor}), 200
 
 
 def get_project_details(project_id):
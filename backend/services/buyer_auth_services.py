@@ -1,17 +1,19 @@
 from flask import session, jsonify
 from datetime import datetime
-from backend.db.queries import get_buyer_by_email, create_buyer
-from backend.utils.hashing import check_password, hash_password
+from backend.db.queries import create_buyer, update_buyer_password_hash
+from backend.services.auth_lookup import lookup_buyer, invalidate_buyer
+from backend.utils.hashing import check_password, hash_password, needs_rehash
 
 def login_buyer(email, password):
     """
     Authenticate buyer credentials.
     - Verifies email exists and password matches stored hash.
+    - Rehashes the password if the stored hash uses an outdated cost factor.
     - On success, stores buyer_id in session for future requests.
     Returns JSON response indicating success or failure.
     """
-    # Look up buyer record by email
-    buyer = get_buyer_by_email(email)
+    # Look up buyer record by email (served from the auth lookup cache when possible)
+    buyer = lookup_buyer(email)
     if not buyer:
         return jsonify({'status': 'failure', 'message': 'Buyer not found'}), 401
 
@@ -19,6 +21,11 @@ def login_buyer(email, password):
     if not check_password(buyer['password_hash'], password):
         return jsonify({'status': 'failure', 'message': 'Invalid credentials'}), 401
 
+    # Transparently upgrade hashes made with an outdated bcrypt cost factor
+    if needs_rehash(buyer['password_hash']):
+        if update_buyer_password_hash(buyer['id'], hash_password(password)):
+            invalidate_buyer(email)
+
     # Persist buyer login state in session
     session['buyer_id'] = buyer['id']
     # Return success with buyer details
@@ -33,7 +40,7 @@ def register_buyer(name, emirates_id, phone_number, email, password):
     Returns JSON response with registration outcome.
     """
     # Prevent duplicate registrations
-    existing_buyer = get_buyer_by_email(email)
+    existing_buyer = lookup_buyer(email)
     if existing_buyer:
         return jsonify({'status': 'failure', 'message': 'Email already in use'}), 401
 
@@ -42,6 +49,8 @@ def register_buyer(name, emirates_id, phone_number, email, password):
     hashed_password = hash_password(password)
     # Insert new buyer record
     buyer_id = create_buyer(name, emirates_id, phone_number, email, hashed_password, created_at)
+    # Drop the cached "unknown email" entry left by the duplicate check
+    invalidate_buyer(email)
 
     # Handle possible insertion failure
     if buyer_id is not None:
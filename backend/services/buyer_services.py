@@ -1,52 +1,142 @@
+import math
+
 from flask import jsonify
 from datetime import datetime
 
+from backend.utils.pagination import DEFAULT_PAGE_SIZE, paginate, paginate_ranked
+from backend.services.booking_queue import QueueFullError, booking_queue
+from backend.services.unit_availability import project_availability
+
 # Import database query functions for booking and transaction operations
 from backend.db.queries import (
-    create_booking,
     fetch_bookings_by_buyer_id,
+    fetch_units_by_project,
     create_transaction,
     get_unit_internal_id_by_unit_code,
-    fetch_transactions
+    fetch_transactions_by_buyer_id
 )
 
-def create_booking_service(buyer_id, unit_id, amount, date):
+# Allowed payment methods for transactions (matches the Transaction_log CHECK constraint)
+VALID_PAYMENT_METHOD = {'cash', 'bank transfer'}
+
+# How long POST /buyer/bookings waits for a queued booking before answering with a ticket
+BOOKING_WAIT_SECONDS = 5.0
+# Upper bound for the ?wait= long-poll parameter
+MAX_BOOKING_WAIT_SECONDS = 30.0
+
+def _booking_amount(value):
+    """Coerce a booking amount to a positive, finite float; None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if math.isfinite(amount) and amount > 0 else None
+
+
+def create_booking_service(buyer_id, unit_id, amount, date, wait=None):
     """
-    Create a new booking for a buyer.
-    - Translates public unit code to internal ID.
-    - Inserts a new booking record with timestamp.
-    Returns JSON response with booking_id or error.
+    Create a new booking for a buyer through the booking admission queue.
+    - Translates public unit code to internal ID; units already booked are refused up front.
+    - Queues the request behind earlier bookings for the same project and waits up to
+      `wait` seconds (BOOKING_WAIT_SECONDS by default) for it to be written.
+    Returns JSON response with booking_id, or a 202 ticket to poll if still queued, or error.
     """
+    # Reject bad amounts here so they never reach a shared booking batch
+    amount = _booking_amount(amount)
+    if amount is None:
+        return jsonify({'status': 'failure', 'message': 'Booking amount must be a positive number'}), 400
+
     # Lookup internal unit record by provided unit code
     unit_record = get_unit_internal_id_by_unit_code(unit_id)
     if not unit_record:
         # Invalid or non-existent unit code
         return jsonify({'status': 'failure', 'message': 'Invalid unit ID'}), 400
+    if unit_record['booked']:
+        return jsonify({'status': 'failure', 'message': 'Unit is already booked'}), 400
 
-    internal_unit_id = unit_record['id']
-    created_at = datetime.utcnow().isoformat()
+    queue = booking_queue()
+    try:
+        ticket = queue.submit(unit_record['project_id'], buyer_id, unit_record['id'], amount, date)
+    except QueueFullError:
+        return jsonify({'status': 'failure', 'message': 'Booking queue is full, try again shortly'}), 503
 
-    # Delegate insertion to data layer
-    booking_id = create_booking(internal_unit_id, buyer_id, amount, date, created_at)
+    queue.wait(ticket, BOOKING_WAIT_SECONDS if wait is None else wait)
+    return _ticket_response(ticket)
+
+
+def browse_project_units(project_id, after=None, limit=DEFAULT_PAGE_SIZE, filters=None, sort='id'):
+    """
+    Retrieve one page of a project's units for buyers.
+    - filters: floor/price/area ranges and booked status (see filters.parse_unit_filters).
+    - sort: id (default), price, area or floor, '-' prefixed for descending.
+    Pages in id order filtered at most by booked status come from the unit
+    availability index; ranges and other orders use the indexed SQL listing.
+    Returns JSON with the units, the next-page cursor and the project's unit counts, or error.
+    """
+    filters = filters or {}
+    availability = project_availability(project_id)
+    if availability is None:
+        return jsonify({'status': 'failure', 'message': 'Could not fetch units'}), 500
+
+    if sort == 'id' and not set(filters) - {'booked'}:
+        units, next_cursor = paginate(availability.units(after, limit + 1, filters.get('booked')), limit)
+    else:
+        rows = [dict(row) for row in fetch_units_by_project(project_id, after, limit + 1, filters, sort)]
+        if sort == 'id':
+            units, next_cursor = paginate(rows, limit)
+        else:
+            units, next_cursor = paginate_ranked(rows, limit, rank_key=sort.lstrip('-'))
+    return jsonify({
+        'status': 'success',
+        'units': units,
+        'next_cursor': next_cursor,
+        'availability': availability.summary()
+    }), 200
 
-    if booking_id:
+
+def get_booking_ticket(buyer_id, ticket_id, wait=0):
+    """
+    Report the state of a queued booking, waiting up to `wait` seconds for it to be decided.
+    Returns JSON response like create_booking_service, or 404 for unknown tickets.
+    """
+    queue = booking_queue()
+    ticket = queue.get(ticket_id)
+    if ticket is None or ticket.buyer_id != buyer_id:
+        return jsonify({'status': 'failure', 'message': 'Unknown booking ticket'}), 404
+    queue.wait(ticket, wait)
+    return _ticket_response(ticket)
+
+
+def _ticket_response(ticket):
+    """Booking outcome for a decided ticket, or a 202 with its place in line."""
+    state = booking_queue().status(ticket)
+    if ticket.status == 'booked':
         return jsonify({
             'status': 'success',
             'message': 'Booking successful',
-            'booking_id': booking_id
+            'booking_id': ticket.booking_id,
+            'ticket': ticket.id
         }), 201
+    if ticket.status == 'failed':
+        return jsonify({'status': 'failure', 'message': ticket.message, 'ticket': ticket.id}), 400
+    return jsonify({
+        'status': 'queued',
+        'message': 'Booking is queued',
+        'ticket': ticket.id,
+        'position': state['position']
+    }), 202
 
-    # Insertion failed
-    return jsonify({'status': 'failure', 'message': 'Booking failed'}), 400
-
-def get_my_bookings(buyer_id):
+def get_my_bookings(buyer_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Retrieve all bookings associated with a buyer.
-    Returns JSON list of bookings or error.
+    Retrieve one page of bookings associated with a buyer.
+    Returns JSON list of bookings and the next-page cursor, or error.
     """
-    bookings = fetch_bookings_by_buyer_id(buyer_id)
+    bookings = fetch_bookings_by_buyer_id(buyer_id, after_id, limit + 1)
     if bookings is not None:
-        return jsonify({'status': 'success', 'bookings': bookings}), 200
+        bookings, next_cursor = paginate(bookings, limit)
+        return jsonify({'status': 'success', 'bookings': bookings, 'next_cursor': next_cursor}), 200
 
     # Data retrieval error
     return jsonify({'status': 'failure', 'message': 'Could not fetch bookings'}), 500
@@ -58,10 +148,15 @@ def make_transaction_service(amount, date, payment_type, buyer_id, unit_id):
     - Inserts transaction record with timestamp and payment details.
     Returns JSON response with transaction_id or error.
     """
+    # Lookup internal unit record by provided unit code
+    unit_record = get_unit_internal_id_by_unit_code(unit_id)
+    if not unit_record:
+        return jsonify({'status': 'failure', 'message': 'Invalid unit ID'}), 400
+
     created_at = datetime.utcnow().isoformat()
 
     # Delegate insertion to data layer
-    transaction_id = create_transaction(amount, date, payment_type, created_at, buyer_id, unit_id)
+    transaction_id = create_transaction(amount, date, payment_type, created_at, buyer_id, unit_record['id'])
     if transaction_id:
         return jsonify({
             'status': 'success',
@@ -72,10 +167,15 @@ def make_transaction_service(amount, date, payment_type, buyer_id, unit_id):
     # Insertion failed
     return jsonify({'status': 'failure', 'message': 'Transaction failed'}), 400
 
-def get_transactions(buyer_id):
+def get_transactions(buyer_id, after_id=None, limit=DEFAULT_PAGE_SIZE):
     """
-    Fetch all transactions made by a buyer.
-    Returns JSON list of transactions.
+    Fetch one page of transactions made by a buyer.
+    Returns JSON list of transactions and the next-page cursor, or error.
     """
-    transactions = fetch_transactions()
-    return jsonify({'status': 'success', 'transactions': transactions}), 200
\ No newline at end of file
+    transactions = fetch_transactions_by_buyer_id(buyer_id, after_id, limit + 1)
+    if transactions is not None:
+        transactions, next_cursor = paginate(transactions, limit)
+        return jsonify({'status': 'success', 'transactions': transactions, 'next_cursor': next_cursor}), 200
+
+    # Data retrieval error
+    return jsonify({'status': 'failure', 'message': 'Could not fetch transactions'}), 500
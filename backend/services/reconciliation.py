@@ -0,0 +1,125 @@
+from datetime import date
+from functools import lru_cache
+
+# Transaction-to-booking auto-reconciliation.
+# Proposes matches between a builder's unmatched transactions and unmatched
+# bookings entirely in memory: bookings are indexed once in hash maps keyed by
+# unit and by (buyer, amount), each transaction probes those maps for its
+# candidates, and candidate pairs are assigned greedily from the highest
+# confidence down so every transaction and booking is used at most once.
+# Runs in O(transactions + bookings + candidates log candidates) with no
+# per-row database queries.
+
+# Confidence contributed by each agreeing field (sums to 1.0)
+WEIGHTS = {'unit': 0.5, 'buyer': 0.2, 'amount': 0.2, 'date': 0.1}
+# Amounts within this fraction of each other earn half the amount weight
+AMOUNT_TOLERANCE = 0.01
+# Date proximity earns its weight linearly, from same day down to this many days apart
+DATE_WINDOW_DAYS = 30
+
+# Confidence bands used in the summary
+HIGH_CONFIDENCE = 0.9
+MEDIUM_CONFIDENCE = 0.7
+
+
+@lru_cache(maxsize=4096)
+def _day(value):
+    """Parse the date part of an ISO date/datetime string; None if it is not one."""
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def score(transaction, booking):
+    """
+    Score how well a transaction matches a booking.
+    Returns (confidence between 0 and 1, list of the fields that agreed, days apart or None).
+    """
+    confidence, reasons = 0.0, []
+    if transaction['unit_id'] == booking['unit_id']:
+        confidence += WEIGHTS['unit']
+        reasons.append('unit')
+    if transaction['buyer_id'] == booking['buyer_id']:
+        confidence += WEIGHTS['buyer']
+        reasons.append('buyer')
+
+    paid, due = transaction['amount'], booking['amount']
+    if paid == due:
+        confidence += WEIGHTS['amount']
+        reasons.append('amount')
+    elif due and abs(paid - due) <= abs(due) * AMOUNT_TOLERANCE:
+        confidence += WEIGHTS['amount'] / 2
+        reasons.append('amount~')
+
+    days = None
+    paid_on, booked_on = _day(transaction['date']), _day(booking['date'])
+    if paid_on and booked_on:
+        days = abs((paid_on - booked_on).days)
+        if days < DATE_WINDOW_DAYS:
+            confidence += WEIGHTS['date'] * (1 - days / DATE_WINDOW_DAYS)
+            reasons.append('date')
+    return round(confidence, 3), reasons, days
+
+
+def propose_matches(transactions, bookings, min_confidence=0.0):
+    """
+    Propose at most one booking per transaction (and one transaction per booking).
+    - transactions and bookings are dicts with id, unit_id, buyer_id, amount, date.
+    - Candidates share the unit, or the buyer and exact amount.
+    Returns proposals sorted by confidence (highest first), each
+    {'transaction_id', 'booking_id', 'confidence', 'reasons'}, keeping only
+    those with confidence >= min_confidence.
+    """
+    by_unit, by_buyer_amount = {}, {}
+    for booking in bookings:
+        by_unit.setdefault(booking['unit_id'], []).append(booking)
+        by_buyer_amount.setdefault((booking['buyer_id'], booking['amount']), []).append(booking)
+
+    candidates = []
+    for transaction in transactions:
+        seen = set()
+        for booking in (by_unit.get(transaction['unit_id'], [])
+                        + by_buyer_amount.get((transaction['buyer_id'], transaction['amount']), [])):
+            if booking['id'] in seen:
+                continue
+            seen.add(booking['id'])
+            confidence, reasons, days = score(transaction, booking)
+            if confidence >= min_confidence:
+                # Ties go to the closer date, then the older rows
+                candidates.append((-confidence, days if days is not None else DATE_WINDOW_DAYS,
+                                   transaction['id'], booking['id'], reasons))
+
+    candidates.sort(key=lambda candidate: candidate[:4])
+    used_transactions, used_bookings, proposals = set(), set(), []
+    for negative_confidence, _, transaction_id, booking_id, reasons in candidates:
+        if transaction_id in used_transactions or booking_id in used_bookings:
+            continue
+        used_transactions.add(transaction_id)
+        used_bookings.add(booking_id)
+        proposals.append({
+            'transaction_id': transaction_id,
+            'booking_id': booking_id,
+            'confidence': -negative_confidence,
+            'reasons': reasons,
+        })
+    return proposals
+
+
+def summarize(proposals, transactions, bookings):
+    """Counts of proposals per confidence band and of what is left unmatched."""
+    bands = {'high': 0, 'medium': 0, 'low': 0}
+    for proposal in proposals:
+        if proposal['confidence'] >= HIGH_CONFIDENCE:
+            bands['high'] += 1
+        elif proposal['confidence'] >= MEDIUM_CONFIDENCE:
+            bands['medium'] += 1
+        else:
+            bands['low'] += 1
+    return {
+        'unmatched_transactions': len(transactions),
+        'unmatched_bookings': len(bookings),
+        'proposed': len(proposals),
+        'left_unmatched': len(transactions) - len(proposals),
+        'by_confidence': bands,
+    }
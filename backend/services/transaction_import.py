@@ -0,0 +1,195 @@
+import hashlib
+import math
+import time
+from datetime import date, datetime
+
+from flask import jsonify
+
+from backend.db.queries import fetch_unit_codes, insert_transactions_bulk
+from backend.services.buyer_services import VALID_PAYMENT_METHOD
+from backend.utils.streaming import iter_records, chunked
+
+# Bulk ingest of bank statement files into Transaction_log.
+# Unit codes are resolved through an in-memory map built with one query before
+# the file is read, so rows never trigger per-row lookups. Rows are written in
+# chunked transactions, each carrying an idempotency key: the row's bank
+# reference when the statement has one, otherwise a hash of its contents.
+# Keys are unique per project of the paid unit, so builders reusing the same
+# bank references never collide. Re-uploading a statement therefore skips the
+# rows that were already recorded instead of duplicating them, while a
+# reference recorded with different payment details is reported as an error.
+
+# Rows written per transaction
+INGEST_CHUNK_SIZE = 500
+# Cap on individual row errors echoed back in an ingest report
+MAX_REPORTED_ERRORS = 1000
+
+# Placeholder in the unit map for codes used by more than one project
+_AMBIGUOUS = object()
+
+REFERENCE_MISMATCH = 'Reference already recorded with different payment details'
+
+
+def idempotency_key(record, unit_code, amount, paid_on, payment_method):
+    """
+    Key identifying a statement row across uploads: its bank reference if given,
+    otherwise a digest of the fields that describe the payment.
+    """
+    reference = record.get('reference')
+    if reference is not None and str(reference).strip():
+        return 'ref:' + str(reference).strip()
+    content = '|'.join([unit_code, str(record.get('project_id') or ''), repr(amount), paid_on, payment_method])
+    return 'sha256:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def build_unit_map(units):
+    """
+    Index (id, unit_code, project_id, buyer_id) rows for lookup by code.
+    Returns {unit_code: (id, project_id, buyer_id) or _AMBIGUOUS,
+             (project_id, unit_code): (id, project_id, buyer_id)}.
+    """
+    unit_map = {}
+    for unit_id, code, project_id, buyer_id in units:
+        unit_map[(project_id, code)] = (unit_id, project_id, buyer_id)
+        unit_map[code] = _AMBIGUOUS if code in unit_map else (unit_id, project_id, buyer_id)
+    return unit_map
+
+
+def _parse_transaction_row(record):
+    """
+    Validate one statement row.
+    Returns ((unit_code, project_id, amount, date, payment_method), None) or (None, error message).
+    """
+    unit_code = record.get('unit_id')
+    if unit_code is None or not str(unit_code).strip():
+        return None, 'unit_id is required'
+    try:
+        amount = float(record.get('amount'))
+    except (TypeError, ValueError):
+        return None, 'amount must be a number'
+    if not math.isfinite(amount):
+        return None, 'amount must be a finite number'
+    if amount <= 0:
+        return None, 'amount must be positive'
+    try:
+        paid_on = date.fromisoformat(str(record.get('date'))).isoformat()
+    except ValueError:
+        return None, 'date must be a date (YYYY-MM-DD)'
+    payment_method = record.get('payment_method')
+    if payment_method not in VALID_PAYMENT_METHOD:
+        return None, 'Invalid payment type'
+    project_id = record.get('project_id')
+    if project_id in (None, ''):
+        project_id = None
+    else:
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
+            return None, 'project_id must be an integer'
+    return (str(unit_code).strip(), project_id, amount, paid_on, payment_method), None
+
+
+def import_transactions(stream, fmt, builder_id=None):
+    """
+    Stream-ingest payments from a CSV or NDJSON bank statement.
+    - Each row needs 'unit_id' (unit code), 'amount', 'date' and 'payment_method';
+      'reference' (bank reference) and 'project_id' are optional.
+    - Units are limited to the builder's projects when builder_id is given; the
+      payer is the unit's booking buyer, so the unit must be booked.
+    - Rows already recorded by an earlier upload are skipped, not duplicated; a
+      bank reference already recorded in the project with other details is an error.
+    - Writes in chunked transactions of INGEST_CHUNK_SIZE and reports per-row errors and throughput.
+    Returns JSON ingest report.
+    """
+    started = time.perf_counter()
+    created_at = datetime.utcnow().isoformat()
+    unit_map = build_unit_map(fetch_unit_codes(builder_id))
+    rows_total = rows_imported = rows_skipped = error_count = 0
+    errors = []
+
+    def add_error(row_number, unit_code, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'row': row_number, 'unit_id': unit_code, 'message': message})
+
+    def valid_rows():
+        nonlocal rows_total, rows_skipped
+        # (scope, key) -> payment details of rows already read from this statement
+        seen_keys = {}
+        for row_number, record, error in iter_records(stream, fmt):
+            if row_number is None:
+                # Undecodable body: nothing after this point can be read
+                add_error(None, None, error)
+                return
+            rows_total += 1
+            if error is None:
+                parsed, error = _parse_transaction_row(record)
+            if error is not None:
+                add_error(row_number, (record or {}).get('unit_id'), error)
+                continue
+
+            unit_code, project_id, amount, paid_on, payment_method = parsed
+            unit = unit_map.get((project_id, unit_code) if project_id is not None else unit_code)
+            if unit is None:
+                add_error(row_number, unit_code, 'Invalid unit ID')
+                continue
+            if unit is _AMBIGUOUS:
+                add_error(row_number, unit_code, 'Unit code is used by several projects; add project_id')
+                continue
+            unit_id, unit_project, buyer_id = unit
+            if buyer_id is None:
+                add_error(row_number, unit_code, 'Unit is not booked')
+                continue
+
+            scoped_key = (unit_project, idempotency_key(record, unit_code, amount, paid_on, payment_method))
+            details = (amount, paid_on, payment_method, unit_id)
+            if scoped_key in seen_keys:
+                # Repeated within this statement
+                if seen_keys[scoped_key] == details:
+                    rows_skipped += 1
+                else:
+                    add_error(row_number, unit_code, REFERENCE_MISMATCH)
+                continue
+            seen_keys[scoped_key] = details
+            yield row_number, unit_code, (*scoped_key, *details[:3], buyer_id, unit_id)
+
+    for chunk in chunked(valid_rows(), INGEST_CHUNK_SIZE):
+        # A second payment for a unit within the chunk conflicts just like one already stored
+        rows, claimed, chunk_conflicts = [], set(), set()
+        for row_number, unit_code, row in chunk:
+            if row[6] in claimed:
+                chunk_conflicts.add(row[:2])
+            else:
+                claimed.add(row[6])
+                rows.append(row)
+
+        result = insert_transactions_bulk(rows, created_at)
+        if result is None:
+            for row_number, unit_code, _ in chunk:
+                add_error(row_number, unit_code, 'Could not write row')
+            continue
+        inserted, duplicates, conflicts, mismatched = result
+        rows_imported += len(inserted)
+        rows_skipped += len(duplicates)
+        conflicts, mismatched = chunk_conflicts.union(conflicts), set(mismatched)
+        for row_number, unit_code, row in chunk:
+            if row[:2] in mismatched:
+                add_error(row_number, unit_code, REFERENCE_MISMATCH)
+            elif row[:2] in conflicts:
+                add_error(row_number, unit_code, 'Unit already has a transaction')
+
+    elapsed = time.perf_counter() - started
+    report = {
+        'rows_total': rows_total,
+        'rows_imported': rows_imported,
+        'rows_skipped': rows_skipped,
+        'rows_failed': error_count,
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows_total / elapsed, 1) if elapsed > 0 else None,
+    }
+    # A re-upload that only skips already-recorded rows is still a success
+    if rows_imported or (rows_skipped and not error_count):
+        return jsonify({'status': 'success', **report}), 200
+    return jsonify({'status': 'failure', 'message': 'No transactions imported', **report}), 400
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from backend.db.queries import fetch_unit_availability
+
+# In-memory unit availability read model for buyer browsing.
+# Each project's units are loaded once into compact columns ordered by row id:
+# ids, areas and prices as arrays and the booked flags as a bytearray; the
+# builder name is kept once per project. Rows carry the same fields as the SQL listing.
+# Browsing a project, with or without a booked/available filter, is then
+# answered from memory: matching units are found with bytearray.find, a C-level
+# scan, instead of a query per page. Range filters and other orders are left to
+# the indexed SQL listing. The booking queue marks units booked as it writes
+# them and unit inserts drop the project's entry, so a browse reflects this
+# process's writes immediately; entries also expire after AVAILABILITY_TTL
+# seconds to pick up writes made by other processes.
+# The index is only for display: booking still claims the unit atomically in SQL.
+
+AVAILABILITY_TTL = float(os.getenv('ESCROW_AVAILABILITY_TTL', 60))
+# Projects kept in memory at once; the least recently browsed is dropped first
+AVAILABILITY_PROJECTS = int(os.getenv('ESCROW_AVAILABILITY_PROJECTS', 1000))
+
+_BOOKED, _FREE = 1, 0
+
+
+class ProjectAvailability:
+    """
+    Column-oriented snapshot of one project's units, ordered by row id.
+    - units(after_id, limit, booked) pages through units like the SQL listing.
+    - mark_booked(unit_id) flips a unit's flag in place.
+    """
+
+    __slots__ = ('project_id', 'builder_name', 'ids', 'codes', 'floors', 'areas', 'prices',
+                 'created', 'booked', 'booked_count')
+
+    def __init__(self, project_id, rows):
+        self.project_id = project_id
+        self.builder_name = None
+        self.ids = array('q')
+        self.codes, self.floors, self.created = [], [], []
+        self.areas, self.prices = array('d'), array('d')
+        self.booked = bytearray()
+        for unit_id, code, floor, area, price, booked, created_at, builder_name in rows:
+            self.ids.append(unit_id)
+            self.codes.append(code)
+            self.floors.append(floor)
+            self.areas.append(area)
+            self.prices.append(price)
+            self.booked.append(_BOOKED if booked else _FREE)
+            self.created.append(created_at)
+            self.builder_name = builder_name
+        self.booked_count = self.booked.count(_BOOKED)
+
+    def _position(self, unit_id):
+        position = bisect_right(self.ids, unit_id) - 1
+        return position if position >= 0 and self.ids[position] == unit_id else None
+
+    def mark_booked(self, unit_id):
+        """Flag a unit as booked; returns False if the unit is not in this snapshot."""
+        position = self._position(unit_id)
+        if position is None:
+            return False
+        if not self.booked[position]:
+            self.booked[position] = _BOOKED
+            self.booked_count += 1
+        return True
+
+    def _unit(self, position):
+        return {
+            'id': self.ids[position],
+            'project_id': self.project_id,
+            'unit_id': self.codes[position],
+            'floor': self.floors[position],
+            'area': self.areas[position],
+            'price': self.prices[position],
+            'created_at': self.created[position],
+            'booked': self.booked[position],
+            'builder_name': self.builder_name,
+        }
+
+    def units(self, after_id=None, limit=None, booked=None):
+        """
+        Units with id > after_id in id order, at most `limit` (all when None);
+        only free (booked=0) or booked (booked=1) units when `booked` is given.
+        """
+        position = bisect_right(self.ids, after_id) if after_id is not None else 0
+        count, page = len(self.ids), []
+        while position < count and (limit is None or len(page) < limit):
+            if booked is not None:
+                position = self.booked.find(_BOOKED if booked else _FREE, position)
+                if position < 0:
+                    break
+            page.append(self._unit(position))
+            position += 1
+        return page
+
+    def summary(self):
+        """Unit counts for the project: total, booked and available."""
+        return {
+            'total': len(self.ids),
+            'booked': self.booked_count,
+            'available': len(self.ids) - self.booked_count,
+        }
+
+
+class AvailabilityIndex:
+    """
+    Thread-safe, size-bounded map of project id -> ProjectAvailability.
+    - get(project_id) returns the project's snapshot, loading it on a miss.
+    - mark_booked / invalidate keep snapshots in step with writes.
+    A snapshot loaded while a write for its project was being applied is served
+    once but not kept, so a concurrent booking is never lost from the index.
+    """
+
+    def __init__(self, maxsize=AVAILABILITY_PROJECTS, ttl=AVAILABILITY_TTL,
+                 loader=fetch_unit_availability, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._loader = loader
+        self._clock = clock
+        self._lock = threading.Lock()
+        # project_id -> (ProjectAvailability, expires_at), least recently used first
+        self._entries = OrderedDict()
+        # project_id -> count of writes applied, to detect writes racing a load
+        self._versions = {}
+        self._stats = {'hits': 0, 'misses': 0, 'expirations': 0, 'evictions': 0,
+                       'marks': 0, 'invalidations': 0, 'load_failures': 0}
+
+    def get(self, project_id):
+        """Return the ProjectAvailability for a project, or None if it could not be loaded."""
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None:
+                if entry[1] > self._clock():
+                    self._entries.move_to_end(project_id)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                del self._entries[project_id]
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            version = self._versions.get(project_id, 0)
+
+        rows = self._loader(project_id)
+        try:
+            snapshot = ProjectAvailability(project_id, rows) if rows is not None else None
+        except TypeError:
+            # A non-numeric area/price/id cannot go into the compact columns
+            snapshot = None
+        if snapshot is None:
+            with self._lock:
+                self._stats['load_failures'] += 1
+            return None
+
+        with self._lock:
+            if self._versions.get(project_id, 0) == version and self.ttl > 0:
+                self._entries[project_id] = (snapshot, self._clock() + self.ttl)
+                self._entries.move_to_end(project_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return snapshot
+
+    def _changed(self, project_id):
+        # Caller holds the lock
+        self._versions[project_id] = self._versions.get(project_id, 0) + 1
+
+    def mark_booked(self, project_id, unit_id):
+        """Record that a unit was booked; a unit missing from the snapshot drops it instead."""
+        with self._lock:
+            self._changed(project_id)
+            self._stats['marks'] += 1
+            entry = self._entries.get(project_id)
+            if entry is not None and not entry[0].mark_booked(unit_id):
+                del self._entries[project_id]
+
+    def invalidate(self, project_id):
+        """Drop a project's snapshot after its units change (e.g. new units were added)."""
+        with self._lock:
+            self._changed(project_id)
+            if self._entries.pop(project_id, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every snapshot; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self):
+        """Snapshot of index size and hit/miss counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['projects'] = len(self._entries)
+            snapshot['units'] = sum(len(entry[0].ids) for entry in self._entries.values())
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_ratio'] = snapshot['hits'] / lookups if lookups else 0.0
+        return snapshot
+
+
+_index = AvailabilityIndex()
+
+
+def project_availability(project_id):
+    """Return the availability snapshot of a project, or None if it could not be loaded."""
+    return _index.get(project_id)
+
+
+def mark_unit_booked(project_id, unit_id):
+    """Flag a unit as booked in its project's snapshot."""
+    _index.mark_booked(project_id, unit_id)
+
+
+def invalidate_project_units(project_id):
+    """Forget a project's snapshot so the next browse reloads it."""
+    _index.invalidate(project_id)
+
+
+def clear_unit_availability():
+    """Drop all availability snapshots."""
+    _index.clear()
+
+
+def unit_availability_stats():
+    """Return hit/miss counters and size of the availability index."""
+    return _index.stats()
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Small in-process caches for hot read paths.
+# Entries expire after a TTL and the least recently used entry is evicted once
+# the cache is full. A lookup that found nothing can be cached as well
+# (negative caching) with its own, usually shorter, TTL.
+
+# Sentinel stored for cached "not found" results
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and hit/miss instrumentation.
+    - get_or_load(key, loader) returns the cached value or calls loader(key);
+      a None result is cached for `negative_ttl` seconds.
+    - invalidate(key) drops an entry after the underlying data changes.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300.0, negative_ttl=30.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'expirations': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    def _lookup(self, key):
+        """Return the cached value (or _MISSING) and whether it was found; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._stats['expirations'] += 1
+            return None, False
+        self._entries.move_to_end(key)
+        return value, True
+
+    def _store(self, key, value):
+        ttl = self.negative_ttl if value is _MISSING else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Return the value for `key`, calling loader(key) on a miss and caching the result.
+        Loader errors propagate and are not cached.
+        """
+        with self._lock:
+            value, found = self._lookup(key)
+            if found:
+                if value is _MISSING:
+                    self._stats['negative_hits'] += 1
+                    return None
+                self._stats['hits'] += 1
+                return value
+            self._stats['misses'] += 1
+
+        value = loader(key)
+        self._store(key, _MISSING if value is None else value)
+        return value
+
+    def invalidate(self, key):
+        """Drop a cached entry (positive or negative) for `key`."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of cache size and hit/miss counters, including hit ratios."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['size'] = len(self._entries)
+            snapshot['maxsize'] = self.maxsize
+        lookups = snapshot['hits'] + snapshot['negative_hits'] + snapshot['misses']
+        snapshot['hit_ratio'] = (snapshot['hits'] + snapshot['negative_hits']) / lookups if lookups else 0.0
+        snapshot['negative_hit_ratio'] = snapshot['negative_hits'] / lookups if lookups else 0.0
+        return snapshot
@@ -1,18 +1,195 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
 # Utility functions for password hashing and verification using bcrypt.
 # These help securely store and check user passwords in the database.
+#
+# bcrypt is deliberately CPU-heavy, so hashing and verification run on a small,
+# bounded worker pool instead of directly on request threads: a login burst can
+# only occupy ESCROW_HASH_WORKERS cores, and once ESCROW_HASH_QUEUE_LIMIT jobs
+# are waiting further attempts are rejected immediately instead of piling up.
+
+# Bounds for the configurable bcrypt cost factor (log2 of the number of rounds)
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 16
+DEFAULT_BCRYPT_ROUNDS = 12
+
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_HASH_QUEUE_LIMIT = 32
+DEFAULT_HASH_TIMEOUT = 10.0
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full or a job does not finish in time."""
+
+
+def bcrypt_rounds():
+    """
+    Return the configured bcrypt cost factor (ESCROW_BCRYPT_ROUNDS).
+    Raises ValueError if it falls outside MIN_BCRYPT_ROUNDS..MAX_BCRYPT_ROUNDS.
+    """
+    rounds = int(os.getenv('ESCROW_BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS))
+    if not MIN_BCRYPT_ROUNDS <= rounds <= MAX_BCRYPT_ROUNDS:
+        raise ValueError(
+            f"ESCROW_BCRYPT_ROUNDS must be between {MIN_BCRYPT_ROUNDS} and {MAX_BCRYPT_ROUNDS}, got {rounds}"
+        )
+    return rounds
+
+
+def hash_rounds(hashed_password):
+    """
+    Extract the cost factor from a stored bcrypt hash ("$2b$12$...").
+    Returns None if the value is not a bcrypt hash.
+    """
+    parts = hashed_password.split('$') if hashed_password else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password):
+    """True if a stored hash was made with a cost factor other than the configured one."""
+    return hash_rounds(hashed_password) != bcrypt_rounds()
+
+
+class HashingPool:
+    """
+    Bounded worker pool for bcrypt jobs with queue-depth and latency metrics.
+    - At most `workers` jobs run concurrently.
+    - At most `queue_limit` jobs may be queued or running; beyond that submit()
+      raises HashingBusyError without waiting.
+    """
+
+    def __init__(self, workers=DEFAULT_HASH_WORKERS, queue_limit=DEFAULT_HASH_QUEUE_LIMIT,
+                 timeout=DEFAULT_HASH_TIMEOUT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'queue_wait_total': 0.0,
+            'queue_wait_max': 0.0,
+        }
+        # Per-operation latency (time spent inside bcrypt)
+        self._latency = {}
+
+    def _run(self, operation, fn, args, enqueued):
+        started = time.perf_counter()
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            wait = started - enqueued
+            self._stats['queue_wait_total'] += wait
+            self._stats['queue_wait_max'] = max(self._stats['queue_wait_max'], wait)
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._stats['completed'] += 1
+                latency = self._latency.setdefault(operation, {'count': 0, 'total': 0.0, 'max': 0.0})
+                latency['count'] += 1
+                latency['total'] += elapsed
+                latency['max'] = max(latency['max'], elapsed)
+            self._slots.release()
+
+    def submit(self, operation, fn, *args):
+        """
+        Run fn(*args) on the pool and wait for its result.
+        Raises HashingBusyError if the queue is full or the job exceeds the timeout.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise HashingBusyError('Authentication service is busy, please retry')
+        with self._lock:
+            self._pending += 1
+            self._stats['submitted'] += 1
+        future = self._executor.submit(self._run, operation, fn, args, time.perf_counter())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise HashingBusyError('Authentication service timed out, please retry')
+
+    def stats(self):
+        """Snapshot of queue depth, throughput and latency counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'workers': self.workers,
+                'queue_limit': self.queue_limit,
+                'queue_depth': self._pending,
+                'in_flight': self._running,
+                'latency': {
+                    operation: dict(values, avg=values['total'] / values['count'] if values['count'] else 0.0)
+                    for operation, values in self._latency.items()
+                },
+            })
+        return snapshot
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """Return the process-wide hashing pool, created lazily from ESCROW_HASH_* settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=int(os.getenv('ESCROW_HASH_WORKERS', DEFAULT_HASH_WORKERS)),
+                    queue_limit=int(os.getenv('ESCROW_HASH_QUEUE_LIMIT', DEFAULT_HASH_QUEUE_LIMIT)),
+                    timeout=float(os.getenv('ESCROW_HASH_TIMEOUT', DEFAULT_HASH_TIMEOUT)),
+                )
+    return _pool
+
+
+def hashing_stats():
+    """Return metrics for the process-wide hashing pool."""
+    return get_hashing_pool().stats()
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+
+
+def _check(hashed_password, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Stored value is not a valid bcrypt hash
+        return False
+
 
 def hash_password(password):
     """
     Generate a salted bcrypt hash for a plaintext password.
 
     - `password` should be the user's plaintext password.
+    - Uses the configured cost factor (ESCROW_BCRYPT_ROUNDS) and runs on the hashing pool.
     - Returns the resulting hash as a UTF-8–decoded string for storage.
     """
-    # Generate a random salt and compute the hash
-    salt = bcrypt.gensalt()
-    hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), salt)
+    hashed_bytes = get_hashing_pool().submit('hash', _hash, password, bcrypt_rounds())
     # Decode bytes to string for JSON/db storage
     return hashed_bytes.decode('utf-8')
 
@@ -23,10 +200,7 @@ def check_password(hashed_password, password):
 
     - `hashed_password` is the UTF-8–encoded hash from storage.
     - `password` is the plaintext candidate.
-    - Returns True if they match, False otherwise.
+    - Runs on the hashing pool.
+    - Returns True if they match, False otherwise (including malformed hashes).
     """
-    # Encode stored hash and candidate password for comparison
-    return bcrypt.checkpw(
-        password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
\ No newline at end of file
+    return get_hashing_pool().submit('verify', _check, hashed_password, password)
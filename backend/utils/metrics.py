@@ -0,0 +1,265 @@
+import bisect
+import hmac
+import os
+import threading
+import time
+
+from flask import Response, g, jsonify, request, session
+
+# Lightweight in-process metrics.
+# - Histogram: fixed-bucket histogram shared by the query profiler and request
+#   instrumentation. Not thread-safe on its own; owners guard it with their lock.
+# - RequestMetrics / init_request_metrics: Flask hooks that time every request and
+#   serve the results in Prometheus text exposition format. Streamed responses are
+#   timed until the body has been sent. The endpoint reveals traffic and error
+#   rates per endpoint, so it is admin-only like /admin/metrics; scrapers that
+#   cannot log in send ESCROW_METRICS_TOKEN as a bearer token instead.
+
+# Default latency buckets in milliseconds (upper bounds; the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum and max.
+    Percentiles are estimated from the buckets (upper bound of the bucket holding the rank).
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        # One slot per bound plus the overflow bucket
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self):
+        """Return [(upper_bound, cumulative_count), ...] ending with ('+Inf', count)."""
+        running, buckets = 0, []
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            running += count
+            buckets.append((bound, running))
+        return buckets
+
+    def percentile(self, q):
+        """Estimate the q-th percentile (0-100); the observed max stands in for the overflow bucket."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Summary suitable for JSON: count, sum, avg, max, p50/p95/p99 and cumulative buckets."""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': [[bound, count] for bound, count in self.cumulative()],
+        }
+
+
+# ---------- Request instrumentation (Prometheus text exposition) ----------
+
+# Request latency buckets in seconds and response size buckets in bytes
+REQUEST_LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+RESPONSE_SIZE_BUCKETS_BYTES = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels) + '}'
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint HTTP metrics, labelled by blueprint and endpoint:
+    request counts by method/status, latency and response size histograms,
+    and an in-flight gauge. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._latency = {}
+        self._sizes = {}
+        self._in_flight = {}
+
+    def started(self, route):
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 0) + 1
+
+    def finished(self, route, method, status, elapsed_s):
+        with self._lock:
+            self._in_flight[route] -= 1
+            key = route + (method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(route)
+            if histogram is None:
+                histogram = self._latency[route] = Histogram(REQUEST_LATENCY_BUCKETS_S)
+            histogram.observe(elapsed_s)
+
+    def response_size(self, route, size):
+        with self._lock:
+            histogram = self._sizes.get(route)
+            if histogram is None:
+                histogram = self._sizes[route] = Histogram(RESPONSE_SIZE_BUCKETS_BYTES)
+            histogram.observe(size)
+
+    def _render_histogram(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (blueprint, endpoint), histogram in sorted(histograms.items()):
+            labels = [('blueprint', blueprint), ('endpoint', endpoint)]
+            for bound, count in histogram.cumulative():
+                le = bound if bound == '+Inf' else _format_number(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels + [("le", le)])} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(histogram.sum)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines.append('# HELP escrow_http_requests_total HTTP requests handled, by status code.')
+            lines.append('# TYPE escrow_http_requests_total counter')
+            for (blueprint, endpoint, method, status), count in sorted(self._requests.items()):
+                labels = [('blueprint', blueprint), ('endpoint', endpoint), ('method', method), ('status', status)]
+                lines.append(f'escrow_http_requests_total{_format_labels(labels)} {count}')
+
+            lines.append('# HELP escrow_http_requests_in_flight HTTP requests currently being served.')
+            lines.append('# TYPE escrow_http_requests_in_flight gauge')
+            for (blueprint, endpoint), count in sorted(self._in_flight.items()):
+                labels = [('blueprint', blueprint), ('endpoint', endpoint)]
+                lines.append(f'escrow_http_requests_in_flight{_format_labels(labels)} {count}')
+
+            self._render_histogram(lines, 'escrow_http_request_duration_seconds',
+                                   'HTTP request latency in seconds.', self._latency)
+            self._render_histogram(lines, 'escrow_http_response_size_bytes',
+                                   'HTTP response body size in bytes.', self._sizes)
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._latency.clear()
+            self._sizes.clear()
+            self._in_flight = {route: count for route, count in self._in_flight.items() if count}
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_labels():
+    """(blueprint, endpoint) labels for the current request; unmatched URLs share one label."""
+    return request.blueprint or '', request.endpoint or 'unmatched'
+
+
+def _once(callback):
+    """Wrap callback so that only its first call runs, whichever thread makes it."""
+    lock, called = threading.Lock(), []
+
+    def call():
+        with lock:
+            if called:
+                return
+            called.append(True)
+        callback()
+    return call
+
+
+def _counting(body, route, on_done):
+    """
+    Pass a streamed response body through, recording its total size once it is
+    exhausted, then call on_done().
+    """
+    size = 0
+    try:
+        for chunk in body:
+            size += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        request_metrics.response_size(route, size)
+        if hasattr(body, 'close'):
+            body.close()
+        on_done()
+
+
+def init_request_metrics(app, path='/metrics'):
+    """
+    Register before/after/teardown hooks that time every request, and serve the
+    collected metrics in text exposition format at `path`.
+    """
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_route = _route_labels()
+        g.metrics_started = time.perf_counter()
+        request_metrics.started(g.metrics_route)
+
+    @app.after_request
+    def _record_response(response):
+        route = g.get('metrics_route')
+        if route is None:
+            return response
+        g.metrics_status = response.status_code
+        if response.is_streamed:
+            # The body is sent after teardown: time the request until the body is
+            # exhausted or the response is closed, whichever comes first
+            method, status, started = request.method, response.status_code, g.metrics_started
+            finish = _once(lambda: request_metrics.finished(route, method, status, time.perf_counter() - started))
+            response.response = _counting(response.response, route, finish)
+            response.call_on_close(finish)
+            g.metrics_deferred = True
+        else:
+            request_metrics.response_size(route, response.content_length or 0)
+        return response
+
+    @app.teardown_request
+    def _stop_timer(error):
+        route = g.pop('metrics_route', None)
+        if route is None or g.pop('metrics_deferred', False):
+            return
+        status = 500 if error is not None else g.pop('metrics_status', 500)
+        request_metrics.finished(route, request.method, status, time.perf_counter() - g.pop('metrics_started'))
+
+    @app.route(path, methods=['GET'])
+    def metrics():
+        """
+        GET /metrics: request metrics in Prometheus text exposition format.
+        Requires an admin session or 'Authorization: Bearer <ESCROW_METRICS_TOKEN>'.
+        """
+        # Read per request: .env is loaded after this module is imported
+        token = os.getenv('ESCROW_METRICS_TOKEN') or None
+        authorization = request.headers.get('Authorization', '')
+        token_ok = (token is not None and authorization.startswith('Bearer ')
+                    and hmac.compare_digest(authorization[len('Bearer '):], token))
+        if not token_ok and ('user_id' not in session or session.get('role') != 'admin'):
+            return jsonify({'status': 'failure', 'message': 'Unauthorized'}), 403
+        return Response(request_metrics.render(), content_type=EXPOSITION_CONTENT_TYPE)
@@ -0,0 +1,97 @@
+import base64
+import binascii
+
+# Keyset (cursor) pagination helpers shared by list endpoints.
+# Pages are ordered by row id; the cursor is an opaque token holding the last id
+# of the previous page, so each page is an index range seek instead of an OFFSET scan.
+
+# Page size used when the client does not ask for one
+DEFAULT_PAGE_SIZE = 500
+# Hard server-side cap; larger 'limit' values are rejected
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Raised for malformed 'limit' or 'after' query parameters."""
+
+
+def encode_cursor(last_id):
+    """Encode the last row id of a page as an opaque cursor token."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token back into the row id it points after."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        prefix, value = base64.urlsafe_b64decode(padded.encode()).decode().split(':', 1)
+        if prefix != 'id':
+            raise ValueError(prefix)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+
+def encode_rank_cursor(rank, last_id):
+    """Encode the (rank, id) of the last row of a relevance-ordered page as a cursor token."""
+    return base64.urlsafe_b64encode(f"rank:{rank!r}:{last_id}".encode()).decode().rstrip('=')
+
+
+def decode_rank_cursor(token):
+    """Decode a ranked cursor token back into the (rank, id) it points after."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        prefix, rank, value = base64.urlsafe_b64decode(padded.encode()).decode().split(':', 2)
+        if prefix != 'rank':
+            raise ValueError(prefix)
+        return float(rank), int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+
+def parse_page_args(args, ranked=False):
+    """
+    Read 'limit' and 'after' from request query parameters.
+    Returns (after, limit); after is None for the first page, otherwise the
+    last id, or a (rank, id) pair for relevance-ordered search results (ranked=True).
+    Raises PaginationError on invalid values or a limit above MAX_PAGE_SIZE.
+    """
+    limit = args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError('limit must be an integer')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise PaginationError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    after = args.get('after')
+    if not after:
+        return None, limit
+    return (decode_rank_cursor(after) if ranked else decode_cursor(after)), limit
+
+
+def paginate(rows, limit, key='id'):
+    """
+    Split rows fetched with `limit + 1` into the page and the next cursor.
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    if rows is None:
+        return None, None
+    if len(rows) > limit:
+        page = rows[:limit]
+        return page, encode_cursor(page[-1][key])
+    return rows, None
+
+
+def paginate_ranked(rows, limit, rank_key='rank'):
+    """
+    Like paginate(), for rows ordered by (rank_key, 'id') such as search results,
+    or units sorted by price.
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    if rows is None:
+        return None, None
+    if len(rows) > limit:
+        page = rows[:limit]
+        return page, encode_rank_cursor(page[-1][rank_key], page[-1]['id'])
+    return rows, None
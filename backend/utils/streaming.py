@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+
+# Utilities for streaming request and response bodies.
+# Uploaded CSV / NDJSON records are read line by line from the request stream,
+# and exports are written element by element, so neither an upload nor a large
+# result set has to be held in memory as a whole.
+
+CSV_TYPES = {'text/csv', 'application/csv'}
+NDJSON_TYPES = {'application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines'}
+
+
+def detect_format(mimetype):
+    """
+    Map a request mimetype to an import format.
+    Returns 'csv', 'ndjson', or None if the type is not supported.
+    """
+    if mimetype in CSV_TYPES:
+        return 'csv'
+    if mimetype in NDJSON_TYPES:
+        return 'ndjson'
+    return None
+
+
+def iter_records(stream, fmt, encoding='utf-8'):
+    """
+    Lazily parse a binary stream of CSV (with header row) or NDJSON records.
+    Yields (row_number, record, error) tuples: `record` is a dict when the line
+    parsed, otherwise None and `error` describes the problem. Row numbers are
+    1-based data rows (the CSV header is not counted).
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row_number, row in enumerate(reader, start=1):
+                if None in row:
+                    yield row_number, None, 'Too many fields'
+                else:
+                    yield row_number, {k.strip(): (v.strip() if v is not None else None) for k, v in row.items()}, None
+        elif fmt == 'ndjson':
+            row_number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield row_number, None, 'Invalid JSON'
+                    continue
+                if not isinstance(record, dict):
+                    yield row_number, None, 'Expected a JSON object'
+                else:
+                    yield row_number, record, None
+        else:
+            raise ValueError(f"Unsupported import format: {fmt!r}")
+    except UnicodeDecodeError:
+        yield None, None, f'Body is not valid {encoding}'
+    finally:
+        # Do not close the underlying request stream
+        text.detach()
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items from an iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Streaming export formats and their response mimetypes
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _buffered(parts, size=65536):
+    """Coalesce small string parts into chunks of roughly `size` characters."""
+    buffer, length = [], 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_json_export(rows, key):
+    """
+    Serialize rows as {"status": "success", "<key>": [...]} one element at a time,
+    so the full document never exists in memory.
+    """
+    def parts():
+        yield '{"status": "success", %s: [' % json.dumps(key)
+        separator = ''
+        for row in rows:
+            yield separator + json.dumps(row, default=str)
+            separator = ','
+        yield ']}'
+    return _buffered(parts())
+
+
+def iter_ndjson_export(rows):
+    """Serialize rows as newline-delimited JSON, one object per line."""
+    return _buffered(json.dumps(row, default=str) + '\n' for row in rows)
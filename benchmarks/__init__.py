@@ -0,0 +1 @@
+"""Load-generation and micro-benchmark suites for the escrow API (not run by pytest)."""
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.load import _git_commit, _stats
+from benchmarks.seed import scale_arguments, scale_from_args, seed_database
+
+# Booking contention benchmark.
+# Simulates a launch: in each round, `concurrency` threads released together fire
+# `attempts` bookings at a handful of hot units through create_booking(). Every
+# round must end with exactly one booking per hot unit, and ProjectStats must
+# still agree with a recomputation. Attempts/s and latency percentiles are
+# reported per round so throughput can be checked for stability under contention.
+#
+#   python -m benchmarks.contention --scale small --hot-units 3 --attempts 5000 --concurrency 32 --rounds 5
+
+
+def _hot_units(db_path, count, rng):
+    """Pick `count` free units at random; returns their internal ids."""
+    conn = sqlite3.connect(db_path)
+    try:
+        free = [row[0] for row in conn.execute("SELECT id FROM Unit WHERE booked = 0 ORDER BY id")]
+    finally:
+        conn.close()
+    if len(free) < count:
+        raise ValueError(f"Only {len(free)} free units left; seed a larger dataset")
+    return rng.sample(free, count)
+
+
+def _check_round(db_path, unit_ids):
+    """
+    Count bookings per hot unit after a round.
+    Returns (bookings per unit, number of extra bookings beyond one per unit).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = {unit_id: 0 for unit_id in unit_ids}
+        placeholders = ",".join("?" * len(unit_ids))
+        for unit_id, count in conn.execute(
+                f"SELECT unit_id, COUNT(*) FROM Booking WHERE unit_id IN ({placeholders}) GROUP BY unit_id",
+                unit_ids):
+            counts[unit_id] = count
+    finally:
+        conn.close()
+    return counts, sum(max(0, count - 1) for count in counts.values())
+
+
+def run_round(db_path, buyer_ids, hot_units=3, attempts=2000, concurrency=16, rng=None):
+    """
+    Fire `attempts` bookings from `concurrency` threads at `hot_units` free units at once.
+    Returns the round's stats: attempts/s, latency percentiles, outcome counts and
+    double bookings (which must be 0).
+    """
+    from backend.db.queries import create_booking
+
+    rng = rng or random.Random(42)
+    unit_ids = _hot_units(db_path, hot_units, rng)
+    stamp = datetime.utcnow().isoformat()
+    barrier = threading.Barrier(concurrency)
+    lock = threading.Lock()
+    latencies, outcomes = [], {'booked': 0, 'rejected': 0}
+
+    def worker(index):
+        local_rng = random.Random(rng.random() + index)
+        mine = attempts // concurrency + (1 if index < attempts % concurrency else 0)
+        samples, booked = [], 0
+        barrier.wait()
+        for _ in range(mine):
+            started = time.perf_counter()
+            booking_id = create_booking(local_rng.choice(unit_ids), local_rng.choice(buyer_ids),
+                                        50000.0, stamp[:10], stamp)
+            samples.append(time.perf_counter() - started)
+            booked += booking_id is not None
+        with lock:
+            latencies.extend(samples)
+            outcomes['booked'] += booked
+            outcomes['rejected'] += len(samples) - booked
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+
+    per_unit, double_bookings = _check_round(db_path, unit_ids)
+    stats = _stats(sorted(latencies), wall_seconds)
+    stats.update({
+        'max_ms': round(max(latencies) * 1000, 3) if latencies else 0.0,
+        'wall_seconds': round(wall_seconds, 3),
+        'booked': outcomes['booked'],
+        'rejected': outcomes['rejected'],
+        'units_booked': sum(1 for count in per_unit.values() if count),
+        'double_bookings': double_bookings,
+    })
+    return stats
+
+
+def run_contention(db_path, hot_units=3, attempts=2000, concurrency=16, rounds=3, seed=42):
+    """
+    Run `rounds` contention rounds against a seeded database.
+    Returns {'meta', 'rounds', 'summary'}; summary['ok'] is False if any unit was
+    double-booked or the ProjectStats rollup drifted.
+    """
+    from backend.db.db_connection import configure_pool, get_connection
+    from backend.db.profiler import configure_profiler, reset_profiler
+    from backend.db.project_stats import verify_project_stats
+
+    pool = configure_pool(db_path=db_path, size=concurrency)
+    # Open every pooled connection up front so the first round does not pay for it
+    warm = [pool.acquire() for _ in range(concurrency)]
+    for raw in warm:
+        pool.release(raw)
+    conn = sqlite3.connect(db_path)
+    try:
+        buyer_ids = [row[0] for row in conn.execute("SELECT id FROM Buyer ORDER BY id")]
+    finally:
+        conn.close()
+
+    rng = random.Random(seed)
+    # Lock waits are reported in the percentiles; keep the slow-query log quiet
+    configure_profiler(slow_query_ms=float('inf'))
+    try:
+        results = [run_round(db_path, buyer_ids, hot_units, attempts, concurrency, rng) for _ in range(rounds)]
+    finally:
+        reset_profiler()
+
+    conn = get_connection()
+    try:
+        drift = verify_project_stats(conn)
+    finally:
+        conn.close()
+
+    throughput = [result['rps'] for result in results]
+    double_bookings = sum(result['double_bookings'] for result in results)
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'hot_units': hot_units,
+            'attempts': attempts,
+            'concurrency': concurrency,
+            'rounds': rounds,
+            'seed': seed,
+        },
+        'rounds': results,
+        'summary': {
+            'double_bookings': double_bookings,
+            'stats_drift': len(drift),
+            'min_rps': min(throughput),
+            'max_rps': max(throughput),
+            # Relative spread of attempts/s across rounds; small means throughput held steady
+            'rps_spread': round((max(throughput) - min(throughput)) / max(throughput), 3) if max(throughput) else 0.0,
+            'ok': double_bookings == 0 and not drift
+                  and all(result['units_booked'] == hot_units for result in results),
+        },
+    }
+
+
+def format_report(results):
+    """Render contention results as a fixed-width table."""
+    meta, summary = results['meta'], results['summary']
+    lines = [
+        f"hot_units={meta['hot_units']} attempts={meta['attempts']} concurrency={meta['concurrency']}",
+        f"{'round':<6} {'attempts/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+        f"{'booked':>7} {'rejected':>9} {'double':>7}",
+    ]
+    for number, result in enumerate(results['rounds'], start=1):
+        lines.append(f"{number:<6} {result['rps']:>11.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                     f"{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f} {result['booked']:>7} "
+                     f"{result['rejected']:>9} {result['double_bookings']:>7}")
+    lines.append(f"double bookings={summary['double_bookings']} stats drift={summary['stats_drift']} "
+                 f"attempts/s spread={summary['rps_spread']:.1%} -> {'OK' if summary['ok'] else 'FAILED'}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fire concurrent bookings at a few hot units.')
+    scale_arguments(parser)
+    parser.add_argument('--hot-units', type=int, default=3, help='units everyone races for per round')
+    parser.add_argument('--attempts', type=int, default=2000, help='booking attempts per round')
+    parser.add_argument('--concurrency', type=int, default=16, help='threads booking at once')
+    parser.add_argument('--rounds', type=int, default=3, help='rounds, each on fresh hot units')
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    db_path = os.path.join(tempfile.mkdtemp(prefix='escrow-contention-'), 'bench.db')
+    manifest = seed_database(db_path, seed=args.seed, **scale_from_args(args))
+    print(f"Seeded {db_path} in {manifest['seconds']}s: {manifest['counts']}")
+
+    results = run_contention(db_path, args.hot_units, args.attempts, args.concurrency, args.rounds, args.seed)
+    print(format_report(results))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.out}")
+    return 0 if results['summary']['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
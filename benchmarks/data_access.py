@@ -0,0 +1,381 @@
+import argparse
+import inspect
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from backend.db.migrate import init_db
+from benchmarks.load import _git_commit, percentile
+from benchmarks.seed import seed_database
+
+# Micro-benchmarks for backend/db/queries.py.
+# Seeds one dataset per row-count scale, calls every data-access function
+# directly (through the connection pool, as the routes do) and records its
+# latency. The median latency at each scale gives a scaling curve per function,
+# summarised as the log-log slope between the smallest and largest scale:
+# ~0 for index lookups (O(1)/O(log n)), ~1 for anything that reads the whole
+# table (O(n)). Functions expected to be index-bound fail the run when their
+# slope exceeds --max-exponent, catching accidental full scans.
+#
+#   python -m benchmarks.data_access --scales 1k,100k --out curves.json
+#   python -m benchmarks.data_access --scales 1k,100k,1m --data-dir /tmp/escrow-bench-data
+
+# Named scales: number of units; the other tables are sized relative to it
+ROW_SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+UNITS_PER_PROJECT = 100
+PROJECTS_PER_BUILDER = 10
+
+# Functions that return or aggregate a whole table and are expected to be O(n)
+WHOLE_TABLE = {
+    'fetch_all_bookings',
+    'fetch_all_transactions',
+    'fetch_all_projects',
+    'fetch_platform_overview',
+    'iter_all_bookings',
+    'iter_all_transactions',
+    'iter_all_projects',
+}
+
+# Arguments for each call: name -> function(ctx, i) returning the positional
+# arguments for the i-th call. Writes get fresh keys on every call so each one
+# does real work instead of failing on a constraint, and go to a different
+# builder/project than the reads so they do not inflate what is being read.
+QUERY_CALLS = {
+    'get_user_by_email': lambda ctx, i: (ctx['builder_email'],),
+    'create_user': lambda ctx, i: (f'Bench {i}', f'micro{i}@bench.test', 'hash', 'builder', ctx['stamp']),
+    'update_user_password_hash': lambda ctx, i: (ctx['builder_id'], 'hash'),
+    'get_buyer_by_email': lambda ctx, i: (ctx['buyer_email'],),
+    'get_buyer_by_emirates_id': lambda ctx, i: (ctx['emirates_id'],),
+    'create_buyer': lambda ctx, i: (f'Bench {i}', f'MICRO{i:010d}', '0500000000',
+                                    f'microbuyer{i}@bench.test', 'hash', ctx['stamp']),
+    'update_buyer_password_hash': lambda ctx, i: (ctx['buyer_id'], 'hash'),
+    'insert_project': lambda ctx, i: (ctx['write_builder_id'], f'Micro Tower {i}', 'Dubai', 0, ctx['stamp']),
+    'fetch_projects_by_builder': lambda ctx, i: (ctx['builder_id'],),
+    'insert_unit': lambda ctx, i: (ctx['write_project_id'], f'MICRO-{i}', 1, 900.0, 1000000.0, ctx['stamp']),
+    'insert_units_bulk': lambda ctx, i: (
+        ctx['write_project_id'], [(f'MICRO-B{i}-{k}', 1, 900.0, 1000000.0) for k in range(50)], ctx['stamp']),
+    'fetch_units_by_project': lambda ctx, i: (ctx['project_id'],),
+    'fetch_unit_availability': lambda ctx, i: (ctx['project_id'],),
+    'create_booking': lambda ctx, i: (ctx['free_units'][i % len(ctx['free_units'])], ctx['buyer_id'],
+                                      50000.0, '2025-06-01', ctx['stamp']),
+    'create_bookings_batch': lambda ctx, i: (
+        [(unit, ctx['buyer_id'], 50000.0, '2025-06-01')
+         for unit in ctx['free_units'][i * 5 % len(ctx['free_units']):][:5]], ctx['stamp']),
+    'fetch_booking_by_unit_id': lambda ctx, i: (ctx['booked_unit_id'],),
+    'fetch_bookings_by_buyer_id': lambda ctx, i: (ctx['buyer_id'],),
+    'fetch_all_bookings': lambda ctx, i: (),
+    'iter_all_bookings': lambda ctx, i: (),
+    'create_transaction': lambda ctx, i: (50000.0, '2025-06-01', 'cash', ctx['stamp'], ctx['buyer_id'],
+                                          ctx['unpaid_units'][i % len(ctx['unpaid_units'])]),
+    'insert_transactions_bulk': lambda ctx, i: (
+        [(ctx['project_id'], f'micro:{i}:{k}', 50000.0, '2025-06-01', 'cash', ctx['buyer_id'], unit)
+         for k, unit in enumerate(ctx['unpaid_units'][i * 5 % len(ctx['unpaid_units']):][:5])], ctx['stamp']),
+    'fetch_unit_codes': lambda ctx, i: (ctx['builder_id'],),
+    'fetch_all_transactions': lambda ctx, i: (),
+    'iter_all_transactions': lambda ctx, i: (),
+    'fetch_transactions_by_builder': lambda ctx, i: (ctx['builder_id'],),
+    'fetch_transactions_by_buyer_id': lambda ctx, i: (ctx['buyer_id'], None, 50),
+    'fetch_dashboard_data': lambda ctx, i: (ctx['builder_id'],),
+    'fetch_all_builders': lambda ctx, i: (),
+    'fetch_all_projects': lambda ctx, i: (),
+    'iter_all_projects': lambda ctx, i: (),
+    'fetch_platform_overview': lambda ctx, i: (),
+    # Selective search terms: the match set, not the table, should bound the cost
+    'fetch_bookings_by_buyer_or_unit': lambda ctx, i: (ctx['unit_code'], None, 50),
+    'search_projects_by_name': lambda ctx, i: (ctx['project_name'], None, 50),
+    'filter_bookings': lambda ctx, i: ({'builder_id': ctx['builder_id'], 'status': 'matched',
+                                        'min_amount': 10000}, None, 50),
+    'get_unit_internal_id_by_unit_code': lambda ctx, i: (ctx['unit_code'],),
+    'get_unit_by_internal_id': lambda ctx, i: (ctx['booked_unit_id'],),
+    'match_transaction_to_booking': lambda ctx, i: ctx['unmatched'][i % len(ctx['unmatched'])],
+    'fetch_unmatched_transactions_by_builder': lambda ctx, i: (ctx['builder_id'],),
+    'fetch_unmatched_bookings_by_builder': lambda ctx, i: (ctx['builder_id'],),
+    'apply_transaction_matches': lambda ctx, i: (ctx['builder_id'], [ctx['unmatched'][i % len(ctx['unmatched'])]]),
+    'fetch_bookings_by_builder_id': lambda ctx, i: (ctx['builder_id'],),
+    'fetch_project_by_id': lambda ctx, i: (ctx['project_id'],),
+}
+
+
+def scale_parameters(units):
+    """seed_database() arguments for a dataset of roughly `units` units."""
+    projects = max(1, units // UNITS_PER_PROJECT)
+    return {
+        'builders': max(1, projects // PROJECTS_PER_BUILDER),
+        'projects_per_builder': min(projects, PROJECTS_PER_BUILDER),
+        'units_per_project': min(units, UNITS_PER_PROJECT),
+        'buyers': max(10, units // 2),
+    }
+
+
+def prepare_dataset(label, data_dir, seed=42):
+    """
+    Return the path of a pristine seeded database for a scale, seeding it into
+    `data_dir` on first use so large datasets are only generated once.
+    """
+    path = os.path.join(data_dir, f'micro-{label}-seed{seed}.db')
+    if not os.path.exists(path):
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        seed_database(partial, seed=seed, **scale_parameters(ROW_SCALES[label]))
+        os.replace(partial, path)
+    return path
+
+
+def _middle(conn, sql, params=()):
+    """The row in the middle of a query's result, so lookups avoid the cheap first/last pages."""
+    rows = conn.execute(sql, params).fetchall()
+    return rows[len(rows) // 2] if rows else None
+
+
+def build_context(db_path, max_calls):
+    """
+    Pick representative keys (builder, buyer, project, unit, ...) from a working
+    copy of a seeded database, adding a builder and project for the writes.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        builder = _middle(conn, "SELECT id, email FROM User WHERE role = 'builder' ORDER BY id")
+        # A builder and project of their own for the write benchmarks (this is a working copy)
+        write_builder = conn.execute(
+            "INSERT INTO User (name, email, password_hash, role, created_at) VALUES (?,?,?,?,?)",
+            ('Micro Writer', 'micro-writer@bench.test', 'hash', 'builder', '2025-06-01')
+        ).lastrowid
+        write_project = conn.execute(
+            "INSERT INTO Project (name, location, num_units, builder_id, created_at) VALUES (?,?,?,?,?)",
+            ('Micro Writes', 'Dubai', 0, write_builder, '2025-06-01')
+        ).lastrowid
+        conn.execute("INSERT INTO ProjectStats (project_id) VALUES (?)", (write_project,))
+        conn.commit()
+        buyer = _middle(conn, "SELECT b.id, b.email, b.emirates_id FROM Buyer b"
+                              " WHERE EXISTS (SELECT 1 FROM Booking WHERE buyer_id = b.id) ORDER BY b.id")
+        project = _middle(conn, "SELECT id FROM Project WHERE builder_id = ? ORDER BY id", (builder[0],))
+        booked = _middle(conn, "SELECT u.id, u.unit_id FROM Unit u JOIN Booking b ON b.unit_id = u.id"
+                               " WHERE u.project_id = ? ORDER BY u.id", (project[0],))
+        free_units = [row[0] for row in conn.execute(
+            "SELECT id FROM Unit WHERE booked = 0 ORDER BY id LIMIT ?", (max_calls,))]
+        # Transaction_log.unit_id is unique, so every payment needs a unit that has none yet
+        unpaid = [row[0] for row in conn.execute(
+            "SELECT u.id FROM Unit u"
+            " WHERE NOT EXISTS (SELECT 1 FROM Transaction_log t WHERE t.unit_id = u.id)"
+            " ORDER BY u.id LIMIT ?", (max_calls,))]
+        unmatched = [tuple(row) for row in conn.execute(
+            "SELECT t.id, b.id FROM Transaction_log t JOIN Booking b ON b.unit_id = t.unit_id"
+            " WHERE t.booking_id IS NULL ORDER BY t.id LIMIT ?", (max_calls,))]
+        project_name = conn.execute("SELECT name FROM Project WHERE id = ?", (project[0],)).fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        'stamp': datetime(2025, 6, 1).isoformat(),
+        'builder_id': builder[0],
+        'builder_email': builder[1],
+        'buyer_id': buyer[0],
+        'buyer_email': buyer[1],
+        'emirates_id': buyer[2],
+        'project_id': project[0],
+        'write_builder_id': write_builder,
+        'write_project_id': write_project,
+        'booked_unit_id': booked[0],
+        'unit_code': booked[1],
+        'free_units': free_units,
+        'unpaid_units': unpaid,
+        'unmatched': unmatched,
+        'project_name': project_name,
+    }
+
+
+def _call(fn, args):
+    """Call a data-access function, draining generators; returns the number of rows produced."""
+    result = fn(*args)
+    if inspect.isgenerator(result):
+        return sum(1 for _ in result)
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def time_function(name, ctx, min_calls=5, max_calls=200, budget_seconds=2.0, warmup=2):
+    """
+    Call one data-access function repeatedly: at least `min_calls` times, then
+    until `max_calls` or `budget_seconds` is reached, after `warmup` untimed calls.
+    Returns {'calls', 'rows', 'min_ms', 'median_ms', 'p95_ms'}.
+    """
+    from backend.db import queries
+
+    fn = getattr(queries, name)
+    make_args = QUERY_CALLS[name]
+    for i in range(warmup):
+        _call(fn, make_args(ctx, max_calls + i))
+
+    timings, rows = [], 0
+    started = time.perf_counter()
+    for i in range(max_calls):
+        args = make_args(ctx, i)
+        call_started = time.perf_counter()
+        rows = _call(fn, args)
+        timings.append(time.perf_counter() - call_started)
+        if len(timings) >= min_calls and time.perf_counter() - started > budget_seconds:
+            break
+    timings.sort()
+    return {
+        'calls': len(timings),
+        'rows': rows,
+        'min_ms': round(timings[0] * 1000, 4),
+        'median_ms': round(percentile(timings, 50) * 1000, 4),
+        'p95_ms': round(percentile(timings, 95) * 1000, 4),
+    }
+
+
+def run_scale(label, data_dir, names=None, seed=42, **timing):
+    """
+    Benchmark every function (or just `names`) against a working copy of the
+    scale's dataset, so writes never leak into the cached pristine file.
+    """
+    from backend.db.db_connection import configure_pool
+    from backend.db.profiler import configure_profiler, reset_profiler
+
+    pristine = prepare_dataset(label, data_dir, seed)
+    work_dir = tempfile.mkdtemp(prefix='escrow-micro-')
+    work_path = os.path.join(work_dir, 'work.db')
+    shutil.copyfile(pristine, work_path)
+    try:
+        # Datasets cached by an older checkout pick up migrations added since
+        conn = sqlite3.connect(work_path)
+        init_db(conn)
+        conn.close()
+        max_calls = timing.get('max_calls', 200)
+        ctx = build_context(work_path, max_calls + 10)
+        configure_pool(db_path=work_path, size=1)
+        # Whole-table functions are slow by design at large scales; keep the slow-query log quiet
+        configure_profiler(slow_query_ms=float('inf'))
+        functions = {name: time_function(name, ctx, **timing) for name in names or QUERY_CALLS}
+        configure_pool(db_path=os.path.join(work_dir, 'closed.db'), size=1)
+    finally:
+        reset_profiler()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {'units': ROW_SCALES[label], 'functions': functions}
+
+
+def scaling_exponent(points):
+    """
+    Log-log slope between the first and last (rows, latency) points:
+    0 means flat, 1 means latency grows linearly with the data.
+    """
+    (n1, t1), (n2, t2) = points[0], points[-1]
+    if n2 <= n1 or t1 <= 0 or t2 <= 0:
+        return 0.0
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def classify(exponent):
+    """Human-readable growth class for a scaling exponent."""
+    if exponent < 0.25:
+        return 'O(1)/O(log n)'
+    if exponent < 0.75:
+        return 'sublinear'
+    return 'O(n) or worse'
+
+
+def scaling_curves(scales):
+    """Per-function curve points, exponent and class from the per-scale results."""
+    ordered = sorted(scales.values(), key=lambda scale: scale['units'])
+    curves = {}
+    for name in ordered[0]['functions']:
+        points = [(scale['units'], scale['functions'][name]['median_ms']) for scale in ordered]
+        exponent = scaling_exponent(points) if len(points) > 1 else 0.0
+        curves[name] = {
+            'points': points,
+            'exponent': round(exponent, 3),
+            'class': classify(exponent),
+            'whole_table': name in WHOLE_TABLE,
+        }
+    return curves
+
+
+def regressions(curves, max_exponent):
+    """Index-bound functions whose latency grows faster than `max_exponent`."""
+    return sorted(
+        name for name, curve in curves.items()
+        if not curve['whole_table'] and curve['exponent'] > max_exponent
+    )
+
+
+def format_report(results):
+    """Render median latency per scale and the fitted growth class as a table."""
+    labels = sorted(results['scales'], key=lambda label: results['scales'][label]['units'])
+    lines = [f"{'function':<36}" + ''.join(f"{label + ' ms':>12}" for label in labels)
+             + f"{'slope':>8}  class"]
+    for name, curve in results['curves'].items():
+        cells = ''.join(f"{results['scales'][label]['functions'][name]['median_ms']:>12.3f}" for label in labels)
+        marker = ' (whole table)' if curve['whole_table'] else ''
+        lines.append(f"{name:<36}{cells}{curve['exponent']:>8.2f}  {curve['class']}{marker}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmark every queries.py function at several scales.')
+    parser.add_argument('--scales', default='1k,100k',
+                        help=f"comma-separated scales from {', '.join(ROW_SCALES)}")
+    parser.add_argument('--only', help='comma-separated function names to benchmark')
+    parser.add_argument('--data-dir', help='directory where seeded datasets are cached between runs')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the datasets')
+    parser.add_argument('--budget', type=float, default=2.0, help='seconds spent timing each function')
+    parser.add_argument('--max-calls', type=int, default=200, help='maximum timed calls per function')
+    parser.add_argument('--max-exponent', type=float, default=0.5,
+                        help='fail when an index-bound function scales worse than n^this')
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    labels = [label.strip() for label in args.scales.split(',') if label.strip()]
+    unknown = [label for label in labels if label not in ROW_SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+    names = [name.strip() for name in args.only.split(',')] if args.only else None
+    if names and set(names) - set(QUERY_CALLS):
+        parser.error(f"unknown function(s): {', '.join(sorted(set(names) - set(QUERY_CALLS)))}")
+
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='escrow-micro-data-')
+    os.makedirs(data_dir, exist_ok=True)
+
+    scales = {}
+    for label in labels:
+        started = time.perf_counter()
+        scales[label] = run_scale(label, data_dir, names, args.seed, budget_seconds=args.budget,
+                                  max_calls=args.max_calls)
+        print(f"Benchmarked {label} ({ROW_SCALES[label]} units) in {time.perf_counter() - started:.1f}s")
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'seed': args.seed,
+        },
+        'scales': scales,
+        'curves': scaling_curves(scales),
+    }
+    print(format_report(results))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.out}")
+
+    slow = regressions(results['curves'], args.max_exponent) if len(labels) > 1 else []
+    if slow:
+        print(f"Index-bound functions scaling worse than n^{args.max_exponent}: {', '.join(slow)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
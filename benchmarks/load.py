@@ -0,0 +1,326 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.seed import scale_arguments, scale_from_args, seed_database
+
+# End-to-end load generator for the escrow API.
+# Seeds a synthetic dataset into a temporary SQLite file, then drives the Flask
+# app in-process (one test client per simulated user) through a weighted mix of
+# buyer, builder and admin scenarios. Reports req/s and p50/p95/p99 latency per
+# endpoint and saves the results as a JSON baseline that later runs can be
+# compared against.
+#
+#   python -m benchmarks.load --scale small --requests 5000 --concurrency 8 --out base.json
+#   python -m benchmarks.load --scale small --requests 5000 --concurrency 8 --compare base.json
+
+# Scenario weights per named traffic mix
+MIXES = {
+    'default': {'buyer_browse': 45, 'buyer_booking': 10, 'buyer_payment': 10,
+                'builder_dashboard': 25, 'admin_search': 10},
+    'launch': {'buyer_browse': 40, 'buyer_booking': 45, 'buyer_payment': 5,
+               'builder_dashboard': 5, 'admin_search': 5},
+    'read_only': {'buyer_browse': 60, 'builder_dashboard': 25, 'admin_search': 15},
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and status codes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+
+    def record(self, label, status, elapsed):
+        with self._lock:
+            self.samples.setdefault(label, []).append(elapsed)
+            counts = self.statuses.setdefault(label, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def summary(self, wall_seconds):
+        """Per-endpoint and overall count, req/s, latency percentiles (ms) and status codes."""
+        endpoints = {}
+        everything = []
+        for label, values in sorted(self.samples.items()):
+            values = sorted(values)
+            everything.extend(values)
+            endpoints[label] = _stats(values, wall_seconds)
+            endpoints[label]['statuses'] = {str(code): count for code, count in sorted(self.statuses[label].items())}
+            endpoints[label]['errors'] = sum(
+                count for code, count in self.statuses[label].items() if code >= 500)
+        return endpoints, _stats(sorted(everything), wall_seconds)
+
+
+def _stats(values, wall_seconds):
+    stats = {
+        'count': len(values),
+        'rps': round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+    for q in PERCENTILES:
+        stats[f'p{q}_ms'] = round(percentile(values, q) * 1000, 3)
+    return stats
+
+
+class SimulatedUser:
+    """
+    One worker thread's view of the platform: a logged-in buyer, builder and admin
+    client plus a private random stream, so runs with the same seed issue the same requests.
+    """
+
+    def __init__(self, app, manifest, shared, recorder, rng):
+        self.manifest = manifest
+        self.shared = shared
+        self.recorder = recorder
+        self.rng = rng
+        self.buyer_email = rng.choice(manifest['buyer_emails'])
+        self.buyer = self._login(app, '/buyer/auth/login', self.buyer_email)
+        self.builder = self._login(app, '/auth/login', rng.choice(manifest['builder_emails']))
+        self.admin = self._login(app, '/auth/login', manifest['admin_email'])
+        # Bookings this user can pay for: seeded unpaid ones plus those it makes during the run
+        self.unpaid = list(manifest['unpaid_bookings'].get(self.buyer_email, []))
+
+    def _login(self, app, path, email):
+        client = app.test_client()
+        response = client.post(path, json={'email': email, 'password': self.manifest['password']})
+        if response.status_code != 200:
+            raise RuntimeError(f"Benchmark login failed for {email}: {response.status_code}")
+        return client
+
+    def _call(self, client, method, label, path, **kwargs):
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        self.recorder.record(f"{method} {label}", response.status_code, elapsed)
+        return response
+
+    def buyer_browse(self):
+        project_id = self.rng.choice(self.manifest['project_ids'])
+        self._call(self.buyer, 'GET', '/buyer/projects', '/buyer/projects')
+        self._call(self.buyer, 'GET', '/buyer/projects/<id>', f'/buyer/projects/{project_id}')
+        self._call(self.buyer, 'GET', '/buyer/projects/<id>/units', f'/buyer/projects/{project_id}/units')
+        self._call(self.buyer, 'GET', '/buyer/bookings', '/buyer/bookings')
+
+    def buyer_booking(self):
+        unit_code = self.shared.take_free_unit(self.rng)
+        if unit_code is None:
+            return self.buyer_browse()
+        date = datetime.utcnow().date().isoformat()
+        response = self._call(self.buyer, 'POST', '/buyer/bookings', '/buyer/bookings', json={
+            'unit_id': unit_code, 'booking_amount': 50000, 'booking_date': date,
+        })
+        if response.status_code == 201:
+            self.unpaid.append({'unit_id': unit_code, 'amount': 50000, 'date': date})
+
+    def buyer_payment(self):
+        if not self.unpaid:
+            return self.buyer_booking()
+        booking = self.unpaid.pop(self.rng.randrange(len(self.unpaid)))
+        self._call(self.buyer, 'POST', '/buyer/transactions', '/buyer/transactions', json={
+            'unit_id': booking['unit_id'],
+            'amount': booking['amount'],
+            'date': booking['date'],
+            'payment_method': self.rng.choice(('cash', 'bank transfer')),
+        })
+
+    def builder_dashboard(self):
+        self._call(self.builder, 'GET', '/builder/dashboard', '/builder/dashboard')
+        self._call(self.builder, 'GET', '/builder/projects', '/builder/projects')
+        self._call(self.builder, 'GET', '/builder/bookings', '/builder/bookings')
+        self._call(self.builder, 'GET', '/builder/transactions', '/builder/transactions')
+
+    def admin_search(self):
+        term = self.rng.choice(self.manifest['search_terms'])
+        self._call(self.admin, 'GET', '/admin/overview', '/admin/overview')
+        self._call(self.admin, 'GET', '/admin/bookings/search', '/admin/bookings/search', query_string={'q': term})
+        self._call(self.admin, 'GET', '/admin/filter', '/admin/filter', query_string={'project_name': term})
+        self._call(self.admin, 'GET', '/admin/transactions', '/admin/transactions')
+
+
+class SharedState:
+    """State shared by all workers: the pool of still-unbooked unit codes."""
+
+    def __init__(self, free_units):
+        self._lock = threading.Lock()
+        self._free_units = list(free_units)
+
+    def take_free_unit(self, rng):
+        with self._lock:
+            if not self._free_units:
+                return None
+            index = rng.randrange(len(self._free_units))
+            self._free_units[index], self._free_units[-1] = self._free_units[-1], self._free_units[index]
+            return self._free_units.pop()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_load(db_path, manifest, mix='default', requests=2000, concurrency=4, seed=42):
+    """
+    Drive the app with `concurrency` workers until `requests` scenarios have run.
+    Returns the results dict (meta, overall, endpoints) that is saved as a baseline.
+    """
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    # Importing the app runs its startup checks (migrations) against ESCROW_DB_PATH
+    os.environ['ESCROW_DB_PATH'] = db_path
+    from backend.db.db_connection import configure_pool, pool_stats
+    from backend.server import app
+
+    configure_pool(db_path=db_path, size=max(concurrency, 1))
+    app.config['TESTING'] = True
+
+    weights = MIXES[mix]
+    scenarios, scenario_weights = list(weights), list(weights.values())
+    recorder = Recorder()
+    shared = SharedState(manifest['free_units'])
+    users = [SimulatedUser(app, manifest, shared, recorder, random.Random(seed + index))
+             for index in range(concurrency)]
+
+    remaining = [requests]
+    counter_lock = threading.Lock()
+
+    def worker(user):
+        while True:
+            with counter_lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            scenario = user.rng.choices(scenarios, scenario_weights)[0]
+            getattr(user, scenario)()
+
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+
+    endpoints, overall = recorder.summary(wall_seconds)
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'mix': mix,
+            'scenarios': requests,
+            'concurrency': concurrency,
+            'seed': seed,
+            'dataset': manifest['counts'],
+            'wall_seconds': round(wall_seconds, 3),
+            'pool': pool_stats(),
+        },
+        'overall': overall,
+        'endpoints': endpoints,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Diff two result sets endpoint by endpoint.
+    Returns (lines, regressions): a printable table and the endpoints whose p95
+    latency grew, or throughput dropped, by more than `tolerance` (a fraction).
+    """
+    lines = [f"{'endpoint':<40} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18} {'req/s':>18}"]
+    regressions = []
+    for label in sorted(set(current['endpoints']) | set(baseline['endpoints'])):
+        now, before = current['endpoints'].get(label), baseline['endpoints'].get(label)
+        if now is None or before is None:
+            lines.append(f"{label:<40} {'only in ' + ('baseline' if now is None else 'current'):>18}")
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+            change = (now[key] - before[key]) / before[key] if before[key] else 0.0
+            cells.append(f"{now[key]:>9.2f} ({change:+6.1%})")
+        lines.append(f"{label:<40} " + ' '.join(cells))
+        p95_change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+        rps_change = (now['rps'] - before['rps']) / before['rps'] if before['rps'] else 0.0
+        if p95_change > tolerance or rps_change < -tolerance:
+            regressions.append(label)
+    return lines, regressions
+
+
+def format_report(results):
+    """Render a results dict as a fixed-width table."""
+    meta = results['meta']
+    lines = [
+        f"mix={meta['mix']} scenarios={meta['scenarios']} concurrency={meta['concurrency']} "
+        f"wall={meta['wall_seconds']}s dataset={meta['dataset']}",
+        f"{'endpoint':<40} {'count':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'5xx':>5}",
+    ]
+    for label, stats in results['endpoints'].items():
+        lines.append(f"{label:<40} {stats['count']:>7} {stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                     f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>5}")
+    overall = results['overall']
+    lines.append(f"{'TOTAL':<40} {overall['count']:>7} {overall['rps']:>9.1f} {overall['p50_ms']:>9.2f} "
+                 f"{overall['p95_ms']:>9.2f} {overall['p99_ms']:>9.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a synthetic dataset and load-test the escrow API.')
+    scale_arguments(parser)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='default', help='traffic mix')
+    parser.add_argument('--requests', type=int, default=2000, help='number of scenarios to run')
+    parser.add_argument('--concurrency', type=int, default=4, help='simulated concurrent users')
+    parser.add_argument('--db', help='seed into this (new) database file instead of a temporary one')
+    parser.add_argument('--out', help='write results JSON here (a baseline for --compare)')
+    parser.add_argument('--compare', help='baseline JSON to diff against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed p95/req/s regression before exiting non-zero (fraction)')
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='escrow-bench-'), 'bench.db')
+    manifest = seed_database(db_path, seed=args.seed, **scale_from_args(args))
+    print(f"Seeded {db_path} in {manifest['seconds']}s: {manifest['counts']}")
+
+    results = run_load(db_path, manifest, args.mix, args.requests, args.concurrency, args.seed)
+    print(format_report(results))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.compare} (commit {baseline['meta'].get('commit')}):")
+        print('\n'.join(lines))
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from backend.db.migrate import init_db
+from backend.db.project_stats import rebuild_project_stats
+from backend.utils.hashing import hash_password
+
+# Synthetic dataset generator for benchmarks.
+# Writes builders, projects, units, buyers, bookings and transactions straight
+# into a migrated SQLite file with executemany (the API would be far too slow
+# for large scales), then rebuilds the per-project counters so the data is
+# indistinguishable from what the application itself would have written.
+
+# Every seeded account shares this password (hashed once at the configured bcrypt cost)
+PASSWORD = 'benchpass'
+ADMIN_EMAIL = 'admin@bench.test'
+
+# Named dataset sizes; any field can be overridden from the command line
+SCALES = {
+    'tiny': dict(builders=2, projects_per_builder=2, units_per_project=20, buyers=40),
+    'small': dict(builders=5, projects_per_builder=4, units_per_project=100, buyers=500),
+    'medium': dict(builders=20, projects_per_builder=10, units_per_project=200, buyers=10000),
+    'large': dict(builders=50, projects_per_builder=20, units_per_project=500, buyers=100000),
+}
+# Fraction of units booked, of bookings paid, and of payments already matched to their booking
+DEFAULT_RATIOS = dict(booked_fraction=0.5, paid_fraction=0.6, matched_fraction=0.5)
+
+_FIRST_NAMES = ['Ahmed', 'Fatima', 'Omar', 'Aisha', 'Yusuf', 'Mariam', 'Khalid', 'Noura',
+                'Hassan', 'Layla', 'Ali', 'Sara', 'Rashid', 'Huda', 'Saeed', 'Reem']
+_LAST_NAMES = ['Al Mansoori', 'Al Hashimi', 'Khan', 'Rahman', 'Al Falasi', 'Haddad',
+               'Nasser', 'Karim', 'Al Suwaidi', 'Farouk', 'Qureshi', 'Saleh']
+_PROJECT_WORDS = ['Marina', 'Palm', 'Creek', 'Harbour', 'Oasis', 'Crescent', 'Skyline',
+                  'Dunes', 'Pearl', 'Jumeirah', 'Emerald', 'Falcon']
+_LOCATIONS = ['Dubai Marina', 'Business Bay', 'Downtown Dubai', 'JVC', 'Al Reem Island',
+              'Yas Island', 'Sharjah Waterfront', 'Dubai Hills']
+
+_BATCH = 5000
+
+
+def _batches(rows, size=_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def unit_code(project_id, index):
+    """Public unit code for the index-th unit of a project (unique across the platform)."""
+    return f"P{project_id}-U{index:05d}"
+
+
+def seed_database(db_path, builders, projects_per_builder, units_per_project, buyers,
+                  booked_fraction=DEFAULT_RATIOS['booked_fraction'],
+                  paid_fraction=DEFAULT_RATIOS['paid_fraction'],
+                  matched_fraction=DEFAULT_RATIOS['matched_fraction'],
+                  seed=42):
+    """
+    Create a migrated database at `db_path` (expected to be new) filled with synthetic data.
+    The same arguments and seed always produce the same dataset.
+
+    Returns a manifest describing what was written, used by the load generator:
+    {'counts', 'password', 'admin_email', 'builder_emails', 'buyer_emails',
+     'project_ids', 'free_units', 'unpaid_bookings', 'search_terms'}.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    now = datetime(2025, 1, 1)
+    stamp = now.isoformat()
+    password_hash = hash_password(PASSWORD)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    init_db(conn)
+
+    try:
+        conn.execute("BEGIN")
+        conn.execute(
+            "INSERT INTO User (name, email, password_hash, role, created_at) VALUES (?,?,?,?,?)",
+            ('Bench Admin', ADMIN_EMAIL, password_hash, 'admin', stamp)
+        )
+        builder_emails = [f'builder{index}@bench.test' for index in range(builders)]
+        conn.executemany(
+            "INSERT INTO User (name, email, password_hash, role, created_at) VALUES (?,?,?,?,?)",
+            [(f'Builder {index}', email, password_hash, 'builder', stamp)
+             for index, email in enumerate(builder_emails)]
+        )
+        builder_ids = [row[0] for row in conn.execute("SELECT id FROM User WHERE role = 'builder' ORDER BY id")]
+
+        # Projects
+        project_rows = []
+        for builder_id in builder_ids:
+            for _ in range(projects_per_builder):
+                name = f"{rng.choice(_PROJECT_WORDS)} {rng.choice(_PROJECT_WORDS)} Tower {len(project_rows) + 1}"
+                project_rows.append((name, rng.choice(_LOCATIONS), 0, builder_id, stamp))
+        first_project = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM Project").fetchone()[0]) + 1
+        conn.executemany(
+            "INSERT INTO Project (name, location, num_units, builder_id, created_at) VALUES (?,?,?,?,?)",
+            project_rows
+        )
+        project_ids = list(range(first_project, first_project + len(project_rows)))
+
+        # Units: codes are unique platform-wide so they resolve unambiguously
+        first_unit = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM Unit").fetchone()[0]) + 1
+        units = []  # (internal id, code, price)
+
+        def unit_rows():
+            for project_id in project_ids:
+                for index in range(units_per_project):
+                    code = unit_code(project_id, index)
+                    floor = index // 10 + 1
+                    area = round(rng.uniform(450, 2500), 1)
+                    price = round(area * rng.uniform(1100, 2400), -3)
+                    units.append((first_unit + len(units), code, price))
+                    yield project_id, code, floor, area, price, stamp
+
+        for batch in _batches(unit_rows()):
+            conn.executemany(
+                "INSERT INTO Unit (project_id, unit_id, floor, area, price, created_at) VALUES (?,?,?,?,?,?)",
+                batch
+            )
+
+        # Buyers
+        first_buyer = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM Buyer").fetchone()[0]) + 1
+        buyer_emails = [f'buyer{index}@bench.test' for index in range(buyers)]
+        buyer_names = [f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}" for _ in range(buyers)]
+        for batch in _batches(
+            (name, f"784{1970 + index % 40}{index:08d}", f"05{index:08d}", email, password_hash, stamp)
+            for index, (name, email) in enumerate(zip(buyer_names, buyer_emails))
+        ):
+            conn.executemany(
+                "INSERT INTO Buyer (name, emirates_id, phone_number, email, password_hash, created_at)"
+                " VALUES (?,?,?,?,?,?)",
+                batch
+            )
+
+        # Bookings on a random subset of units; a booking reserves 10% of the price
+        booked = rng.sample(units, int(len(units) * booked_fraction)) if buyers else []
+        booked.sort()
+        bookings = []  # (booking id, unit id, code, buyer index, amount, date)
+        first_booking = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM Booking").fetchone()[0]) + 1
+        for unit_id, code, price in booked:
+            buyer_index = rng.randrange(buyers)
+            date = (now + timedelta(days=rng.randrange(365))).date().isoformat()
+            bookings.append((first_booking + len(bookings), unit_id, code, buyer_index, round(price * 0.1, 2), date))
+        for batch in _batches(bookings):
+            conn.executemany(
+                "INSERT INTO Booking (unit_id, buyer_id, amount, date, created_at) VALUES (?,?,?,?,?)",
+                [(unit_id, first_buyer + buyer_index, amount, date, stamp)
+                 for _, unit_id, _, buyer_index, amount, date in batch]
+            )
+            conn.executemany("UPDATE Unit SET booked = 1 WHERE id = ?", [(row[1],) for row in batch])
+
+        # Payments for part of the bookings, some already matched by the builder
+        paid = rng.sample(bookings, int(len(bookings) * paid_fraction))
+        paid_units = {row[1] for row in paid}
+        transactions = []
+        for booking_id, unit_id, _, buyer_index, amount, date in paid:
+            matched = booking_id if rng.random() < matched_fraction else None
+            method = rng.choice(('cash', 'bank transfer'))
+            transactions.append((amount, date, unit_id, method, matched, first_buyer + buyer_index, stamp))
+        transactions.sort(key=lambda row: row[2])
+        for batch in _batches(transactions):
+            conn.executemany(
+                "INSERT INTO Transaction_log (amount, date, unit_id, payment_method, booking_id, buyer_id, created_at)"
+                " VALUES (?,?,?,?,?,?,?)",
+                batch
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+    rebuild_project_stats(conn)
+    conn.close()
+
+    booked_ids = {row[0] for row in booked}
+    unpaid = {}
+    for _, unit_id, code, buyer_index, amount, date in bookings:
+        if unit_id not in paid_units:
+            unpaid.setdefault(buyer_emails[buyer_index], []).append(
+                {'unit_id': code, 'amount': amount, 'date': date})
+
+    return {
+        'counts': {
+            'builders': builders,
+            'projects': len(project_ids),
+            'units': len(units),
+            'buyers': buyers,
+            'bookings': len(bookings),
+            'transactions': len(transactions),
+        },
+        'seconds': round(time.perf_counter() - started, 3),
+        'password': PASSWORD,
+        'admin_email': ADMIN_EMAIL,
+        'builder_emails': builder_emails,
+        'buyer_emails': buyer_emails,
+        'project_ids': project_ids,
+        'free_units': [code for unit_id, code, _ in units if unit_id not in booked_ids],
+        'unpaid_bookings': unpaid,
+        'search_terms': sorted(set(_FIRST_NAMES + _PROJECT_WORDS)),
+    }
+
+
+def scale_arguments(parser):
+    """Add --scale and per-field override options to an argparse parser."""
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='named dataset size')
+    for field in SCALES['small']:
+        parser.add_argument('--' + field.replace('_', '-'), type=int, dest=field,
+                            help=f'override {field} for the chosen scale')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the dataset')
+
+
+def scale_from_args(args):
+    """Resolve the dataset parameters chosen with scale_arguments()."""
+    params = dict(SCALES[args.scale])
+    for field in params:
+        if getattr(args, field) is not None:
+            params[field] = getattr(args, field)
+    return params
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.seed --db /tmp/bench.db --scale medium
+    parser = argparse.ArgumentParser(description='Seed a synthetic escrow dataset.')
+    parser.add_argument('--db', required=True, help='SQLite file to create')
+    scale_arguments(parser)
+    args = parser.parse_args()
+
+    manifest = seed_database(args.db, seed=args.seed, **scale_from_args(args))
+    counts = ', '.join(f"{count} {name}" for name, count in manifest['counts'].items())
+    print(f"Seeded {args.db} in {manifest['seconds']}s: {counts}")
@@ -6,7 +6,7 @@
 import { useState, useEffect } from 'react'
 import Link from 'next/link'
 import ProtectedRoute from '@/components/ProtectedRoute'
-import api from '@/lib/api'
+import api, { fetchAll } from '@/lib/api'
 
 // Data interfaces for type safety
 interface Builder {
@@ -62,26 +62,26 @@ export default function AdminDashboard() {
 
   // 1) Fetch all data once when component mounts
   useEffect(() => {
-    api.get('/admin/builders')
-       .then(r => setBuilders(r.data.builders))
+    fetchAll<Builder>('/admin/builders', 'builders')
+       .then(setBuilders)
        .catch(console.error)
 
-    api.get('/admin/projects')
-       .then(r => {
-         setProjects(r.data.projects)
-         setDisplayProjects(r.data.projects)
+    fetchAll<Project>('/admin/projects', 'projects')
+       .then(all => {
+         setProjects(all)
+         setDisplayProjects(all)
        })
        .catch(console.error)
 
-    api.get('/admin/bookings')
-       .then(r => {
-         setBookings(r.data.bookings)
-         setDisplayBookings(r.data.bookings)
+    fetchAll<Booking>('/admin/bookings', 'bookings')
+       .then(all => {
+         setBookings(all)
+         setDisplayBookings(all)
        })
        .catch(console.error)
 
-    api.get('/admin/transactions')
-       .then(r => setTransactions(r.data.transactions))
+    fetchAll<Transaction>('/admin/transactions', 'transactions')
+       .then(setTransactions)
        .catch(console.error)
   }, [])
 
@@ -89,8 +89,8 @@ export default function AdminDashboard() {
   useEffect(() => {
     if (builderFilter !== null) {
       // Fetch projects for selected builder only
-      api.get('/admin/projects/filter', { params: { builder_id: builderFilter } })
-         .then(r => setDisplayProjects(r.data.projects))
+      fetchAll<Project>('/admin/projects/filter', 'projects', { builder_id: builderFilter })
+         .then(setDisplayProjects)
          .catch(console.error)
     } else {
       // No filter: show all projects
@@ -115,8 +115,8 @@ export default function AdminDashboard() {
   // 4) Apply booking search for buyer or unit
   useEffect(() => {
     if (bookingSearch) {
-      api.get('/admin/bookings/search', { params: { q: bookingSearch } })
-         .then(r => setDisplayBookings(r.data.bookings))
+      fetchAll<Booking>('/admin/bookings/search', 'bookings', { q: bookingSearch })
+         .then(setDisplayBookings)
          .catch(console.error)
     } else {
       // Clear booking search: show all bookings
@@ -4,7 +4,7 @@ import { PieChart, Pie, Tooltip, ResponsiveContainer, Cell } from 'recharts'
 import { schemeSet3 } from 'd3-scale-chromatic'
 import Link from 'next/link'
 import ProtectedRoute from '@/components/ProtectedRoute'
-import api from '@/lib/api'
+import api, { fetchAll } from '@/lib/api'
 import { useAuth } from '@/context/AuthContext'
 
 // Interfaces
@@ -69,14 +69,14 @@ export default function BuilderDashboard() {
     setIsLoading(true)
     Promise.all([
       api.get('/builder/dashboard'),
-      api.get('/builder/projects'),
-      api.get('/builder/bookings'),
-      api.get('/builder/transactions')
-    ]).then(([statsRes, projectsRes, bookingsRes, txsRes]) => {
+      fetchAll<Project>('/builder/projects', 'projects'),
+      fetchAll<Booking>('/builder/bookings', 'bookings'),
+      fetchAll<Transaction>('/builder/transactions', 'transactions')
+    ]).then(([statsRes, allProjects, allBookings, allTxs]) => {
       if (statsRes.data.status === 'success') setStats(statsRes.data)
-      if (projectsRes.data.status === 'success') setProjects(projectsRes.data.projects)
-      if (bookingsRes.data.status === 'success') setBookings(bookingsRes.data.bookings)
-      if (txsRes.data.status === 'success') setTxs(txsRes.data.transactions)
+      setProjects(allProjects)
+      setBookings(allBookings)
+      setTxs(allTxs)
     }).catch(console.error)
       .finally(() => setIsLoading(false))
   }
@@ -7,7 +7,7 @@
 import { useState, useEffect, useMemo } from 'react'
 import Link from 'next/link'
 import ProtectedRoute from '@/components/ProtectedRoute'
-import api from '@/lib/api'
+import api, { fetchAll } from '@/lib/api'
 import { useAuth } from '@/context/AuthContext'
 import { Cell, Legend, Pie, PieChart, ResponsiveContainer, Tooltip } from 'recharts'
 
@@ -73,22 +73,22 @@ export default function BuyerDashboard() {
 
   // 1️⃣ Load initial data: projects, bookings, transactions
   useEffect(() => {
-    api.get('/buyer/projects')
-       .then(r => setProjects(r.data.projects))
+    fetchAll<Project>('/buyer/projects', 'projects')
+       .then(setProjects)
        .catch(console.error)
 
-    api.get('/buyer/bookings')
-       .then(r => {
-         setBookings(r.data.bookings)
+    fetchAll<Booking>('/buyer/bookings', 'bookings')
+       .then(all => {
+         setBookings(all)
          // Pre-select first booked unit for transactions
-         if (r.data.bookings.length) {
-           setTxUnit(r.data.bookings[0].unit_number)
+         if (all.length) {
+           setTxUnit(all[0].unit_number)
          }
        })
        .catch(console.error)
 
-    api.get('/buyer/transactions')
-       .then(r => setTransactions(r.data.transactions))
+    fetchAll<Transaction>('/buyer/transactions', 'transactions')
+       .then(setTransactions)
        .catch(console.error)
   }, [user])
 
@@ -99,9 +99,8 @@ export default function BuyerDashboard() {
     // Parallel requests for units of each project
     Promise.all(
       projects.map(p =>
-        api.get<{ units: UnitRow[] }>(`/buyer/projects/${p.id}/units`)
-           .then(r => r.data.units)
-           .catch(() => [])
+        fetchAll<UnitRow>(`/buyer/projects/${p.id}/units`, 'units')
+           .catch(() => [] as UnitRow[])
       )
     )
     .then(arrays => setAllUnits(arrays.flat()))
@@ -179,13 +178,13 @@ export default function BuyerDashboard() {
 
       // Refresh bookings & transactions
       const [bk, tx] = await Promise.all([
-        api.get('/buyer/bookings'),
-        api.get('/buyer/transactions'),
+        fetchAll<Booking>('/buyer/bookings', 'bookings'),
+        fetchAll<Transaction>('/buyer/transactions', 'transactions'),
       ])
-      setBookings(bk.data.bookings)
-      setTransactions(tx.data.transactions)
-      if (bk.data.bookings.length) {
-        setTxUnit(bk.data.bookings[0].unit_id)
+      setBookings(bk)
+      setTransactions(tx)
+      if (bk.length) {
+        setTxUnit(bk[0].unit_id)
       }
       setTxAmount('')
     } catch (err: any) {
@@ -10,4 +10,20 @@ const api = axios.create({
   withCredentials: true,
 });
 
-export default api;
\ No newline at end of file
+/**
+ * Fetches every page of a cursor-paginated list endpoint.
+ * - Follows 'next_cursor' (sent back as 'after') until the last page.
+ * - Returns the concatenated items found under `key` (e.g. 'bookings').
+ */
+export async function fetchAll<T>(url: string, key: string, params: Record<string, unknown> = {}): Promise<T[]> {
+  const items: T[] = [];
+  let after: string | null = null;
+  do {
+    const res: { data: Record<string, any> } = await api.get(url, { params: after ? { ...params, after } : params });
+    items.push(...((res.data[key] ?? []) as T[]));
+    after = res.data.next_cursor ?? null;
+  } while (after);
+  return items;
+}
+
+export default api;
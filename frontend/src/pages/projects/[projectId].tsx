@@ -58,6 +58,9 @@ export default function ProjectDetail() {
     : user?.role === 'buyer'  ? '/buyer/projects'
     : '/admin/projects'
 
+  // The booked/available filter is applied server-side
+  const unitParams = filter === 'all' ? {} : { booked: filter === 'booked' ? 1 : 0 }
+
   useEffect(() => {
     if (router.query.error) {
       setError(decodeURIComponent(router.query.error as string))
@@ -82,10 +85,10 @@ export default function ProjectDetail() {
       .catch(console.error)
 
     // 2️⃣ Fetch units belonging to this project
-    api.get(`${prefix}/${projectId}/units`)
+    api.get(`${prefix}/${projectId}/units`, { params: unitParams })
       .then(res => setUnits(res.data.units))
       .catch(console.error)
-  }, [projectId, prefix])
+  }, [projectId, prefix, filter])
 
   // Show loading state until project data is available
   if (!project) return <p>Loading…</p>
@@ -109,7 +112,7 @@ export default function ProjectDetail() {
         booking_date: new Date().toISOString(),
       })
       // Refresh unit list to reflect new booking
-      const updated = await api.get(`${prefix}/${projectId}/units`)
+      const updated = await api.get(`${prefix}/${projectId}/units`, { params: unitParams })
       setUnits(updated.data.units)
       setBookingFormFor(null)
     } catch (err: any) {
@@ -143,7 +146,7 @@ export default function ProjectDetail() {
       )
 
     // After all bookings, refresh the unit list once
-    const updated = await api.get(`${prefix}/${projectId}/units`)
+    const updated = await api.get(`${prefix}/${projectId}/units`, { params: unitParams })
       setUnits(updated.data.units)
       setSelected([])
       setMulti(false)
@@ -156,11 +159,7 @@ export default function ProjectDetail() {
   
 
 
-  const filteredUnits = units.filter(u =>
-    filter === 'all' ? true :
-    filter === 'booked' ? u.booked :
-    !u.booked
-  )
+  const filteredUnits = units
 
 
 
@@ -8,7 +8,7 @@ import { useRouter } from 'next/router'
 import { useEffect, useState } from 'react'
 import ProtectedRoute from '@/components/ProtectedRoute'
 import { useAuth } from '@/context/AuthContext'
-import api from '@/lib/api'
+import api, { fetchAll } from '@/lib/api'
 
 // Interfaces for the data structures used
 interface Booking {
@@ -69,8 +69,8 @@ export default function UnitDetail() {
         user?.role === 'admin'   ? '/admin/bookings'
       : user?.role === 'builder' ? '/builder/bookings'
       : '/buyer/bookings'
-      const res = await api.get(bookingsEndpoint)
-      const b = (res.data.bookings as Booking[]).find(
+      const all = await fetchAll<Booking>(bookingsEndpoint, 'bookings')
+      const b = all.find(
         b => b.unit_id === Number(unitId)
       )
       setBooking(b || null)
@@ -86,10 +86,10 @@ export default function UnitDetail() {
     // Wait until query params and user.role are available
     if (!projectId || !unitId) return
 
-    // 1) Fetch all units for this project and find the specific unit by ID
-    api.get(`${prefix}/${projectId}/units`)
-      .then(res => {
-        const found = (res.data.units as Unit[])
+    // 1) Fetch all units for this project (every page) and find the specific unit by ID
+    fetchAll<Unit>(`${prefix}/${projectId}/units`, 'units')
+      .then(all => {
+        const found = all
           .find(u => u.id === Number(unitId))
         setUnit(found || null)
       })
@@ -101,9 +101,9 @@ export default function UnitDetail() {
     : user?.role === 'builder' ? '/builder/bookings'
     : '/buyer/bookings'
 
-    api.get(bookingsEndpoint)
-      .then(res => {
-        const b = (res.data.bookings as Booking[]).find(
+    fetchAll<Booking>(bookingsEndpoint, 'bookings')
+      .then(all => {
+        const b = all.find(
           b => b.unit_id === Number(unitId)
         )
         setBooking(b || null)
@@ -116,8 +116,8 @@ export default function UnitDetail() {
     : user?.role === 'builder'  ? '/builder/transactions'
     : '/buyer/transactions'
 
-    api.get(txEndpoint)
-      .then(res => setTxs(res.data.transactions as Tx[]))
+    fetchAll<Tx>(txEndpoint, 'transactions')
+      .then(setTxs)
       .catch(console.error)
   }, [projectId, unitId, user?.role, prefix])
 
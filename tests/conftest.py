@@ -2,13 +2,25 @@
 Pytest fixtures for the escrow demo application.
 
 Provides:
-- `client`: fresh Flask test client with database reset before each test.
+- `client`: fresh Flask test client backed by its own temporary database file.
 - Credential fixtures (`test_user_builder`, `test_user_admin`, `test_user_buyer`) to create users.
 - Manager fixtures (`as_user`, `as_buyer`) to simplify login/logout flows in tests.
 """
+import os
+import tempfile
+
 import pytest
+
+# Minimum bcrypt cost keeps the many register/login calls in the suite fast
+os.environ.setdefault('ESCROW_BCRYPT_ROUNDS', '4')
+# Importing the app migrates its database; keep that away from the checked-in escrow.db
+os.environ.setdefault('ESCROW_DB_PATH', os.path.join(tempfile.mkdtemp(), 'escrow.db'))
+
 from backend.server import app
-from backend.db.db_connection import get_connection
+from backend.db.db_connection import get_connection, configure_pool
+from backend.db.migrate import apply_migrations
+from backend.services.auth_lookup import clear_auth_cache
+from backend.services.unit_availability import clear_unit_availability
 import sqlite3  # Used to set row_factory for dict-like access if needed
 
 # -----------------------------------------------------------------------------
@@ -16,15 +28,21 @@ import sqlite3  # Used to set row_factory for dict-like access if needed
 # -----------------------------------------------------------------------------
 
 @pytest.fixture
-def client():
+def client(tmp_path):
     """
     Provides a Flask test client and resets the database schema and data.
     - Enables TESTING mode and disables CSRF for form submissions.
-    - Loads the schema SQL to recreate tables.
+    - Points the connection pool at a fresh database file under tmp_path.
+    - Empties the auth lookup cache and the unit availability index.
+    - Loads the schema SQL to recreate tables and applies pending migrations.
     - Clears all tables to ensure a clean state per test.
     """
     app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False
+    configure_pool(db_path=str(tmp_path / 'escrow.db'))
+    # Cached login records would otherwise outlive the database they came from
+    clear_auth_cache()
+    clear_unit_availability()
 
     with app.test_client() as client:
         with app.app_context():
@@ -34,6 +52,7 @@ def client():
             # Step 1: Re-create tables using the schema file
             with open('backend/db/schema.sql', 'r') as f:
                 cursor.executescript(f.read())
+            apply_migrations(conn)
 
             # Step 2: Clear existing data from all tables
             cursor.executescript("""
@@ -1,3 +1,6 @@
+import json
+
+
 def test_admin_can_filter_by_project_name(as_user, test_user_admin, test_user_builder):
     """
     Verify that an admin can filter projects by name.
@@ -55,4 +58,106 @@ def test_admin_filter_forbidden_for_builders(as_user, test_user_builder):
     # Builder logs in
     builder_client = as_user(test_user_builder)
     response = builder_client.get('/admin/filter?project_name=Sunrise')
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def test_admin_overview_totals(as_user, as_buyer, test_user_admin, test_user_builder, test_user_buyer):
+    """
+    Verify /admin/overview reports platform totals from the per-project rollup.
+    """
+    builder_client = as_user(test_user_builder)
+    project_id = builder_client.post(
+        '/builder/projects',
+        json={"name": "Overview Tower", "location": "Dubai", "num_units": 1}
+    ).get_json()['project_id']
+    builder_client.post(
+        f'/builder/projects/{project_id}/units',
+        json={"unit_id": "OV101", "floor": 1, "area": 900, "price": 300000}
+    )
+
+    buyer_client = as_buyer(test_user_buyer)
+    buyer_client.post(
+        '/buyer/bookings',
+        json={'unit_id': 'OV101', 'booking_amount': 30000, 'booking_date': '2025-06-22'}
+    )
+
+    admin_client = as_user(test_user_admin)
+    response = admin_client.get('/admin/overview')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total_projects'] == 1
+    assert data['total_units'] == 1
+    assert data['units_booked'] == 1
+    assert data['total_booking_amount'] == 30000
+
+
+def test_admin_streaming_exports(as_user, test_user_admin, test_user_builder):
+    """
+    ?export=json streams the same document shape as the list endpoint;
+    ?export=ndjson streams one project per line; unknown formats are rejected.
+    """
+    builder_client = as_user(test_user_builder)
+    for name in ('Export One', 'Export Two', 'Export Three'):
+        builder_client.post('/builder/projects', json={"name": name, "location": "Dubai", "num_units": 0})
+
+    admin_client = as_user(test_user_admin)
+    response = admin_client.get('/admin/projects?export=json')
+    assert response.status_code == 200
+    assert response.is_streamed
+    data = json.loads(response.get_data(as_text=True))
+    assert [p['name'] for p in data['projects']] == ['Export One', 'Export Two', 'Export Three']
+
+    response = admin_client.get('/admin/projects?export=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['name'] for line in lines] == ['Export One', 'Export Two', 'Export Three']
+
+    assert admin_client.get('/admin/bookings?export=json').get_json() == {'status': 'success', 'bookings': []}
+    assert admin_client.get('/admin/transactions?export=xml').status_code == 400
+
+
+def test_admin_exports_are_capped_and_fail_loudly(monkeypatch, as_user, test_user_admin, test_user_builder):
+    """
+    Exports beyond the concurrency cap are refused with 503 until a running one
+    finishes, and a DB error mid-stream breaks the download instead of ending it cleanly.
+    """
+    import sqlite3
+    import threading
+
+    import pytest
+
+    from backend.db import queries
+    from backend.server import app
+    from backend.services import admin_services
+
+    builder_client = as_user(test_user_builder)
+    for name in ('Cap One', 'Cap Two'):
+        builder_client.post('/builder/projects', json={"name": name, "location": "Dubai", "num_units": 0})
+    admin_client = as_user(test_user_admin)
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(admin_services, '_export_slots', slots)
+
+    # Another download holds the only slot
+    slots.acquire()
+    refused = admin_client.get('/admin/projects?export=ndjson')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After']
+    slots.release()
+    for _ in range(2):
+        # Each finished download gives its slot back
+        response = admin_client.get('/admin/projects?export=ndjson')
+        assert len(response.get_data(as_text=True).splitlines()) == 2
+
+    def failing_rows():
+        yield {'id': 1, 'name': 'Cap One'}
+        raise sqlite3.OperationalError('disk I/O error')
+
+    with app.test_request_context('/admin/projects?export=json'):
+        response = admin_services._stream_export(failing_rows(), 'projects', 'json')
+        with pytest.raises(sqlite3.OperationalError):
+            b''.join(response.response)
+    # The broken download gave its slot back
+    assert slots.acquire(blocking=False)
+    slots.release()
+
+    with pytest.raises(sqlite3.OperationalError):
+        list(queries._iter_rows("SELECT * FROM MissingTable"))
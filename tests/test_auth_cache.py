@@ -0,0 +1,132 @@
+from backend.db.queries import create_user
+from backend.services.auth_lookup import auth_cache_stats
+from backend.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hits_and_expires():
+    """
+    Cached values are served until their TTL passes, then reloaded.
+    """
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=10, negative_ttl=1, clock=clock)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return {'key': key}
+
+    assert cache.get_or_load('a', loader) == {'key': 'a'}
+    assert cache.get_or_load('a', loader) == {'key': 'a'}
+    assert loads == ['a']
+
+    clock.now = 11
+    cache.get_or_load('a', loader)
+    assert loads == ['a', 'a']
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['expirations'] == 1
+
+
+def test_cache_negative_entries_use_short_ttl():
+    """
+    A None result is cached as a negative entry with its own TTL.
+    """
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=10, negative_ttl=1, clock=clock)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return None
+
+    assert cache.get_or_load('ghost', loader) is None
+    assert cache.get_or_load('ghost', loader) is None
+    assert loads == ['ghost']
+    assert cache.stats()['negative_hits'] == 1
+
+    clock.now = 2
+    cache.get_or_load('ghost', loader)
+    assert loads == ['ghost', 'ghost']
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Once full, the least recently used entry is evicted first.
+    """
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.get_or_load('a', str)
+    cache.get_or_load('b', str)
+    cache.get_or_load('a', str)
+    cache.get_or_load('c', str)
+
+    loads = []
+    cache.get_or_load('b', lambda key: loads.append(key) or key)
+    cache.get_or_load('a', lambda key: loads.append(key) or key)
+    assert loads == ['b', 'a']
+    assert cache.stats()['evictions'] >= 1
+
+
+def test_unknown_email_is_negatively_cached(client):
+    """
+    Repeated logins for an unknown email are answered from the negative cache.
+    """
+    credentials = {'email': 'nobody@test.com', 'password': 'whatever'}
+    before = auth_cache_stats()['users']
+
+    for _ in range(3):
+        response = client.post('/auth/login', json=credentials)
+        assert response.status_code == 401
+
+    after = auth_cache_stats()['users']
+    assert after['misses'] - before['misses'] == 1
+    assert after['negative_hits'] - before['negative_hits'] == 2
+
+
+def test_registration_invalidates_negative_entry(client):
+    """
+    An email cached as unknown can log in right after it is registered.
+    """
+    credentials = {'email': 'late@test.com', 'password': 'buyerpass'}
+    assert client.post('/buyer/auth/login', json=credentials).status_code == 401
+
+    client.post('/buyer/auth/register', json={
+        'name': 'Late Buyer',
+        'emirates_id': '784199001010009',
+        'phone_number': '0501234567',
+        **credentials,
+    })
+    assert client.post('/buyer/auth/login', json=credentials).status_code == 200
+
+
+def test_repeat_login_is_served_from_cache(client, test_user_builder):
+    """
+    A second login for the same account does not look the user up again.
+    """
+    client.post('/auth/login', json=test_user_builder)
+    before = auth_cache_stats()['users']
+    client.post('/auth/login', json=test_user_builder)
+    after = auth_cache_stats()['users']
+
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] == before['misses']
+
+
+def test_plaintext_password_hash_is_rejected(client):
+    """
+    A stored value that is not a bcrypt hash never authenticates, even on an exact match.
+    """
+    create_user('Legacy', 'legacy@test.com', 'plainpass', 'builder', '2025-01-01')
+    response = client.post('/auth/login', json={'email': 'legacy@test.com', 'password': 'plainpass'})
+
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Invalid credentials'
@@ -0,0 +1,115 @@
+from backend.db import queries
+from benchmarks.contention import run_contention
+from benchmarks.data_access import QUERY_CALLS, regressions, run_scale, scaling_curves, scaling_exponent
+from benchmarks.load import compare, percentile, run_load
+from benchmarks.seed import seed_database
+
+
+def test_percentile_nearest_rank():
+    """
+    Percentiles use the nearest-rank method on a sorted list.
+    """
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) == 0.0
+
+
+def test_seed_is_reproducible(tmp_path):
+    """
+    The same scale and seed always produce the same dataset.
+    """
+    params = dict(builders=1, projects_per_builder=2, units_per_project=10, buyers=5)
+    first = seed_database(str(tmp_path / 'a.db'), **params)
+    second = seed_database(str(tmp_path / 'b.db'), **params)
+
+    assert first['counts'] == second['counts']
+    assert first['counts']['units'] == 20
+    assert first['counts']['bookings'] == 10
+    assert first['free_units'] == second['free_units']
+
+
+def test_run_load_reports_every_endpoint(client, tmp_path):
+    """
+    A short read-only run records latency percentiles for each endpoint without server errors.
+    """
+    db_path = str(tmp_path / 'bench.db')
+    manifest = seed_database(db_path, builders=1, projects_per_builder=1, units_per_project=10, buyers=4)
+
+    results = run_load(db_path, manifest, mix='read_only', requests=10, concurrency=2)
+
+    assert results['meta']['dataset'] == manifest['counts']
+    # Every read-only scenario issues four requests
+    assert results['overall']['count'] == 40
+    for stats in results['endpoints'].values():
+        assert stats['errors'] == 0
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+
+
+def test_compare_flags_regressions():
+    """
+    Endpoints whose p95 grows or throughput drops beyond the tolerance are reported.
+    """
+    def result(p95, rps):
+        return {'endpoints': {'GET /x': {'p50_ms': 1.0, 'p95_ms': p95, 'p99_ms': p95, 'rps': rps}}}
+
+    _, regressions = compare(result(2.0, 100), result(1.0, 100), tolerance=0.2)
+    assert regressions == ['GET /x']
+
+    _, regressions = compare(result(1.1, 95), result(1.0, 100), tolerance=0.2)
+    assert regressions == []
+
+
+def test_every_query_function_is_benchmarked():
+    """
+    New functions in queries.py must be added to the micro-benchmark QUERY_CALLS.
+    """
+    public = {
+        name for name, value in vars(queries).items()
+        if callable(value) and not name.startswith('_') and getattr(value, '__module__', None) == queries.__name__
+    }
+    assert public == set(QUERY_CALLS)
+
+
+def test_scaling_exponent():
+    """
+    The log-log slope is ~1 for linear growth and ~0 for flat latency.
+    """
+    assert round(scaling_exponent([(1000, 1.0), (100000, 100.0)]), 3) == 1.0
+    assert scaling_exponent([(1000, 1.0), (100000, 1.0)]) == 0.0
+
+
+def test_micro_benchmark_flags_linear_lookups(client, tmp_path):
+    """
+    A run at the smallest scale times each requested function; an index-bound
+    function whose latency grows linearly is reported as a regression.
+    """
+    scale = run_scale('1k', str(tmp_path), ['get_user_by_email', 'fetch_all_bookings'],
+                      min_calls=2, max_calls=3, budget_seconds=0.1)
+    assert scale['functions']['get_user_by_email']['rows'] == 1
+    assert scale['functions']['fetch_all_bookings']['rows'] > 0
+
+    curves = scaling_curves({
+        'small': {'units': 1000, 'functions': {'get_user_by_email': {'median_ms': 0.1},
+                                               'fetch_all_bookings': {'median_ms': 1.0}}},
+        'large': {'units': 100000, 'functions': {'get_user_by_email': {'median_ms': 10.0},
+                                                 'fetch_all_bookings': {'median_ms': 100.0}}},
+    })
+    assert regressions(curves, max_exponent=0.5) == ['get_user_by_email']
+
+
+def test_contention_benchmark_finds_no_double_bookings(client, tmp_path):
+    """
+    Concurrent bookings against a few hot units end with one booking per unit and no rollup drift.
+    """
+    db_path = str(tmp_path / 'contention.db')
+    seed_database(db_path, builders=1, projects_per_builder=1, units_per_project=20, buyers=10)
+
+    results = run_contention(db_path, hot_units=2, attempts=200, concurrency=8, rounds=2)
+
+    assert results['summary']['ok']
+    assert results['summary']['double_bookings'] == 0
+    for result in results['rounds']:
+        assert result['booked'] == 2
+        assert result['rejected'] == 198
@@ -112,4 +112,303 @@ def test_booking_invalid_unit_id(as_buyer, test_user_buyer):
         }
     )
     assert response.status_code == 400  # Bad request for invalid unit
-    assert response.get_json()['status'] == 'failure'
\ No newline at end of file
+    assert response.get_json()['status'] == 'failure'
+
+def test_booking_rejects_invalid_amount(as_user, as_buyer, test_user_builder, test_user_buyer):
+    """
+    Non-numeric, non-finite and non-positive booking amounts are refused before queueing.
+    """
+    builder_client = as_user(test_user_builder)
+    project_id = builder_client.post(
+        '/builder/projects', json={'name': 'Amount Tower', 'location': 'Dubai', 'num_units': 1}
+    ).get_json()['project_id']
+    builder_client.post(f'/builder/projects/{project_id}/units',
+                        json={'unit_id': 'AMT-1', 'floor': 1, 'area': 900, 'price': 400000})
+    builder_client.post('/auth/logout')
+
+    buyer_client = as_buyer(test_user_buyer)
+    for amount in ['abc', 'nan', 'inf', -5, True, [100]]:
+        response = buyer_client.post('/buyer/bookings', json={
+            'unit_id': 'AMT-1', 'booking_amount': amount, 'booking_date': '2025-06-22'})
+        assert response.status_code == 400, amount
+    response = buyer_client.post('/buyer/bookings', json={
+        'unit_id': 'AMT-1', 'booking_amount': '100000', 'booking_date': '2025-06-22'})
+    assert response.status_code == 201
+
+
+def test_booking_batch_isolates_failing_row(client):
+    """
+    A booking row that fails inside a batch is undone on its own: the other
+    bookings in the batch are written and counted in the project rollup.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builder_id = queries.create_user('Builder', 'batch@test.com', 'hash', 'builder', stamp)
+    project_id = queries.insert_project(builder_id, 'Batch Tower', 'Dubai', 0, stamp)
+    units = [queries.insert_unit(project_id, f'BT-{n}', 1, 900, 100000, stamp) for n in range(3)]
+    buyer_id = queries.create_buyer('Buyer', '78401', '050', 'batch-buyer@test.com', 'hash', stamp)
+
+    results = queries.create_bookings_batch([
+        (units[0], buyer_id, 1000.0, '2025-06-01'),
+        (units[1], buyer_id, {'amount': 'bad'}, '2025-06-01'),
+        (units[2], buyer_id, 2500.0, '2025-06-01'),
+        (units[0], buyer_id, 1000.0, '2025-06-01'),
+        (units[2] + 100, buyer_id, 1000.0, '2025-06-01'),
+    ], stamp)
+
+    assert results[0][0] is not None and results[2][0] is not None
+    assert [reason for _, reason in results] == [None, 'row_failed', None, 'unit_booked', 'unit_missing']
+    assert queries.fetch_booking_by_unit_id(units[1]) is None
+    assert queries.get_unit_internal_id_by_unit_code('BT-1')['booked'] == 0
+    dashboard = queries.fetch_dashboard_data(builder_id)
+    assert dashboard[0]['bookings_per_project'] == 2
+
+
+def test_concurrent_bookings_reserve_unit_once(client):
+    """
+    Buyers racing for the same unit from many threads: exactly one booking is
+    created, the unit is marked booked and the project rollup counts it once.
+    """
+    import threading
+
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builder_id = queries.create_user('Builder', 'race@test.com', 'hash', 'builder', stamp)
+    project_id = queries.insert_project(builder_id, 'Launch Tower', 'Dubai', 0, stamp)
+    unit_id = queries.insert_unit(project_id, 'HOT-1', 1, 900, 100000, stamp)
+    buyers = [queries.create_buyer(f'Buyer {n}', f'7840{n}', '050', f'race{n}@test.com', 'hash', stamp)
+              for n in range(8)]
+
+    barrier = threading.Barrier(len(buyers))
+    results = []
+
+    def book(buyer_id):
+        barrier.wait()
+        for _ in range(5):
+            results.append(queries.create_booking(unit_id, buyer_id, 100000, '2025-06-01', stamp))
+
+    threads = [threading.Thread(target=book, args=(buyer_id,)) for buyer_id in buyers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len([booking_id for booking_id in results if booking_id is not None]) == 1
+    assert queries.fetch_booking_by_unit_id(unit_id) is not None
+    dashboard = queries.fetch_dashboard_data(builder_id)
+    assert dashboard[0]['bookings_per_project'] == 1
+
+
+def test_booking_queue_batches_fifo_and_round_robin():
+    """
+    Queued requests are written in arrival order per project, several per commit,
+    alternating between projects; a full project queue turns new requests away.
+    """
+    import threading
+    import time
+
+    import pytest
+
+    from backend.services.booking_queue import BookingQueue, QueueFullError
+
+    release = threading.Event()
+    batches, taken = [], set()
+
+    def write_batch(bookings, created_at):
+        release.wait(5)
+        batches.append([unit_id for unit_id, *_ in bookings])
+        results = []
+        for unit_id, *_ in bookings:
+            # The first request for a unit wins
+            results.append((None, 'unit_booked') if unit_id in taken else (unit_id * 10, None))
+            taken.add(unit_id)
+        return results
+
+    queue = BookingQueue(batch_size=2, max_depth=3, write_batch=write_batch)
+    first = queue.submit('a', 1, 1, 100, '2025-06-01')
+    # Let the writer pick up the first batch and block inside it
+    while queue.stats()['queued']:
+        time.sleep(0.001)
+    tickets = [queue.submit('a', 2, 1, 100, '2025-06-01'),
+               queue.submit('a', 3, 2, 100, '2025-06-01'),
+               queue.submit('b', 4, 7, 100, '2025-06-01'),
+               queue.submit('a', 5, 3, 100, '2025-06-01')]
+    with pytest.raises(QueueFullError):
+        queue.submit('a', 6, 4, 100, '2025-06-01')
+    # Two requests ahead of it in project 'a', one of them in the batch being written
+    assert queue.status(tickets[1])['position'] == 3
+
+    release.set()
+    for ticket in [first, *tickets]:
+        assert queue.wait(ticket, 5)
+
+    assert batches == [[1], [1, 2], [7], [3]]
+    assert queue.status(first) == {'ticket': first.id, 'status': 'booked', 'booking_id': 10}
+    assert queue.status(tickets[0]) == {'ticket': tickets[0].id, 'status': 'failed',
+                                        'message': 'Unit is already booked'}
+    assert queue.get(tickets[1].id).booking_id == 20
+
+
+def test_booking_queue_expires_tickets_in_decision_order():
+    """
+    Decided tickets expire even when a ticket submitted before them is still queued,
+    and a project is forgotten once its queue drains and its tickets expire.
+    """
+    import threading
+    import time
+
+    from backend.services.booking_queue import BookingQueue
+
+    release = threading.Event()
+
+    def write_batch(bookings, created_at):
+        release.wait(5)
+        return [(unit_id * 10, None) for unit_id, *_ in bookings]
+
+    queue = BookingQueue(batch_size=1, ticket_ttl=0, write_batch=write_batch)
+    first = queue.submit('a', 1, 1, 100, '2025-06-01')
+    while queue.stats()['queued']:
+        time.sleep(0.001)
+    # Round-robin decides 'b' before the last request of 'a', which was submitted earlier
+    rest = [queue.submit('a', 2, 2, 100, '2025-06-01'),
+            queue.submit('a', 3, 3, 100, '2025-06-01'),
+            queue.submit('b', 4, 4, 100, '2025-06-01')]
+    release.set()
+    for ticket in [first, *rest]:
+        assert queue.wait(ticket, 5)
+
+    assert queue.get(rest[2].id) is None
+    assert queue.stats()['tickets'] == 1
+    # 'b' has drained and its only ticket expired, so the queue forgets the project
+    assert set(queue._sequences) == {'a'}
+    assert queue.wait(queue.submit('c', 5, 5, 100, '2025-06-01'), 5)
+    assert queue.get(rest[1].id) is None
+    assert set(queue._sequences) == {'c'}
+
+
+def test_booking_ticket_can_be_polled(as_user, as_buyer, test_user_builder, test_user_buyer):
+    """
+    A booking submitted without waiting can be followed through its ticket;
+    tickets are private to the buyer that holds them.
+    """
+    builder_client = as_user(test_user_builder)
+    project_id = builder_client.post(
+        '/builder/projects', json={'name': 'Queue Tower', 'location': 'Dubai', 'num_units': 1}
+    ).get_json()['project_id']
+    builder_client.post(f'/builder/projects/{project_id}/units',
+                        json={'unit_id': 'Q-1', 'floor': 1, 'area': 900, 'price': 400000})
+    builder_client.post('/auth/logout')
+
+    buyer_client = as_buyer(test_user_buyer)
+    response = buyer_client.post('/buyer/bookings', query_string={'wait': 0}, json={
+        'unit_id': 'Q-1', 'booking_amount': 100000, 'booking_date': '2025-06-22'})
+    assert response.status_code in (201, 202)
+    ticket = response.get_json()['ticket']
+
+    polled = buyer_client.get(f'/buyer/bookings/queue/{ticket}', query_string={'wait': 5})
+    assert polled.status_code == 201
+    assert polled.get_json()['booking_id']
+
+    assert buyer_client.get('/buyer/bookings/queue/unknown').status_code == 404
+    assert buyer_client.get(f'/buyer/bookings/queue/{ticket}',
+                            query_string={'wait': -1}).status_code == 400
+
+
+def test_buyer_browse_served_from_availability_index(as_user, as_buyer, test_user_builder, test_user_buyer):
+    """
+    Buyers browse units from the in-memory availability index: bookings show up
+    without a reload, ?available=1 leaves booked units out, and new units are picked up.
+    """
+    from backend.services.unit_availability import unit_availability_stats
+
+    builder_client = as_user(test_user_builder)
+    project_id = builder_client.post(
+        '/builder/projects', json={'name': 'Index Tower', 'location': 'Dubai', 'num_units': 4}
+    ).get_json()['project_id']
+    builder_client.post(f'/builder/projects/{project_id}/units/batch', json={
+        'prefix': 'AV', 'units_per_floor': 2, 'num_floors': 2, 'area': 900, 'price': 400000})
+    builder_client.post('/auth/logout')
+
+    buyer_client = as_buyer(test_user_buyer)
+    misses = unit_availability_stats()['misses']
+    data = buyer_client.get(f'/buyer/projects/{project_id}/units').get_json()
+    assert [unit['unit_id'] for unit in data['units']] == ['AV-101', 'AV-102', 'AV-201', 'AV-202']
+    assert data['availability'] == {'total': 4, 'booked': 0, 'available': 4}
+    assert data['units'][0]['price'] == 400000 and data['units'][0]['booked'] == 0
+
+    assert buyer_client.post('/buyer/bookings', json={
+        'unit_id': 'AV-101', 'booking_amount': 100000, 'booking_date': '2025-06-22'}).status_code == 201
+
+    data = buyer_client.get(f'/buyer/projects/{project_id}/units').get_json()
+    assert data['units'][0]['booked'] == 1
+    assert data['availability'] == {'total': 4, 'booked': 1, 'available': 3}
+    first = buyer_client.get(f'/buyer/projects/{project_id}/units',
+                             query_string={'available': 1, 'limit': 2}).get_json()
+    assert [unit['unit_id'] for unit in first['units']] == ['AV-102', 'AV-201']
+    rest = buyer_client.get(f'/buyer/projects/{project_id}/units',
+                            query_string={'available': 1, 'limit': 2, 'after': first['next_cursor']}).get_json()
+    assert [unit['unit_id'] for unit in rest['units']] == ['AV-202']
+    assert rest['next_cursor'] is None
+    # Loaded from SQLite once; every browse since was answered from memory
+    assert unit_availability_stats()['misses'] == misses + 1
+
+    assert buyer_client.get(f'/buyer/projects/{project_id}/units',
+                            query_string={'available': 'maybe'}).status_code == 400
+    buyer_client.post('/buyer/auth/logout')
+
+    builder_client = as_user(test_user_builder)
+    builder_client.post(f'/builder/projects/{project_id}/units',
+                        json={'unit_id': 'AV-301', 'floor': 3, 'area': 900, 'price': 450000})
+    builder_client.post('/auth/logout')
+    data = as_buyer(test_user_buyer).get(f'/buyer/projects/{project_id}/units').get_json()
+    assert data['availability'] == {'total': 5, 'booked': 1, 'available': 4}
+
+
+def test_availability_index_rows_match_sql_listing(as_user, test_user_builder, client):
+    """
+    Units served from the availability index carry the same fields and values
+    as the SQL listing, builder name and creation time included.
+    """
+    from backend.db.queries import fetch_units_by_project
+    from backend.services.unit_availability import project_availability
+
+    builder_client = as_user(test_user_builder)
+    project_id = builder_client.post(
+        '/builder/projects', json={'name': 'Parity Tower', 'location': 'Dubai', 'num_units': 2}
+    ).get_json()['project_id']
+    builder_client.post(f'/builder/projects/{project_id}/units/batch', json={
+        'prefix': 'PT', 'units_per_floor': 2, 'num_floors': 1, 'area': 912.5, 'price': 400000})
+
+    from_index = project_availability(project_id).units()
+    from_sql = fetch_units_by_project(project_id)
+    assert len(from_index) == 2
+    assert from_index == from_sql
+    assert from_index[0]['builder_name'] == 'Builder Test'
+
+
+def test_availability_index_skips_snapshot_raced_by_booking():
+    """
+    A snapshot loaded while a booking for its project was recorded is served but not
+    kept, so the next lookup reloads it instead of showing the unit as free.
+    """
+    from backend.services.unit_availability import AvailabilityIndex
+
+    loads = []
+
+    def loader(project_id):
+        loads.append(project_id)
+        if len(loads) == 1:
+            index.mark_booked(project_id, 2)
+        return [(1, 'A-1', 1, 900.0, 1.0, 0, '2025-01-01', 'Builder'),
+                (2, 'A-2', 1, 900.0, 1.0, len(loads) > 1, '2025-01-01', 'Builder')]
+
+    index = AvailabilityIndex(loader=loader)
+    assert index.get(7).summary()['booked'] == 0
+    assert index.get(7).summary()['booked'] == 1
+    assert index.get(7) is index.get(7)
+    assert loads == [7, 7]
+
+    index.mark_booked(7, 1)
+    assert index.get(7).units(booked=0) == []
@@ -1,3 +1,6 @@
+from backend.db.queries import create_transaction, get_buyer_by_email
+
+
 def test_create_project_success(as_user, test_user_builder):
     """
     Verify that a builder can successfully create a new project.
@@ -106,6 +109,48 @@ def test_dashboard_metrics_with_data(as_user, test_user_builder):
     assert metrics['total_units'] == 1
 
 
+def test_dashboard_totals_match_per_project_rows(as_user, as_buyer, test_user_builder, test_user_buyer):
+    """
+    Totals are the sum of the per-project rows, and a unit with both a booking
+    and an unmatched transaction is counted once per metric (no join fan-out).
+    """
+    client = as_user(test_user_builder)
+    first = client.post('/builder/projects', json={'name': 'Tower A', 'location': 'Dubai', 'num_units': 0})
+    second = client.post('/builder/projects', json={'name': 'Tower B', 'location': 'Dubai', 'num_units': 0})
+    first_id = first.get_json()['project_id']
+    second_id = second.get_json()['project_id']
+    for code in ('A101', 'A102'):
+        client.post(f'/builder/projects/{first_id}/units',
+                    json={'unit_id': code, 'floor': 1, 'area': 900, 'price': 100000})
+    unit_res = client.post(f'/builder/projects/{second_id}/units',
+                           json={'unit_id': 'B101', 'floor': 1, 'area': 900, 'price': 100000})
+    unit_row_id = unit_res.get_json()['unit_id']
+
+    buyer_client = as_buyer(test_user_buyer)
+    booking_res = buyer_client.post('/buyer/bookings', json={
+        'unit_id': 'B101', 'booking_amount': 25000, 'booking_date': '2025-06-22'
+    })
+    assert booking_res.status_code == 201
+    buyer_id = get_buyer_by_email(test_user_buyer['email'])['id']
+    # Unmatched payment against the same unit as the booking
+    create_transaction(25000, '2025-06-23', 'cash', '2025-06-23', buyer_id, unit_row_id)
+
+    client = as_user(test_user_builder)
+    metrics = client.get('/builder/dashboard').get_json()
+    per_project = {p['name']: p for p in metrics['per_project']}
+
+    assert per_project['Tower A']['units_per_project'] == 2
+    assert per_project['Tower A']['bookings_per_project'] == 0
+    assert per_project['Tower B']['units_per_project'] == 1
+    assert per_project['Tower B']['bookings_per_project'] == 1
+    assert per_project['Tower B']['amount_per_project'] == 25000
+    assert per_project['Tower B']['unmatched_transactions_per_project'] == 1
+    assert metrics['total_projects'] == 2
+    assert metrics['total_units'] == 3
+    assert metrics['units_booked'] == 1
+    assert metrics['total_booking_amount'] == 25000
+    assert metrics['unmatched_transactions'] == 1
+
 def test_create_unit_success(as_user, test_user_builder):
     """
     Test successful creation of a unit under an existing project.
@@ -165,4 +210,124 @@ def test_list_units_unauthenticated(client):
     Confirm unauthenticated access to unit listing is forbidden.
     """
     response = client.get('/builder/projects/1/units')
-    assert response.status_code in [401, 403]
\ No newline at end of file
+    assert response.status_code in [401, 403]
+
+def test_create_unit_batch_reports_conflicts(as_user, test_user_builder):
+    """
+    A unit grid is inserted in one go; codes that already exist are reported
+    per unit instead of being silently skipped, and num_units counts only new units.
+    """
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Grid Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+    client.post(
+        f'/builder/projects/{project_id}/units',
+        json={'unit_id': 'GT-102', 'floor': 1, 'area': 800, 'price': 90000}
+    )
+
+    response = client.post(
+        f'/builder/projects/{project_id}/units/batch',
+        json={'prefix': 'GT', 'units_per_floor': 3, 'num_floors': 2, 'area': 800, 'price': 90000}
+    )
+    assert response.status_code == 201
+    data = response.get_json()
+    assert len(data['unit_row_ids']) == 5
+    assert data['conflicts'] == [{'unit_id': 'GT-102', 'reason': 'Unit already exists in project'}]
+
+    project = client.get(f'/builder/projects/{project_id}').get_json()['project']
+    assert project['num_units'] == 6
+
+    # Re-submitting the same grid creates nothing and reports every unit
+    repeat = client.post(
+        f'/builder/projects/{project_id}/units/batch',
+        json={'prefix': 'GT', 'units_per_floor': 3, 'num_floors': 2, 'area': 800, 'price': 90000}
+    )
+    assert repeat.status_code == 409
+    assert len(repeat.get_json()['conflicts']) == 6
+
+
+def test_import_units_csv_reports_row_errors(as_user, test_user_builder):
+    """
+    CSV import writes valid rows and reports invalid or duplicate rows by row number.
+    """
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Import Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+
+    body = (
+        "unit_id,floor,area,price\n"
+        "IM-101,1,850,95000\n"
+        "IM-102,1,abc,95000\n"
+        "IM-201,2,900,99000\n"
+        "IM-101,1,850,95000\n"
+    )
+    response = client.post(
+        f'/builder/projects/{project_id}/units/import',
+        data=body, content_type='text/csv'
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['rows_total'] == 4
+    assert report['rows_imported'] == 2
+    assert sorted(error['row'] for error in report['errors']) == [2, 4]
+    assert report['rows_per_sec'] > 0
+
+    units = client.get(f'/builder/projects/{project_id}/units').get_json()['units']
+    assert sorted(unit['unit_id'] for unit in units) == ['IM-101', 'IM-201']
+
+
+def test_import_units_rejects_non_finite_numbers(as_user, test_user_builder):
+    """
+    Rows with nan or infinite area/price are reported instead of imported.
+    """
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Finite Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+
+    body = (
+        "unit_id,floor,area,price\n"
+        "FN-1,1,nan,95000\n"
+        "FN-2,1,850,inf\n"
+        "FN-3,1,-inf,95000\n"
+        "FN-4,1,850,95000\n"
+    )
+    report = client.post(
+        f'/builder/projects/{project_id}/units/import',
+        data=body, content_type='text/csv'
+    ).get_json()
+    assert report['rows_imported'] == 1
+    assert [(error['row'], error['message']) for error in report['errors']] == [
+        (row, 'area and price must be finite numbers') for row in (1, 2, 3)]
+
+
+def test_import_units_ndjson_and_unsupported_type(as_user, test_user_builder):
+    """
+    NDJSON bodies are accepted; other content types are rejected with 415.
+    """
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Json Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+
+    body = '{"unit_id": "JS-1", "floor": 1, "area": 700, "price": 80000}\n\nnot json\n'
+    response = client.post(
+        f'/builder/projects/{project_id}/units/import',
+        data=body, content_type='application/x-ndjson'
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['rows_imported'] == 1
+    assert report['errors'] == [{'row': 2, 'unit_id': None, 'message': 'Invalid JSON'}]
+
+    rejected = client.post(
+        f'/builder/projects/{project_id}/units/import',
+        data='x', content_type='text/plain'
+    )
+    assert rejected.status_code == 415
@@ -0,0 +1,292 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend.db.db_connection import (
+    ConnectionPool, PoolTimeoutError, begin_immediate, load_pragma_profile, retry_on_busy
+)
+
+
+def test_pool_reuses_released_connection(tmp_path):
+    """
+    A connection returned to the pool is handed out again instead of reopening.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2)
+
+    with pool.connection() as conn:
+        first = conn._raw
+    with pool.connection() as conn:
+        second = conn._raw
+
+    assert first is second
+    stats = pool.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert stats['open'] == 1
+    pool.close()
+
+
+def test_pool_enforces_size_and_times_out(tmp_path):
+    """
+    Borrowing beyond the configured size waits and then raises PoolTimeoutError.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1, timeout=0.05)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['wait_time_total'] > 0
+    pool.release(held)
+    pool.close()
+
+
+def test_exhausted_pool_returns_503(tmp_path, as_user, test_user_builder):
+    """
+    A request that cannot borrow a connection in time gets a 503 JSON failure, not a 500.
+    """
+    from backend.db.db_connection import configure_pool, get_pool
+
+    client = as_user(test_user_builder)
+    pool = configure_pool(db_path=str(tmp_path / 'escrow.db'), size=1, timeout=0.05)
+    held = pool.acquire()
+    try:
+        response = client.get('/builder/projects')
+    finally:
+        pool.release(held)
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'failure'
+    assert response.headers['Retry-After'] == '1'
+    assert get_pool().stats()['timeouts'] >= 1
+    assert client.get('/builder/projects').status_code == 200
+
+
+def test_pool_waiter_receives_released_connection(tmp_path):
+    """
+    A borrower blocked on an exhausted pool is woken when a connection is released.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1, timeout=2)
+    held = pool.acquire()
+    borrowed = []
+
+    waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(timeout=2)
+
+    assert borrowed == [held]
+    assert pool.stats()['waits'] == 1
+    pool.release(borrowed[0])
+    pool.close()
+
+
+def test_pool_replaces_unhealthy_idle_connection(tmp_path):
+    """
+    An idle connection that fails its health check is discarded and replaced.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    # Simulate a connection that broke while idle
+    conn.close()
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute("SELECT 1").fetchone()[0] == 1
+    assert pool.stats()['health_check_failures'] == 1
+    pool.release(replacement)
+    pool.close()
+
+
+def test_released_connection_rolls_back_open_transaction(tmp_path):
+    """
+    Uncommitted work is rolled back when a connection goes back to the pool.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_pragma_profile_applied_and_reported(tmp_path):
+    """
+    Pooled connections run in WAL mode with the configured profile, and the
+    startup check reports every setting as in effect.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1)
+    report = pool.check_profile()
+
+    assert report['journal_mode']['effective'] == 'WAL'
+    assert report['synchronous']['effective'] == 'NORMAL'
+    assert all(result['ok'] for result in report.values())
+    pool.close()
+
+
+def test_pragma_profile_rejects_invalid_values():
+    """
+    Values that are not valid for a PRAGMA are refused rather than sent to SQLite.
+    """
+    with pytest.raises(ValueError):
+        load_pragma_profile({'journal_mode': 'WAL; DROP TABLE User'})
+    with pytest.raises(ValueError):
+        load_pragma_profile({'cache_size': 'lots'})
+
+
+def test_wal_reader_not_blocked_by_open_write(tmp_path):
+    """
+    With WAL, a reader sees the last committed state while a writer holds an
+    uncommitted transaction, instead of failing with 'database is locked'.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2, pragmas=load_pragma_profile({'busy_timeout': 0}))
+    with pool.connection() as setup:
+        setup.execute("CREATE TABLE t (x INTEGER)")
+        setup.execute("INSERT INTO t VALUES (1)")
+        setup.commit()
+
+    writer = pool.acquire()
+    reader = pool.acquire()
+    writer.execute("INSERT INTO t VALUES (2)")
+
+    assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    writer.commit()
+    assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    pool.release(writer)
+    pool.release(reader)
+    pool.close()
+
+
+def test_begin_immediate_fails_fast_and_retry_waits_for_the_lock(tmp_path):
+    """
+    A second writer gets SQLITE_BUSY quickly instead of sleeping in SQLite's busy
+    handler; retry_on_busy keeps backing off until the first writer commits.
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2)
+    with pool.connection() as setup:
+        setup.execute("CREATE TABLE t (x INTEGER)")
+        setup.commit()
+
+    holder = pool.acquire()
+    waiter = pool.acquire()
+    begin_immediate(holder)
+    with pytest.raises(sqlite3.OperationalError):
+        begin_immediate(waiter)
+    # The connection's own busy_timeout is restored after the attempt
+    assert waiter.execute("PRAGMA busy_timeout").fetchone()[0] == pool.pragmas['busy_timeout']
+
+    attempts = []
+
+    def write():
+        attempts.append(1)
+        if len(attempts) == 3:
+            holder.commit()
+        begin_immediate(waiter)
+        waiter.execute("INSERT INTO t VALUES (1)")
+        waiter.commit()
+        return 'done'
+
+    assert retry_on_busy(write, retry_seconds=2.0) == 'done'
+    assert len(attempts) == 3
+    with pytest.raises(ValueError):
+        retry_on_busy(lambda: (_ for _ in ()).throw(ValueError('not busy')))
+    pool.release(holder)
+    pool.release(waiter)
+    pool.close()
+
+
+@pytest.fixture
+def group_commit(client):
+    """Turn group commit on (50 ms window) for one test and off again afterwards."""
+    from backend.db.group_commit import configure_group_commit
+
+    yield configure_group_commit(enabled=True, window_ms=50, max_batch=64)
+    configure_group_commit(enabled=False)
+
+
+def test_group_commit_shares_transactions_and_isolates_failures(group_commit):
+    """
+    Concurrent writes are committed together, yet each caller gets its own id,
+    and a write that fails (duplicate email, unit already booked) fails alone.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    emails = [f'builder{n}@test.com' for n in range(6)] + ['builder0@test.com']
+    barrier = threading.Barrier(len(emails))
+    results = {}
+
+    def register(index, email):
+        barrier.wait()
+        results[index] = queries.create_user('Builder', email, 'hash', 'builder', stamp)
+
+    threads = [threading.Thread(target=register, args=pair) for pair in enumerate(emails)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    created = [user_id for user_id in results.values() if user_id is not None]
+    assert len(created) == 6 and len(set(created)) == 6
+    assert list(results.values()).count(None) == 1
+    for email in set(emails):
+        assert queries.get_user_by_email(email)['id'] in created
+
+    stats = group_commit.stats()
+    assert stats['writes'] == 7
+    assert stats['failed'] == 1
+    assert stats['max_group'] > 1
+
+    project = queries.insert_project(created[0], 'Marina View', 'Dubai', 0, stamp)
+    unit = queries.insert_unit(project, 'MV1', 1, 900, 1000000, stamp)
+    buyer = queries.create_buyer('Layla Haddad', '784001', '050', 'layla@test.com', 'hash', stamp)
+    assert queries.create_booking(unit, buyer, 50000, stamp, stamp) is not None
+    assert queries.create_booking(unit, buyer, 50000, stamp, stamp) is None
+    transaction = queries.create_transaction(50000, stamp, 'cash', stamp, buyer, unit)
+    assert queries.match_transaction_to_booking(transaction, queries.fetch_booking_by_unit_id(unit)['id']) == 1
+
+    from backend.db.db_connection import get_connection
+    from backend.db.project_stats import verify_project_stats
+    conn = get_connection()
+    try:
+        assert verify_project_stats(conn) == []
+    finally:
+        conn.close()
+
+
+def test_group_commit_failures_and_stuck_writer_release_callers():
+    """
+    A group whose commit blows up fails its callers instead of stopping the writer,
+    and a caller stuck behind a slow group gets GroupCommitTimeout.
+    """
+    from backend.db.group_commit import GroupCommitTimeout, GroupCommitWriter
+
+    writer = GroupCommitWriter(timeout=0.2)
+    release = threading.Event()
+    calls = []
+
+    def commit_group(group):
+        calls.append(len(group))
+        if len(calls) == 1:
+            raise RuntimeError('writer bug')
+        release.wait(5)
+        return [('ok', None)] * len(group)
+
+    writer._commit_group = commit_group
+    with pytest.raises(RuntimeError, match='writer bug'):
+        writer.submit(lambda cursor: None)
+
+    with pytest.raises(GroupCommitTimeout):
+        writer.submit(lambda cursor: None)
+    release.set()
+    assert writer.submit(lambda cursor: None) == 'ok'
+    stats = writer.stats()
+    assert stats['timeouts'] == 1
+    assert stats['pending'] == 0
@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+
+from backend.db.queries import get_buyer_by_email, get_user_by_email
+from backend.utils.hashing import (
+    HashingBusyError,
+    HashingPool,
+    bcrypt_rounds,
+    check_password,
+    hash_password,
+    hash_rounds,
+    needs_rehash,
+)
+
+
+def test_hash_uses_configured_cost(monkeypatch):
+    """
+    The cost factor comes from ESCROW_BCRYPT_ROUNDS and is recorded in the hash.
+    """
+    monkeypatch.setenv('ESCROW_BCRYPT_ROUNDS', '5')
+    hashed = hash_password('secret')
+
+    assert hash_rounds(hashed) == 5
+    assert check_password(hashed, 'secret')
+    assert not check_password(hashed, 'wrong')
+    assert not needs_rehash(hashed)
+
+    monkeypatch.setenv('ESCROW_BCRYPT_ROUNDS', '6')
+    assert needs_rehash(hashed)
+
+
+def test_cost_outside_bounds_is_rejected(monkeypatch):
+    """
+    Cost factors outside the allowed range fail loudly instead of hashing.
+    """
+    monkeypatch.setenv('ESCROW_BCRYPT_ROUNDS', '3')
+    with pytest.raises(ValueError):
+        bcrypt_rounds()
+    monkeypatch.setenv('ESCROW_BCRYPT_ROUNDS', '17')
+    with pytest.raises(ValueError):
+        bcrypt_rounds()
+
+
+def test_non_bcrypt_value_needs_rehash():
+    """
+    Values that are not bcrypt hashes have no cost and are always upgraded.
+    """
+    assert hash_rounds('plaintext') is None
+    assert needs_rehash('plaintext')
+
+
+def test_pool_rejects_when_queue_is_full():
+    """
+    Jobs beyond the queue limit are rejected immediately and counted.
+    """
+    pool = HashingPool(workers=1, queue_limit=1, timeout=5)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocked():
+        started.set()
+        release.wait()
+        return 'done'
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(pool.submit('hash', blocked)))
+    worker.start()
+    started.wait()
+
+    with pytest.raises(HashingBusyError):
+        pool.submit('hash', lambda: None)
+
+    stats = pool.stats()
+    assert stats['in_flight'] == 1
+    assert stats['rejected'] == 1
+
+    release.set()
+    worker.join()
+    assert results == ['done']
+
+    stats = pool.stats()
+    assert stats['completed'] == 1
+    assert stats['in_flight'] == 0
+    assert stats['queue_depth'] == 0
+    assert stats['latency']['hash']['count'] == 1
+    pool.shutdown()
+
+
+def test_pool_times_out_slow_jobs():
+    """
+    A job that does not finish within the timeout raises HashingBusyError.
+    """
+    pool = HashingPool(workers=1, queue_limit=2, timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(HashingBusyError):
+        pool.submit('verify', release.wait)
+    assert pool.stats()['timeouts'] == 1
+
+    release.set()
+    pool.shutdown()
+
+
+def test_login_rehashes_outdated_cost(client, test_user_builder, monkeypatch):
+    """
+    Logging in with a hash made at an older cost upgrades it to the configured cost.
+    """
+    original = get_user_by_email(test_user_builder['email'])['password_hash']
+    monkeypatch.setenv('ESCROW_BCRYPT_ROUNDS', str(hash_rounds(original) + 1))
+
+    response = client.post('/auth/login', json=test_user_builder)
+    assert response.status_code == 200
+
+    upgraded = get_user_by_email(test_user_builder['email'])['password_hash']
+    assert upgraded != original
+    assert hash_rounds(upgraded) == hash_rounds(original) + 1
+    assert check_password(upgraded, test_user_builder['password'])
+
+
+def test_buyer_login_keeps_current_hash(client, test_user_buyer):
+    """
+    A hash already at the configured cost is left untouched on login.
+    """
+    original = get_buyer_by_email(test_user_buyer['email'])['password_hash']
+
+    response = client.post('/buyer/auth/login', json=test_user_buyer)
+    assert response.status_code == 200
+    assert get_buyer_by_email(test_user_buyer['email'])['password_hash'] == original
+
+
+def test_login_returns_503_when_hashing_is_busy(client, test_user_builder, monkeypatch):
+    """
+    A saturated hashing queue sheds the login with 503 and a Retry-After header.
+    """
+    def busy(*args):
+        raise HashingBusyError('Authentication service is busy, please retry')
+
+    monkeypatch.setattr('backend.services.auth_services.check_password', busy)
+    response = client.post('/auth/login', json=test_user_builder)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['status'] == 'failure'
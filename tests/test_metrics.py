@@ -0,0 +1,130 @@
+import re
+
+import pytest
+
+from backend.utils import metrics
+from backend.utils.metrics import request_metrics
+
+
+def _samples(text):
+    """Parse exposition text into {(metric, labels): value} for non-comment lines."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('#') or not line:
+            continue
+        match = re.match(r'^(\w+)(\{.*\})? (\S+)$', line)
+        samples[(match.group(1), match.group(2) or '')] = float(match.group(3))
+    return samples
+
+
+@pytest.fixture
+def scrape(client, monkeypatch):
+    """Fetch /metrics the way a scraper does, with the configured bearer token."""
+    monkeypatch.setenv('ESCROW_METRICS_TOKEN', 'scrape-token')
+
+    def _scrape():
+        return client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    return _scrape
+
+
+def test_metrics_exposition_format(client, scrape):
+    """
+    /metrics serves text exposition with request counts labelled by blueprint and endpoint.
+    """
+    request_metrics.reset()
+    client.post('/auth/login', json={'email': 'nobody@test.com', 'password': 'x'})
+    client.post('/auth/login', json={'email': 'nobody@test.com', 'password': 'x'})
+
+    response = scrape()
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+
+    text = response.get_data(as_text=True)
+    assert '# TYPE escrow_http_request_duration_seconds histogram' in text
+    samples = _samples(text)
+    labels = '{blueprint="auth",endpoint="auth.login",method="POST",status="401"}'
+    assert samples[('escrow_http_requests_total', labels)] == 2
+
+    route = '{blueprint="auth",endpoint="auth.login"}'
+    assert samples[('escrow_http_request_duration_seconds_count', route)] == 2
+    assert samples[('escrow_http_requests_in_flight', route)] == 0
+    inf = '{blueprint="auth",endpoint="auth.login",le="+Inf"}'
+    assert samples[('escrow_http_request_duration_seconds_bucket', inf)] == 2
+    assert samples[('escrow_http_response_size_bytes_sum', route)] > 0
+
+
+def test_unmatched_urls_share_a_label(client, scrape):
+    """
+    404s for unknown paths are counted under a single 'unmatched' endpoint label.
+    """
+    request_metrics.reset()
+    # A request is counted once its body has been sent
+    client.get('/no/such/path').close()
+    client.get('/another/missing/path').close()
+
+    samples = _samples(scrape().get_data(as_text=True))
+    assert samples[('escrow_http_requests_total', '{blueprint="",endpoint="unmatched",method="GET",status="404"}')] == 2
+
+
+def test_streamed_response_size_is_recorded(client, test_user_admin, as_user):
+    """
+    Streamed exports record their full body size once the stream is consumed,
+    and their latency once the response is closed.
+    """
+    admin = as_user(test_user_admin)
+    request_metrics.reset()
+    response = admin.get('/admin/projects?export=json')
+    body = response.get_data()
+    response.close()
+
+    samples = _samples(client.get('/metrics').get_data(as_text=True))
+    route = '{blueprint="admin",endpoint="admin.list_all_projects"}'
+    assert len(body) > 0
+    assert samples[('escrow_http_response_size_bytes_sum', route)] == len(body)
+    assert samples[('escrow_http_requests_in_flight', route)] == 0
+    assert samples[('escrow_http_request_duration_seconds_count', route)] == 1
+
+
+def test_streamed_latency_covers_the_body(client, scrape):
+    """
+    A streamed response is timed until it is closed, not only until its headers are ready.
+    """
+    import time
+
+    from flask import Flask, Response
+
+    app = Flask('slow_stream')
+    metrics.init_request_metrics(app)
+
+    @app.route('/slow-stream')
+    def slow_stream():
+        def body():
+            for _ in range(3):
+                time.sleep(0.05)
+                yield 'x'
+        return Response(body())
+
+    request_metrics.reset()
+    response = app.test_client().get('/slow-stream')
+    assert response.get_data() == b'xxx'
+    response.close()
+
+    samples = _samples(scrape().get_data(as_text=True))
+    route = '{blueprint="",endpoint="slow_stream"}'
+    assert samples[('escrow_http_request_duration_seconds_sum', route)] >= 0.15
+
+
+def test_metrics_requires_admin_or_token(client, monkeypatch, as_user, test_user_admin, test_user_builder):
+    """
+    /metrics is refused to anonymous callers, non-admins and wrong tokens.
+    """
+    monkeypatch.setenv('ESCROW_METRICS_TOKEN', 'scrape-token')
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'}).status_code == 200
+
+    as_user(test_user_builder)
+    assert client.get('/metrics').status_code == 403
+    client.post('/auth/logout')
+    as_user(test_user_admin)
+    assert client.get('/metrics').status_code == 200
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from backend.db.db_connection import configure_pool
+from backend.db.migrate import (
+    SchemaOutOfDateError,
+    apply_migrations,
+    apply_schema,
+    discover_migrations,
+    init_db,
+    migrate_on_startup,
+    pending_migrations,
+)
+
+
+def test_init_db_applies_each_migration_once(tmp_path):
+    """
+    Migrations are recorded in SchemaMigration and skipped on later runs.
+    """
+    conn = sqlite3.connect(str(tmp_path / 'migrate.db'))
+    applied = init_db(conn)
+
+    assert [version for version, _ in applied] == [version for version, _, _ in discover_migrations()]
+    assert pending_migrations(conn) == []
+    # Re-running against an up-to-date database is a no-op
+    assert init_db(conn) == []
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_project_builder' in indexes
+    conn.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    """
+    A migration that errors leaves neither partial changes nor a version record.
+    """
+    migrations = tmp_path / 'migrations'
+    migrations.mkdir()
+    (migrations / '0001_good.sql').write_text("CREATE TABLE Good (id INTEGER);")
+    (migrations / '0002_bad.sql').write_text("CREATE TABLE Partial (id INTEGER); INSERT INTO Missing VALUES (1);")
+    conn = sqlite3.connect(str(tmp_path / 'migrate.db'))
+
+    with pytest.raises(sqlite3.OperationalError):
+        apply_migrations(conn, str(migrations))
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'Good' in tables
+    assert 'Partial' not in tables
+    assert [version for version, _ in pending_migrations(conn, str(migrations))] == [2]
+    conn.close()
+
+
+def test_migrate_on_startup_applies_or_refuses(tmp_path, monkeypatch):
+    """
+    Server startup migrates a database that is behind, or with automatic
+    migration turned off refuses to start until it has been migrated.
+    """
+    path = str(tmp_path / 'startup.db')
+    conn = sqlite3.connect(path)
+    apply_schema(conn)
+    conn.close()
+    configure_pool(db_path=path)
+
+    monkeypatch.setenv('ESCROW_DB_MIGRATE_ON_STARTUP', '0')
+    with pytest.raises(SchemaOutOfDateError):
+        migrate_on_startup()
+
+    monkeypatch.setenv('ESCROW_DB_MIGRATE_ON_STARTUP', '1')
+    assert len(migrate_on_startup()) == len(discover_migrations())
+
+    monkeypatch.setenv('ESCROW_DB_MIGRATE_ON_STARTUP', '0')
+    assert migrate_on_startup() == []
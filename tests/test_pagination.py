@@ -0,0 +1,143 @@
+import pytest
+
+from backend.utils.pagination import (
+    MAX_PAGE_SIZE, PaginationError, decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor
+)
+
+
+def test_cursor_round_trip():
+    """
+    Cursor tokens are opaque but decode back to the id they were made from.
+    """
+    assert decode_cursor(encode_cursor(1234)) == 1234
+
+
+def test_rank_cursor_round_trip():
+    """
+    Ranked cursors carry the exact relevance score and id, and are not interchangeable with id cursors.
+    """
+    assert decode_rank_cursor(encode_rank_cursor(-1.2345678901234567e-06, 42)) == (-1.2345678901234567e-06, 42)
+    with pytest.raises(PaginationError):
+        decode_rank_cursor(encode_cursor(42))
+
+
+def test_units_are_paged_with_next_cursor(as_user, test_user_builder):
+    """
+    Following next_cursor walks every unit exactly once, in id order.
+    """
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Paged Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+    client.post(
+        f'/builder/projects/{project_id}/units/batch',
+        json={'prefix': 'PG', 'units_per_floor': 5, 'num_floors': 1, 'area': 800, 'price': 90000}
+    )
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2}
+        if cursor:
+            params['after'] = cursor
+        data = client.get(f'/builder/projects/{project_id}/units', query_string=params).get_json()
+        assert len(data['units']) <= 2
+        seen.extend(unit['unit_id'] for unit in data['units'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == ['PG-101', 'PG-102', 'PG-103', 'PG-104', 'PG-105']
+
+
+def test_invalid_page_parameters_are_rejected(as_user, test_user_admin):
+    """
+    Non-numeric limits, limits above the server cap and forged cursors return 400.
+    """
+    client = as_user(test_user_admin)
+    assert client.get('/admin/bookings?limit=abc').status_code == 400
+    assert client.get(f'/admin/bookings?limit={MAX_PAGE_SIZE + 1}').status_code == 400
+    assert client.get('/admin/transactions?after=not-a-cursor').status_code == 400
+
+    response = client.get('/admin/projects?limit=10')
+    assert response.status_code == 200
+    assert response.get_json()['next_cursor'] is None
+
+
+@pytest.fixture
+def priced_units(as_user, test_user_builder):
+    """
+    A project with five units of varied floor, area and price; T-3 is booked.
+    Returns the project id.
+    """
+    from backend.db import queries
+
+    client = as_user(test_user_builder)
+    project_id = client.post(
+        '/builder/projects',
+        json={'name': 'Sorted Tower', 'location': 'Dubai', 'num_units': 0}
+    ).get_json()['project_id']
+    units = {}
+    for code, floor, area, price in [('T-1', 1, 800, 300000), ('T-2', 1, 1000, 500000), ('T-3', 2, 800, 500000),
+                                     ('T-4', 3, 1200, 700000), ('T-5', 2, 900, 400000)]:
+        units[code] = client.post(f'/builder/projects/{project_id}/units', json={
+            'unit_id': code, 'floor': floor, 'area': area, 'price': price}).get_json()['unit_id']
+    buyer = queries.create_buyer('Omar Saleh', '784002', '050', 'omar@test.com', 'hash', '2025-01-01')
+    queries.create_booking(units['T-3'], buyer, 50000, '2025-01-01', '2025-01-01')
+    client.post('/auth/logout')
+    return project_id
+
+
+def _walk(client, url, params):
+    """Follow next_cursor from the first page to the last; returns the unit codes seen."""
+    seen, cursor = [], None
+    while True:
+        page = dict(params, limit=2, **({'after': cursor} if cursor else {}))
+        data = client.get(url, query_string=page).get_json()
+        seen.extend(unit['unit_id'] for unit in data['units'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            return seen
+
+
+def test_units_filtered_and_sorted_server_side(as_user, test_user_builder, test_user_admin, priced_units):
+    """
+    Unit listings apply floor/price/area ranges and booked status in SQL and page
+    through price, area or floor orders with a (value, id) cursor.
+    """
+    client = as_user(test_user_builder)
+    url = f'/builder/projects/{priced_units}/units'
+
+    # Equal prices keep the sort direction on id
+    assert _walk(client, url, {'sort': '-price'}) == ['T-4', 'T-3', 'T-2', 'T-5', 'T-1']
+    assert _walk(client, url, {'sort': 'price'}) == ['T-1', 'T-5', 'T-2', 'T-3', 'T-4']
+    assert _walk(client, url, {'sort': 'area', 'min_price': 400000, 'max_price': 600000}) == ['T-3', 'T-5', 'T-2']
+    assert _walk(client, url, {'min_floor': 2, 'booked': 0}) == ['T-4', 'T-5']
+    assert _walk(client, url, {'booked': 1}) == ['T-3']
+
+    for params in ({'sort': 'name'}, {'min_price': 9, 'max_price': 1}, {'booked': 2}, {'min_area': 'big'}):
+        assert client.get(url, query_string=params).status_code == 400
+    # An id cursor cannot continue a price-sorted listing
+    first = client.get(url, query_string={'limit': 2}).get_json()
+    assert client.get(url, query_string={'sort': 'price', 'after': first['next_cursor']}).status_code == 400
+    client.post('/auth/logout')
+
+    admin = as_user(test_user_admin)
+    assert _walk(admin, f'/admin/projects/{priced_units}/units', {'sort': '-floor', 'max_area': 900}) == [
+        'T-5', 'T-3', 'T-1']
+
+
+def test_buyer_unit_filters_and_availability(as_buyer, test_user_buyer, priced_units):
+    """
+    Buyers get the same filters and orders, with the project's unit counts alongside.
+    """
+    client = as_buyer(test_user_buyer)
+    url = f'/buyer/projects/{priced_units}/units'
+
+    assert _walk(client, url, {'available': 1}) == ['T-1', 'T-2', 'T-4', 'T-5']
+    assert _walk(client, url, {'available': 1, 'sort': '-price', 'max_price': 600000}) == ['T-2', 'T-5', 'T-1']
+    assert _walk(client, url, {'min_area': 900, 'max_floor': 2}) == ['T-2', 'T-5']
+
+    data = client.get(url, query_string={'sort': 'area'}).get_json()
+    assert data['availability'] == {'total': 5, 'booked': 1, 'available': 4}
+    assert client.get(url, query_string={'available': 1, 'booked': 1}).status_code == 400
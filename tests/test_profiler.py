@@ -0,0 +1,104 @@
+import pytest
+
+from backend.db import queries
+from backend.db.profiler import configure_profiler, query_stats, reset_profiler, slow_queries
+from backend.utils.metrics import Histogram
+
+
+@pytest.fixture
+def profiler(client):
+    """Start each test with empty profiler statistics and restore the slow-query threshold."""
+    reset_profiler()
+    yield
+    configure_profiler(slow_query_ms=100)
+    reset_profiler()
+
+
+def test_histogram_percentiles():
+    """
+    Percentiles are estimated from bucket upper bounds, capped at the observed max.
+    """
+    histogram = Histogram(bounds=(10, 100))
+    for value in [1] * 90 + [50] * 9 + [500]:
+        histogram.observe(value)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(95) == 100
+    assert histogram.percentile(100) == 500
+    assert histogram.cumulative() == [(10, 90), (100, 99), ('+Inf', 100)]
+
+
+def test_records_calls_and_rows(test_user_builder, profiler):
+    """
+    Each call is counted with its latency and the rows it fetched.
+    """
+    queries.get_user_by_email(test_user_builder['email'])
+    queries.get_user_by_email('missing@test.com')
+
+    stats = query_stats()['get_user_by_email']
+    assert stats['calls'] == 2
+    assert stats['rows'] == 1
+    assert stats['errors'] == 0
+    assert stats['latency_ms']['count'] == 2
+
+
+def test_records_swallowed_errors(test_user_builder, profiler):
+    """
+    Errors that a query function catches and turns into None are still counted.
+    """
+    assert queries.create_user('Dup', test_user_builder['email'], 'hash', 'builder', '2025-01-01') is None
+    assert query_stats()['create_user']['errors'] == 1
+
+
+def test_generator_rows_are_counted(test_user_builder, profiler):
+    """
+    Streaming functions are timed across iteration and count every yielded row.
+    """
+    builder_id = queries.get_user_by_email(test_user_builder['email'])['id']
+    for index in range(3):
+        queries.insert_project(builder_id, f'Tower {index}', 'Dubai', 0, '2025-01-01')
+    assert len(list(queries.iter_all_projects(batch_size=2))) == 3
+
+    stats = query_stats()['iter_all_projects']
+    assert stats['calls'] == 1
+    assert stats['rows'] == 3
+
+
+def test_slow_queries_are_logged_with_plan(profiler, caplog):
+    """
+    Statements over the threshold land in the slow-query log with their query plan.
+    """
+    configure_profiler(slow_query_ms=0)
+    queries.fetch_units_by_project(1)
+
+    entry = slow_queries()[-1]
+    assert entry['function'] == 'fetch_units_by_project'
+    assert 'FROM Unit' in entry['sql']
+    assert entry['plan']
+    assert 'Slow query in fetch_units_by_project' in caplog.text
+
+
+def test_metrics_endpoint_is_admin_only(client, test_user_builder, as_user):
+    """
+    Builders cannot read runtime metrics.
+    """
+    response = as_user(test_user_builder).get('/admin/metrics')
+    assert response.status_code == 403
+
+
+def test_metrics_endpoint(profiler, test_user_admin, as_user):
+    """
+    Admins get query, pool, hashing and auth cache metrics.
+    """
+    response = as_user(test_user_admin).get('/admin/metrics')
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert data['status'] == 'success'
+    assert data['queries']['get_user_by_email']['calls'] >= 1
+    assert {'hits', 'misses', 'in_use'} <= set(data['pool'])
+    assert data['group_commit'] == {'enabled': False}
+    assert {'queue_depth', 'in_flight', 'latency'} <= set(data['hashing'])
+    assert {'users', 'buyers'} == set(data['auth_cache'])
+    assert isinstance(data['slow_queries'], list)
@@ -0,0 +1,66 @@
+from backend.db.db_connection import pooled_connection
+from backend.db.project_stats import rebuild_project_stats, verify_project_stats
+from backend.db.queries import (
+    create_booking,
+    create_buyer,
+    create_transaction,
+    create_user,
+    insert_project,
+    insert_unit,
+    match_transaction_to_booking
+)
+
+
+def _seed_project():
+    """
+    Create a builder, buyer, project with two units, one booking and two
+    transactions (one of them matched). Returns the project ID.
+    """
+    builder_id = create_user('Builder', 'stats@test.com', 'hash', 'builder', '2025-01-01')
+    buyer_id = create_buyer('Buyer', '784199001010001', '0500000000', 'statsbuyer@test.com', 'hash', '2025-01-01')
+    project_id = insert_project(builder_id, 'Stats Tower', 'Dubai', 0, '2025-01-01')
+    first_unit = insert_unit(project_id, 'S101', 1, 900, 100000, '2025-01-01')
+    second_unit = insert_unit(project_id, 'S102', 1, 900, 100000, '2025-01-01')
+    booking_id = create_booking(first_unit, buyer_id, 40000, '2025-01-02', '2025-01-02')
+    matched_tx = create_transaction(40000, '2025-01-03', 'cash', '2025-01-03', buyer_id, first_unit)
+    create_transaction(5000, '2025-01-03', 'cash', '2025-01-03', buyer_id, second_unit)
+    match_transaction_to_booking(matched_tx, booking_id)
+    # Matching the same transaction again must not move the counters twice
+    match_transaction_to_booking(matched_tx, booking_id)
+    return project_id
+
+
+def test_counters_follow_writes(client):
+    """
+    Bookings, transactions and matches update ProjectStats in the same transaction.
+    """
+    project_id = _seed_project()
+
+    with pooled_connection() as conn:
+        stats = dict(conn.execute("SELECT * FROM ProjectStats WHERE project_id = ?", (project_id,)).fetchone())
+        assert stats['booked_units'] == 1
+        assert stats['booking_amount'] == 40000
+        assert stats['matched_transactions'] == 1
+        assert stats['unmatched_transactions'] == 1
+        assert verify_project_stats(conn) == []
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(client):
+    """
+    Tampered counters are reported by verify and corrected by rebuild.
+    """
+    project_id = _seed_project()
+
+    with pooled_connection() as conn:
+        conn.execute("UPDATE ProjectStats SET booked_units = 7 WHERE project_id = ?", (project_id,))
+        conn.execute("UPDATE Project SET num_units = 0 WHERE id = ?", (project_id,))
+        conn.commit()
+
+        drift = verify_project_stats(conn)
+        assert {(d['column'], d['stored'], d['expected']) for d in drift} == {
+            ('booked_units', 7, 1),
+            ('num_units', 0, 2),
+        }
+
+        assert len(rebuild_project_stats(conn)) == 2
+        assert verify_project_stats(conn) == []
@@ -0,0 +1,138 @@
+"""
+EXPLAIN QUERY PLAN regression checks for backend/db/queries.py.
+
+Each data-access function is called against a migrated database while the
+SQL it issues is captured; every captured statement must reach the large
+tables (see query_plan.LARGE_TABLES) through an index rather than a full SCAN.
+"""
+import inspect
+
+import pytest
+
+from backend.db import queries
+from backend.db.db_connection import configure_pool, get_connection
+from backend.db.migrate import init_db
+from backend.db.query_plan import full_scans
+
+# Functions whose purpose is to return a whole table (admin exports) and are
+# therefore allowed to scan it.
+FULL_SCAN_ALLOWED = {
+    'fetch_all_bookings',
+    'fetch_all_transactions',
+    'fetch_all_projects',
+    'iter_all_bookings',
+    'iter_all_transactions',
+    'iter_all_projects',
+}
+
+# Representative arguments for every function in queries.py
+QUERY_CALLS = [
+    ('get_user_by_email', ('builder@test.com',)),
+    ('create_user', ('Builder', 'plan@test.com', 'hash', 'builder', '2025-01-01')),
+    ('update_user_password_hash', (1, 'hash')),
+    ('get_buyer_by_email', ('buyer@test.com',)),
+    ('get_buyer_by_emirates_id', ('784199001010001',)),
+    ('create_buyer', ('Buyer', '784199001010002', '0500000000', 'planbuyer@test.com', 'hash', '2025-01-01')),
+    ('update_buyer_password_hash', (1, 'hash')),
+    ('insert_project', (1, 'Plan Tower', 'Dubai', 0, '2025-01-01')),
+    ('fetch_projects_by_builder', (1,)),
+    ('fetch_projects_by_builder', (1, 1, 50)),
+    ('insert_unit', (1, 'PLAN-101', 1, 900, 100000, '2025-01-01')),
+    ('insert_units_bulk', (1, [('PLAN-102', 1, 900, 100000)], '2025-01-01')),
+    ('fetch_units_by_project', (1,)),
+    ('fetch_units_by_project', (1, 1, 50)),
+    ('fetch_units_by_project', (1, None, 50, {'min_price': 1000.0, 'max_price': 5000.0, 'booked': 0})),
+    ('fetch_units_by_project', (1, (1000.0, 1), 50, {'min_floor': 2, 'max_area': 900.0}, '-price')),
+    ('fetch_units_by_project', (1, (2, 1), 50, {}, 'floor')),
+    ('fetch_unit_availability', (1,)),
+    ('create_booking', (1, 1, 10000, '2025-01-01', '2025-01-01')),
+    ('create_bookings_batch', ([(1, 1, 100.0, '2025-01-01'), (2, 1, 100.0, '2025-01-01')], '2025-01-01')),
+    ('fetch_booking_by_unit_id', (1,)),
+    ('fetch_bookings_by_buyer_id', (1,)),
+    ('fetch_bookings_by_buyer_id', (1, 1, 50)),
+    ('fetch_all_bookings', ()),
+    ('iter_all_bookings', ()),
+    ('create_transaction', (10000, '2025-01-01', 'cash', '2025-01-01', 1, 1)),
+    ('fetch_all_transactions', ()),
+    ('iter_all_transactions', ()),
+    ('fetch_transactions_by_builder', (1,)),
+    ('fetch_transactions_by_builder', (1, 1, 50)),
+    ('fetch_transactions_by_buyer_id', (1,)),
+    ('fetch_transactions_by_buyer_id', (1, 1, 50)),
+    ('fetch_dashboard_data', (1,)),
+    ('fetch_all_builders', ()),
+    ('fetch_all_projects', ()),
+    ('iter_all_projects', ()),
+    ('fetch_platform_overview', ()),
+    ('fetch_bookings_by_buyer_or_unit', ('Buyer',)),
+    ('fetch_bookings_by_buyer_or_unit', ('Buyer', (-1.0, 1), 50)),
+    ('filter_bookings', ({'buyer_name': 'Buyer', 'status': 'matched'},)),
+    ('filter_bookings', ({'builder_id': 1, 'date_from': '2025-01-01', 'min_amount': 100}, 1, 50)),
+    ('filter_bookings', ({'project_name': 'Plan', 'unit_id': 'PLAN', 'status': 'unmatched'},)),
+    ('search_projects_by_name', ('Plan',)),
+    ('search_projects_by_name', ('Plan', (-1.0, 1), 50)),
+    ('get_unit_internal_id_by_unit_code', ('PLAN-101',)),
+    ('get_unit_by_internal_id', (1,)),
+    ('match_transaction_to_booking', (1, 1)),
+    ('fetch_unit_codes', (1,)),
+    ('insert_transactions_bulk', ([(1, 'ref:1', 100.0, '2025-01-01', 'cash', 1, 1)], '2025-01-01')),
+    ('fetch_unmatched_transactions_by_builder', (1,)),
+    ('fetch_unmatched_bookings_by_builder', (1,)),
+    ('apply_transaction_matches', (1, [(1, 1)])),
+    ('fetch_bookings_by_builder_id', (1,)),
+    ('fetch_bookings_by_builder_id', (1, 1, 50)),
+    ('fetch_project_by_id', (1,)),
+]
+
+_DATA_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+
+@pytest.fixture
+def traced_db(tmp_path):
+    """
+    Migrated single-connection database whose statements are recorded.
+    Yields the list that captured SQL is appended to.
+    """
+    configure_pool(db_path=str(tmp_path / 'plans.db'), size=1)
+    statements = []
+    conn = get_connection()
+    init_db(conn)
+    conn.set_trace_callback(statements.append)
+    conn.close()
+    yield statements
+    conn = get_connection()
+    conn.set_trace_callback(None)
+    conn.close()
+
+
+def test_every_query_function_is_covered():
+    """
+    New functions in queries.py must be added to QUERY_CALLS so their plans are checked.
+    """
+    public = {
+        name for name, value in vars(queries).items()
+        if callable(value) and not name.startswith('_') and getattr(value, '__module__', None) == queries.__name__
+    }
+    assert public == {name for name, _ in QUERY_CALLS}
+
+
+@pytest.mark.parametrize('name,args', QUERY_CALLS, ids=[name for name, _ in QUERY_CALLS])
+def test_query_avoids_full_scans(traced_db, name, args):
+    """
+    No statement issued by a data-access function fully scans a large table.
+    """
+    traced_db.clear()
+    result = getattr(queries, name)(*args)
+    if inspect.isgenerator(result):
+        list(result)
+    statements = [sql for sql in traced_db if sql.lstrip().upper().startswith(_DATA_STATEMENTS)]
+    assert statements, f"{name} issued no SQL"
+    if name in FULL_SCAN_ALLOWED:
+        return
+
+    conn = get_connection()
+    try:
+        scans = {sql: full_scans(conn, sql) for sql in statements}
+    finally:
+        conn.close()
+    assert not any(scans.values()), f"{name} falls back to a full scan: {scans}"
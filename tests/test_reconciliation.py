@@ -0,0 +1,141 @@
+import pytest
+
+from backend.services.reconciliation import propose_matches, score, summarize
+
+
+def _row(id, unit_id, buyer_id, amount, date):
+    return {'id': id, 'unit_id': unit_id, 'buyer_id': buyer_id, 'amount': amount, 'date': date}
+
+
+def test_score_weighs_each_agreeing_field():
+    """
+    Unit, buyer, exact amount and same-day date together give full confidence;
+    near amounts and distant dates earn less.
+    """
+    booking = _row(1, 10, 5, 1000.0, '2025-06-01')
+    assert score(_row(1, 10, 5, 1000.0, '2025-06-01'), booking)[:2] == (1.0, ['unit', 'buyer', 'amount', 'date'])
+
+    confidence, reasons, days = score(_row(1, 10, 7, 1005.0, '2025-08-01'), booking)
+    assert reasons == ['unit', 'amount~']
+    assert confidence == 0.6
+    assert days == 61
+
+
+def test_propose_matches_assigns_each_row_once():
+    """
+    The strongest pair wins; the losing transaction falls back to its next candidate
+    and rows without any candidate stay unmatched.
+    """
+    bookings = [_row(1, 10, 5, 1000.0, '2025-06-01'), _row(2, 11, 5, 1000.0, '2025-06-03')]
+    transactions = [
+        _row(100, 10, 5, 1000.0, '2025-06-02'),   # exact unit -> booking 1
+        _row(101, 12, 5, 1000.0, '2025-06-03'),   # same buyer and amount -> booking 2
+        _row(102, 13, 9, 50.0, '2025-06-03'),     # nothing in common
+    ]
+
+    proposals = propose_matches(transactions, bookings)
+    assert [(p['transaction_id'], p['booking_id']) for p in proposals] == [(100, 1), (101, 2)]
+    assert proposals[0]['confidence'] > proposals[1]['confidence']
+
+    summary = summarize(proposals, transactions, bookings)
+    assert summary['proposed'] == 2
+    assert summary['left_unmatched'] == 1
+    assert sum(summary['by_confidence'].values()) == 2
+
+    assert propose_matches(transactions, bookings, min_confidence=0.9) == proposals[:1]
+
+
+@pytest.fixture
+def unmatched_payments(client, test_user_builder):
+    """
+    The test builder's project with three bookings and two unmatched payments,
+    plus another builder's booking paid for by the same buyer.
+    Returns a dict of the ids created.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builder_id = queries.get_user_by_email(test_user_builder['email'])['id']
+    other_builder = queries.create_user('Other', 'other@test.com', 'hash', 'builder', stamp)
+    project = queries.insert_project(builder_id, 'Marina View', 'Dubai', 0, stamp)
+    other_project = queries.insert_project(other_builder, 'Palm Residences', 'Dubai', 0, stamp)
+    units = [queries.insert_unit(project, f'MV{n}', 1, 900, 1000000, stamp) for n in range(3)]
+    other_unit = queries.insert_unit(other_project, 'PR1', 1, 900, 1000000, stamp)
+    buyer = queries.create_buyer('Layla Haddad', '784001', '050', 'layla@test.com', 'hash', stamp)
+
+    bookings = [queries.create_booking(unit, buyer, 50000, '2025-02-01', stamp) for unit in units]
+    other_booking = queries.create_booking(other_unit, buyer, 50000, '2025-02-01', stamp)
+    transactions = [
+        queries.create_transaction(50000, '2025-02-01', 'cash', stamp, buyer, units[0]),
+        queries.create_transaction(49800, '2025-02-20', 'cash', stamp, buyer, units[1]),
+    ]
+    queries.create_transaction(50000, '2025-02-01', 'cash', stamp, buyer, other_unit)
+    return {'bookings': bookings, 'transactions': transactions, 'other_booking': other_booking}
+
+
+def test_reconcile_preview_does_not_write(as_user, test_user_builder, unmatched_payments):
+    """
+    GET proposes matches for the builder's own unmatched payments only and changes nothing.
+    """
+    builder_client = as_user(test_user_builder)
+    bookings, transactions = unmatched_payments['bookings'], unmatched_payments['transactions']
+
+    response = builder_client.get('/builder/transactions/reconcile')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['summary']['unmatched_transactions'] == 2
+    assert data['summary']['unmatched_bookings'] == 3
+    assert [(p['transaction_id'], p['booking_id']) for p in data['proposals']] == [
+        (transactions[0], bookings[0]), (transactions[1], bookings[1])]
+    assert 'applied' not in data
+
+    high = builder_client.get('/builder/transactions/reconcile', query_string={'min_confidence': 0.9})
+    assert len(high.get_json()['proposals']) == 1
+
+    again = builder_client.get('/builder/transactions/reconcile').get_json()
+    assert again['summary']['unmatched_transactions'] == 2
+
+
+def test_reconcile_applies_proposals_above_threshold(as_user, test_user_builder, unmatched_payments):
+    """
+    POST with min_confidence applies the qualifying proposals in one go.
+    """
+    builder_client = as_user(test_user_builder)
+
+    response = builder_client.post('/builder/transactions/reconcile', json={'min_confidence': 0.9})
+    assert response.status_code == 200
+    assert response.get_json()['applied'] == 1
+
+    remaining = builder_client.get('/builder/transactions/reconcile').get_json()
+    assert remaining['summary']['unmatched_transactions'] == 1
+    assert remaining['summary']['unmatched_bookings'] == 2
+
+
+def test_reconcile_applies_accepted_matches(as_user, test_user_builder, unmatched_payments):
+    """
+    POST with an accepted list applies valid pairs and skips other builders' or already used rows.
+    """
+    builder_client = as_user(test_user_builder)
+    bookings, transactions = unmatched_payments['bookings'], unmatched_payments['transactions']
+
+    response = builder_client.post('/builder/transactions/reconcile', json={'matches': [
+        {'transaction_id': transactions[1], 'booking_id': bookings[2]},
+        {'transaction_id': transactions[0], 'booking_id': bookings[2]},
+        {'transaction_id': transactions[0], 'booking_id': unmatched_payments['other_booking']},
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['applied'] == 1
+    assert len(data['skipped']) == 2
+
+
+def test_reconcile_rejects_bad_input(as_user, test_user_builder, client):
+    """
+    min_confidence must be within [0, 1] and matches must name both ids.
+    """
+    builder_client = as_user(test_user_builder)
+    assert builder_client.get('/builder/transactions/reconcile',
+                              query_string={'min_confidence': 2}).status_code == 400
+    assert builder_client.post('/builder/transactions/reconcile', json={}).status_code == 400
+    assert builder_client.post('/builder/transactions/reconcile',
+                               json={'matches': [{'transaction_id': 1}]}).status_code == 400
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_filter_by_project_name(as_user, test_user_builder, test_user_admin):
     """
     Verify admin can filter projects by name.
@@ -127,4 +130,184 @@ def test_filter_unauthenticated_access(client):
     Verify that unauthenticated requests to admin filter are rejected.
     """
     response = client.get('/admin/filter?project_name=Sunrise')
-    assert response.status_code in [401, 403]
\ No newline at end of file
+    assert response.status_code in [401, 403]
+
+def test_search_matches_word_prefixes(as_user, test_user_builder, test_user_admin):
+    """
+    Project search matches whole words and word prefixes, case-insensitively,
+    but not arbitrary substrings.
+    """
+    builder_client = as_user(test_user_builder)
+    for name in ('Sunrise Heights', 'Marina Sunrise', 'Palm Tower'):
+        builder_client.post('/builder/projects', json={"name": name, "location": "Dubai", "num_units": 0})
+
+    admin_client = as_user(test_user_admin)
+    names = lambda q: sorted(p['name'] for p in admin_client.get(f'/admin/filter?project_name={q}').get_json()['projects'])
+    assert names('sunrise') == ['Marina Sunrise', 'Sunrise Heights']
+    assert names('SUN') == ['Marina Sunrise', 'Sunrise Heights']
+    assert names('sunrise hei') == ['Sunrise Heights']
+    assert names('rise') == []
+
+
+def test_search_results_are_ranked_and_paged(as_user, test_user_builder, test_user_admin):
+    """
+    Search pages follow next_cursor in relevance order, visiting every match once.
+    """
+    builder_client = as_user(test_user_builder)
+    for index in range(5):
+        builder_client.post('/builder/projects', json={"name": f"Harbour View {index}", "location": "Dubai", "num_units": 0})
+    # A shorter name is a denser match and ranks first
+    builder_client.post('/builder/projects', json={"name": "Harbour", "location": "Dubai", "num_units": 0})
+
+    admin_client = as_user(test_user_admin)
+    seen, cursor = [], None
+    while True:
+        params = {'project_name': 'harbour', 'limit': 2}
+        if cursor:
+            params['after'] = cursor
+        data = admin_client.get('/admin/filter', query_string=params).get_json()
+        assert len(data['projects']) <= 2
+        seen.extend(data['projects'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == 6
+    assert seen[0]['name'] == 'Harbour'
+    assert [p['rank'] for p in seen] == sorted(p['rank'] for p in seen)
+
+
+def test_search_index_follows_renames(client, test_user_builder):
+    """
+    Triggers keep the search index in step with the searched columns.
+    """
+    from backend.db.db_connection import pooled_connection
+    from backend.db.queries import get_user_by_email, insert_project, search_projects_by_name
+
+    builder_id = get_user_by_email(test_user_builder['email'])['id']
+    project_id = insert_project(builder_id, 'Old Name', 'Dubai', 0, '2025-01-01')
+    with pooled_connection() as conn:
+        conn.execute("UPDATE Project SET name = 'Crescent Gardens' WHERE id = ?", (project_id,))
+        conn.commit()
+
+    assert search_projects_by_name('old') == []
+    assert [p['id'] for p in search_projects_by_name('crescent')] == [project_id]
+
+    with pooled_connection() as conn:
+        conn.execute("DELETE FROM Project WHERE id = ?", (project_id,))
+        conn.commit()
+    assert search_projects_by_name('crescent') == []
+
+
+@pytest.fixture
+def booking_grid(client):
+    """
+    Two builders with one project each, three buyers and four bookings:
+    one matched payment, one unmatched payment and two unpaid bookings.
+    Returns a dict of the ids created.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builders = [queries.create_user(f'Builder {n}', f'b{n}@test.com', 'hash', 'builder', stamp) for n in (1, 2)]
+    projects = [
+        queries.insert_project(builders[0], 'Sunrise Heights', 'Dubai', 0, stamp),
+        queries.insert_project(builders[1], 'Palm Residences', 'Dubai', 0, stamp),
+    ]
+    units = [queries.insert_unit(projects[n // 2], f'U{n}', 1, 900, 1000000, stamp) for n in range(4)]
+    buyers = [queries.create_buyer(name, f'78400{n}', '050', f'buyer{n}@test.com', 'hash', stamp)
+              for n, name in enumerate(['Layla Haddad', 'Omar Khan', 'Layla Nasser'])]
+    bookings = [
+        queries.create_booking(units[0], buyers[0], 50000, '2025-02-01', stamp),
+        queries.create_booking(units[1], buyers[1], 80000, '2025-03-15', stamp),
+        queries.create_booking(units[2], buyers[2], 120000, '2025-04-01', stamp),
+        queries.create_booking(units[3], buyers[0], 20000, '2025-05-20', stamp),
+    ]
+    matched = queries.create_transaction(50000, '2025-02-02', 'cash', stamp, buyers[0], units[0])
+    queries.match_transaction_to_booking(matched, bookings[0])
+    queries.create_transaction(120000, '2025-04-02', 'cash', stamp, buyers[2], units[2])
+    return {'builders': builders, 'projects': projects, 'buyers': buyers, 'bookings': bookings}
+
+
+def test_composite_filter_combines_fields(as_user, test_user_admin, booking_grid):
+    """
+    Every given filter must hold; results carry project, builder and payment status.
+    """
+    admin_client = as_user(test_user_admin)
+    bookings = booking_grid['bookings']
+
+    def ids(**params):
+        response = admin_client.get('/admin/filter', query_string=params)
+        assert response.status_code == 200
+        return [booking['id'] for booking in response.get_json()['bookings']]
+
+    assert ids(buyer_name='layla') == [bookings[0], bookings[2], bookings[3]]
+    assert ids(buyer_name='layla', builder_id=booking_grid['builders'][1]) == [bookings[2], bookings[3]]
+    assert ids(buyer_name='layla', project_name='sunrise') == [bookings[0]]
+    assert ids(date_from='2025-03-01', date_to='2025-04-30') == [bookings[1], bookings[2]]
+    assert ids(min_amount=60000, max_amount=100000) == [bookings[1]]
+    assert ids(unit_id='U3') == [bookings[3]]
+    assert ids(status='matched') == [bookings[0]]
+    assert ids(status='unmatched') == [bookings[2]]
+    assert ids(status='unpaid', project_id=booking_grid['projects'][1]) == [bookings[3]]
+    assert ids(status='unpaid', min_amount=70000) == [bookings[1]]
+
+    row = admin_client.get('/admin/filter?status=matched').get_json()['bookings'][0]
+    assert row['project_name'] == 'Sunrise Heights'
+    assert row['builder_id'] == booking_grid['builders'][0]
+    assert row['status'] == 'matched'
+
+
+def test_date_filter_includes_whole_last_day(as_user, test_user_admin, client):
+    """
+    date_to covers bookings made at any time on that day, not just at midnight.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builder_id = queries.create_user('Builder', 'days@test.com', 'hash', 'builder', stamp)
+    project_id = queries.insert_project(builder_id, 'Boundary Tower', 'Dubai', 0, stamp)
+    units = [queries.insert_unit(project_id, f'D{n}', 1, 900, 1000000, stamp) for n in range(4)]
+    buyer_id = queries.create_buyer('Dana Boundary', '784009', '050', 'days-buyer@test.com', 'hash', stamp)
+    bookings = [queries.create_booking(unit_id, buyer_id, 50000, day, stamp) for unit_id, day in zip(units, [
+        '2025-03-31T23:59:59', '2025-04-30', '2025-04-30T18:45:00', '2025-05-01T00:00:00'])]
+
+    admin_client = as_user(test_user_admin)
+    response = admin_client.get('/admin/filter', query_string={'date_from': '2025-04-01', 'date_to': '2025-04-30'})
+    assert response.status_code == 200
+    assert [booking['id'] for booking in response.get_json()['bookings']] == bookings[1:3]
+
+
+def test_composite_filter_pages_by_id(as_user, test_user_admin, booking_grid):
+    """
+    Filtered bookings are paginated with next_cursor like the other list endpoints.
+    """
+    admin_client = as_user(test_user_admin)
+    first = admin_client.get('/admin/filter?buyer_name=layla&limit=2').get_json()
+    assert len(first['bookings']) == 2
+    second = admin_client.get(f"/admin/filter?buyer_name=layla&limit=2&after={first['next_cursor']}").get_json()
+    assert [b['id'] for b in second['bookings']] == [booking_grid['bookings'][3]]
+    assert second['next_cursor'] is None
+
+
+def test_composite_filter_drives_from_most_selective(booking_grid):
+    """
+    The filter matching the fewest bookings is evaluated first; check-only filters go last.
+    """
+    from backend.db.db_connection import pooled_connection
+    from backend.db.filters import build_booking_filter
+
+    filters = {'status': 'unpaid', 'date_from': '2025-01-01', 'unit_id': 'U3'}
+    with pooled_connection() as conn:
+        _, _, plan = build_booking_filter(conn, filters)
+    assert plan == [('unit_id', 1), ('date', 4), ('status', None)]
+
+
+def test_composite_filter_rejects_bad_values(as_user, test_user_admin):
+    """
+    Malformed dates, amounts, ids and statuses return 400.
+    """
+    admin_client = as_user(test_user_admin)
+    for query in ('date_from=yesterday', 'min_amount=lots', 'builder_id=x', 'status=refunded',
+                  'date_from=2025-05-01&date_to=2025-01-01', 'buyer_name=%21%21'):
+        assert admin_client.get(f'/admin/filter?{query}').status_code == 400
@@ -217,4 +217,182 @@ def test_list_builder_transactions_forbidden_for_admin(as_user, test_user_admin)
     response = admin_client.get('/builder/transactions')
 
     # ASSERT: Access is forbidden
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def _booked_units(test_user_builder, codes):
+    """
+    Create a project for the test builder with one booked unit per code.
+    Returns the project id.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    builder_id = queries.get_user_by_email(test_user_builder['email'])['id']
+    project_id = queries.insert_project(builder_id, 'Statement Tower', 'Dubai', 0, stamp)
+    buyer_id = queries.create_buyer('Layla Haddad', '784001', '050', 'layla@test.com', 'hash', stamp)
+    for code in codes:
+        unit_id = queries.insert_unit(project_id, code, 1, 900, 100000, stamp)
+        queries.create_booking(unit_id, buyer_id, 100000, '2025-06-01', stamp)
+    queries.insert_unit(project_id, 'ST-FREE', 1, 900, 100000, stamp)
+    return project_id
+
+
+def test_import_statement_is_idempotent(as_user, test_user_builder):
+    """
+    A CSV statement records one transaction per valid row; uploading it again skips every row.
+    """
+    _booked_units(test_user_builder, ['ST-1', 'ST-2', 'ST-3'])
+    builder_client = as_user(test_user_builder)
+
+    body = (
+        "unit_id,amount,date,payment_method,reference\n"
+        "ST-1,100000,2025-06-02,bank transfer,TRX-1\n"
+        "ST-2,100000,2025-06-02,cheque,TRX-2\n"
+        "ST-FREE,100000,2025-06-02,cash,TRX-3\n"
+        "ST-3,100000,2025-06-03,cash,\n"
+        "ST-1,100000,2025-06-02,bank transfer,TRX-1\n"
+    )
+    response = builder_client.post('/builder/transactions/import', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['rows_imported'] == 2
+    assert report['rows_skipped'] == 1
+    assert [(error['row'], error['message']) for error in report['errors']] == [
+        (2, 'Invalid payment type'), (3, 'Unit is not booked')]
+
+    again = builder_client.post('/builder/transactions/import', data=body, content_type='text/csv').get_json()
+    assert again['rows_imported'] == 0
+    assert again['rows_skipped'] == 3
+
+    # The rollup counters moved once per row actually written
+    assert builder_client.get('/builder/dashboard').get_json()['unmatched_transactions'] == 2
+
+
+def test_import_statement_references_are_scoped_per_project(client, as_user, test_user_builder):
+    """
+    Two builders may use the same bank reference; reusing a recorded reference
+    with other payment details is reported as an error, not skipped.
+    """
+    from backend.db import queries
+
+    _booked_units(test_user_builder, ['SC-1', 'SC-2'])
+    other = {'name': 'Other', 'email': 'other@test.com', 'password': 'otherpass', 'role': 'builder'}
+    client.post('/auth/register', json=other)
+    other_project = queries.insert_project(queries.get_user_by_email(other['email'])['id'],
+                                           'Palm Residences', 'Dubai', 0, '2025-01-01')
+    unit_id = queries.insert_unit(other_project, 'PR-1', 1, 900, 100000, '2025-01-01')
+    buyer_id = queries.create_buyer('Omar Khan', '784002', '050', 'omar@test.com', 'hash', '2025-01-01')
+    queries.create_booking(unit_id, buyer_id, 100000, '2025-06-01', '2025-01-01')
+
+    header = "unit_id,amount,date,payment_method,reference\n"
+    builder_client = as_user(test_user_builder)
+    report = builder_client.post('/builder/transactions/import', content_type='text/csv',
+                                 data=header + "SC-1,100000,2025-06-02,cash,TRX-9\n").get_json()
+    assert report['rows_imported'] == 1
+    builder_client.post('/auth/logout')
+
+    other_client = as_user({'email': other['email'], 'password': other['password']})
+    report = other_client.post('/builder/transactions/import', content_type='text/csv',
+                               data=header + "PR-1,75000,2025-06-05,cash,TRX-9\n").get_json()
+    assert report['rows_imported'] == 1
+    assert report['rows_skipped'] == 0
+    other_client.post('/auth/logout')
+
+    builder_client = as_user(test_user_builder)
+    report = builder_client.post('/builder/transactions/import', content_type='text/csv', data=(
+        header
+        + "SC-1,100000,2025-06-02,cash,TRX-9\n"
+        + "SC-2,90000,2025-06-03,cash,TRX-9\n"
+    )).get_json()
+    assert report['rows_imported'] == 0
+    assert report['rows_skipped'] == 1
+    assert [(error['row'], error['message']) for error in report['errors']] == [
+        (2, 'Reference already recorded with different payment details')]
+    report = builder_client.post('/builder/transactions/import', content_type='text/csv',
+                                 data=header + "SC-2,90000,2025-06-03,cash,TRX-9\n").get_json()
+    assert report['rows_imported'] == 0
+    assert report['errors'][0]['message'] == 'Reference already recorded with different payment details'
+
+
+def test_import_statement_rejects_non_finite_amounts(as_user, test_user_builder):
+    """
+    Rows with a nan or infinite amount are reported instead of recorded.
+    """
+    _booked_units(test_user_builder, ['NF-1', 'NF-2', 'NF-3'])
+    builder_client = as_user(test_user_builder)
+
+    body = (
+        "unit_id,amount,date,payment_method,reference\n"
+        "NF-1,nan,2025-06-02,cash,NF-TRX-1\n"
+        "NF-2,inf,2025-06-02,cash,NF-TRX-2\n"
+        "NF-3,100000,2025-06-02,cash,NF-TRX-3\n"
+    )
+    report = builder_client.post('/builder/transactions/import', data=body, content_type='text/csv').get_json()
+    assert report['rows_imported'] == 1
+    assert [(error['row'], error['message']) for error in report['errors']] == [
+        (1, 'amount must be a finite number'), (2, 'amount must be a finite number')]
+
+
+def test_import_statement_ndjson_scopes_units(as_user, test_user_admin, test_user_builder):
+    """
+    NDJSON is accepted; a builder cannot pay into other builders' units, an admin can,
+    and a unit can only be paid once.
+    """
+    from backend.db import queries
+
+    _booked_units(test_user_builder, ['ND-1'])
+    other_builder = queries.create_user('Other', 'other@test.com', 'hash', 'builder', '2025-01-01')
+    other_project = queries.insert_project(other_builder, 'Palm Residences', 'Dubai', 0, '2025-01-01')
+    unit_id = queries.insert_unit(other_project, 'PR-1', 1, 900, 100000, '2025-01-01')
+    queries.create_booking(unit_id, queries.get_buyer_by_email('layla@test.com')['id'],
+                           100000, '2025-06-01', '2025-01-01')
+
+    body = (
+        '{"unit_id": "ND-1", "amount": 5000, "date": "2025-06-02", "payment_method": "cash"}\n'
+        '{"unit_id": "ND-1", "amount": 6000, "date": "2025-06-03", "payment_method": "cash"}\n'
+        '{"unit_id": "PR-1", "amount": 5000, "date": "2025-06-02", "payment_method": "cash"}\n'
+    )
+    builder_client = as_user(test_user_builder)
+    report = builder_client.post('/builder/transactions/import', data=body,
+                                 content_type='application/x-ndjson').get_json()
+    assert report['rows_imported'] == 1
+    assert sorted((error['row'], error['message']) for error in report['errors']) == [
+        (2, 'Unit already has a transaction'), (3, 'Invalid unit ID')]
+    builder_client.post('/auth/logout')
+
+    admin_client = as_user(test_user_admin)
+    report = admin_client.post('/admin/transactions/import', data=body,
+                               content_type='application/x-ndjson').get_json()
+    assert report['rows_imported'] == 1
+    assert report['rows_skipped'] == 1
+    assert admin_client.post('/admin/transactions/import', data='x',
+                             content_type='text/plain').status_code == 415
+
+
+def test_buyer_lists_only_own_transactions(as_buyer, test_user_buyer):
+    """
+    GET /buyer/transactions returns only the buyer's payments, once each, one page at a time.
+    """
+    from backend.db import queries
+
+    stamp = '2025-01-01'
+    buyer_id = queries.get_buyer_by_email(test_user_buyer['email'])['id']
+    other_buyer = queries.create_buyer('Omar Khan', '784002', '050', 'omar@test.com', 'hash', stamp)
+    builder_id = queries.create_user('Builder', 'b@test.com', 'hash', 'builder', stamp)
+    project_id = queries.insert_project(builder_id, 'Ledger Tower', 'Dubai', 0, stamp)
+    for n, payer in enumerate([buyer_id, buyer_id, buyer_id, other_buyer]):
+        unit_id = queries.insert_unit(project_id, f'LT-{n}', 1, 900, 100000, stamp)
+        booking_id = queries.create_booking(unit_id, payer, 100000, '2025-06-01', stamp)
+        transaction_id = queries.create_transaction(100000, '2025-06-02', 'cash', stamp, payer, unit_id)
+        queries.match_transaction_to_booking(transaction_id, booking_id)
+
+    buyer_client = as_buyer(test_user_buyer)
+    first = buyer_client.get('/buyer/transactions', query_string={'limit': 2}).get_json()
+    assert [t['unit_number'] for t in first['transactions']] == ['LT-0', 'LT-1']
+    assert first['transactions'][0]['project_name'] == 'Ledger Tower'
+    assert first['transactions'][0]['booking_amount'] == 100000
+
+    second = buyer_client.get('/buyer/transactions',
+                              query_string={'limit': 2, 'after': first['next_cursor']}).get_json()
+    assert [t['unit_number'] for t in second['transactions']] == ['LT-2']
+    assert second['next_cursor'] is None